@@ -0,0 +1,51 @@
+"""Process pool for CPU-bound report phases, kept off the API event loop."""
+
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+_executor: ProcessPoolExecutor | None = None
+_executor_workers = 0
+
+
+def get_compute_executor(workers: int) -> ProcessPoolExecutor:
+    """Shared pool, created on first use and resized if the configured size changes.
+
+    Uses the spawn start method: forking a process that holds an event loop
+    and an asyncpg pool is not safe.
+    """
+    global _executor, _executor_workers
+    if _executor is not None and _executor_workers != workers:
+        _executor.shutdown(wait=False)
+        _executor = None
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        _executor_workers = workers
+    return _executor
+
+
+def shutdown_compute_executor() -> None:
+    global _executor, _executor_workers
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+        _executor_workers = 0
+
+
+def split_pair_rows(n_sources: int, chunks: int) -> list[tuple[int, int]]:
+    """Split rows of the upper pair triangle into ranges with roughly equal pair counts."""
+    if n_sources == 0:
+        return []
+    chunks = max(1, min(chunks, n_sources))
+    total = n_sources * (n_sources - 1) // 2
+    target = total / chunks
+    ranges: list[tuple[int, int]] = []
+    start, acc = 0, 0
+    for i in range(n_sources):
+        acc += n_sources - 1 - i
+        if acc >= target * (len(ranges) + 1) and len(ranges) < chunks - 1:
+            ranges.append((start, i + 1))
+            start = i + 1
+    ranges.append((start, n_sources))
+    return ranges
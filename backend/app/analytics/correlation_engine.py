@@ -1,27 +1,34 @@
 from __future__ import annotations
 
+import asyncio
 import logging
 from collections import defaultdict
+from collections.abc import Mapping
 from dataclasses import dataclass, replace
 from datetime import date as date_type, timedelta
 from statistics import variance
 
 from app.analytics.correlation_math import (
     CorrelationMethodResult, PearsonMethod,
-    fisher_exact_p, BINARY_TYPES,
+    FisherExact, fisher_exact_p, BINARY_TYPES,
+)
+from app.analytics.correlation_matrix import (
+    MatrixPearson, MatrixState, PairMoments, PairSums, SourceMatrix,
 )
 from app.domain.constants import SECONDS_PER_HOUR
 from app.analytics.quality import QualityAssessor, QualityIssue
 from app.analytics.auto_sources.registry import AutoSourceInput, compute_auto_source
-from app.analytics.time_series import TimeSeriesTransform
+from app.analytics.compute_pool import get_compute_executor, split_pair_rows
+from app.analytics.time_series import DaySeries, TimeSeriesTransform
 from app.analytics.value_converter import ValueConverter
 from app.analytics.value_fetcher import ValueFetcher
 from app.correlation_blacklist import should_skip_pair
-from app.domain.enums import MetricType
+from app.domain.enums import MetricType, ReportStatus
+from app.domain.exceptions import ReportCancelledError
 from app.correlation_config import CorrelationConfig, correlation_config
 from app.formula import get_referenced_metric_ids
-from app.repositories.analytics_repository import AnalyticsRepository
 from app.repositories.correlation_repository import CorrelationRepository
+from app.repositories.prefetched_analytics_repository import PrefetchedAnalyticsRepository
 from app.source_key import (
     AutoSourceType, SourceKey, CALENDAR_OPTION_LABELS, STREAK_TYPES,
 )
@@ -53,6 +60,31 @@ class CorrelationPairResult:
     adjusted_p_value: float | None = None
 
 
+@dataclass(frozen=True, slots=True)
+class PairComputeJob:
+    """Picklable input for one chunk of the compute phases (rows of the pair triangle)."""
+
+    report_id: int
+    config: CorrelationConfig
+    sources: list[tuple[SourceKey, str]]
+    source_data: dict[int, Mapping[str, float]]
+    single_select_metric_ids: set[int]
+    prev_state: MatrixState | None
+    rows: tuple[int, int]
+
+
+def compute_pairs(job: PairComputeJob) -> tuple[list[CorrelationPairResult], MatrixState | None]:
+    """Worker entry point: quality flags + pair evaluation for one chunk, no I/O.
+
+    Every chunk builds the same matrix sums (cheap next to the per-pair loop),
+    so only the chunk starting at row 0 pickles its state back; the rest return None.
+    """
+    engine = CorrelationEngine._from_job(job)
+    engine._precompute_quality_flags()
+    pairs = engine._evaluate_all_pairs(range(*job.rows))
+    return pairs, engine._state if job.rows[0] == 0 else None
+
+
 class CorrelationEngine:
     """Вычисляет корреляционный отчёт: загрузка, построение источников, расчёт пар."""
 
@@ -67,18 +99,16 @@ class CorrelationEngine:
         start_date: date_type,
         end_date: date_type,
         config: CorrelationConfig | None = None,
+        attempt: int = 0,
     ) -> None:
         self._repo = repo
-        self._report_id = report_id
         self._user_id = repo.user_id
+        self._attempt = attempt
         self._start_date = start_date
         self._end_date = end_date
-        self._config = config or correlation_config
-        self._method = PearsonMethod()
-        self._analytics_repo = AnalyticsRepository(repo.conn, repo.user_id)
+        self._init_compute_state(report_id, config or correlation_config)
+        self._analytics_repo = PrefetchedAnalyticsRepository(repo.conn, repo.user_id, start_date, end_date)
         self._fetcher = ValueFetcher(self._analytics_repo)
-        self._quality = QualityAssessor(config=self._config)
-        self._qt = QueryTimer(f"correlation-report/{report_id}")
 
         # Internal state populated during run()
         self._metrics_rows: list = []
@@ -86,30 +116,71 @@ class CorrelationEngine:
         self._intervals_by_metric: dict[int, list] = defaultdict(list)
         self._computed_cfgs: dict = {}
         self._enum_opts_by_metric: dict[int, list] = defaultdict(list)
-        self._single_select_metric_ids: set[int] = set()
-        self._sources: list[tuple[SourceKey, str]] = []
-        self._source_data: dict[int, dict[str, float]] = {}
         self._aggregate_indices: dict[int, int] = {}
         self._computed_source_indices: dict[int, int] = {}
         self._checkpoint_source_indices_by_metric: dict[int, list[int]] = defaultdict(list)
         self._interval_source_indices_by_metric: dict[int, list[int]] = defaultdict(list)
+
+    def _init_compute_state(self, report_id: int, config: CorrelationConfig) -> None:
+        """State used by the pure-compute phases (5–7) — everything a worker process needs."""
+        self._report_id = report_id
+        self._config = config
+        self._method = PearsonMethod()
+        self._quality = QualityAssessor(config=self._config)
+        self._fisher = FisherExact()
+        self._qt = QueryTimer(f"correlation-report/{report_id}")
+        self._single_select_metric_ids: set[int] = set()
+        self._sources: list[tuple[SourceKey, str]] = []
+        self._source_data: dict[int, Mapping[str, float]] = {}
         self._low_var_sources: set[int] = set()
         self._binary_sources: set[int] = set()
         self._streak_sources: set[int] = set()
         self._rolling_avg_sources: set[int] = set()
+        self._shifted_data: dict[tuple[int, int], Mapping[str, float]] = {}
+        self._prev_state: MatrixState | None = None
+        self._state: MatrixState | None = None
+
+    @classmethod
+    def _from_job(cls, job: PairComputeJob) -> CorrelationEngine:
+        """Detached engine (no repository) that can only run the compute phases."""
+        engine = cls.__new__(cls)
+        engine._init_compute_state(job.report_id, job.config)
+        engine._sources = job.sources
+        engine._source_data = job.source_data
+        engine._single_select_metric_ids = job.single_select_metric_ids
+        engine._prev_state = job.prev_state
+        return engine
 
     async def run(self) -> None:
-        """Full pipeline: load → build → fetch → auto → quality → pairs → insert → finalize."""
+        """Full pipeline: load → build → fetch → auto → quality → pairs → insert → finalize.
+
+        Between phases the last QueryTimer mark is stored as the report's
+        progress; a report cancelled meanwhile stops with ReportCancelledError.
+        """
         await self._load_metrics_and_configs()
         self._build_sources()
+        await self._report_progress(0.05)
         await self._fetch_source_data()
+        await self._report_progress(0.35)
         await self._compute_auto_sources()
-        self._precompute_quality_flags()
-        pairs = self._evaluate_all_pairs()
+        self._pack_source_data()
+        await self._load_previous_state()
+        await self._report_progress(0.45)
+        pairs = await self._compute_pairs()
         pairs = self._apply_bh_correction(pairs)
+        await self._report_progress(0.85)
         await self._insert_pairs(pairs)
+        await self._save_series(pairs)
+        await self._save_state()
         await self._finalize()
 
+    async def _report_progress(self, fraction: float) -> None:
+        status = await self._repo.update_report_progress(
+            self._report_id, self._attempt, self._qt.last_mark, fraction,
+        )
+        if status != ReportStatus.RUNNING:
+            raise ReportCancelledError(self._report_id)
+
     # ─── Phase 1: Load metrics and configs ─────────────────────────
 
     async def _load_metrics_and_configs(self) -> None:
@@ -436,6 +507,11 @@ class CorrelationEngine:
             if not sk.is_auto or idx in self._source_data:
                 continue
 
+            # Rolling averages: every window of the parent in one sliding pass
+            if sk.auto_type == AutoSourceType.ROLLING_AVG:
+                self._fill_rolling_avg(idx, sk, all_dates)
+                continue
+
             # Delta: special handling with start/end checkpoint data
             if sk.auto_type == AutoSourceType.DELTA:
                 start_data = self._get_checkpoint_source_data(sk.auto_parent_metric_id, sk.auto_option_id)
@@ -506,6 +582,24 @@ class CorrelationEngine:
             )
             self._source_data[idx] = compute_auto_source(sk.auto_type, inp)
 
+    def _fill_rolling_avg(self, idx: int, sk: SourceKey, all_dates: list[str]) -> None:
+        """Set the rolling-average sources of sk's parent for all configured windows at once."""
+        siblings = [
+            (oi, osk.auto_option_id) for oi, (osk, _) in enumerate(self._sources)
+            if osk.auto_type == AutoSourceType.ROLLING_AVG
+            and osk.auto_parent_metric_id == sk.auto_parent_metric_id
+            and osk.auto_option_id is not None
+        ]
+        self._source_data[idx] = {}
+        parent_data = self._resolve_parent_data(sk, all_dates)
+        if not parent_data:
+            for oi, _window in siblings:
+                self._source_data[oi] = {}
+            return
+        averages = TimeSeriesTransform.rolling(parent_data, {window for _oi, window in siblings})
+        for oi, window in siblings:
+            self._source_data[oi] = averages[window]
+
     def _resolve_parent_data(self, sk: SourceKey, all_dates: list[str]) -> dict[str, float] | None:
         """Resolve parent time-series data from engine cache for an auto source."""
         if sk.auto_parent_metric_id is None:
@@ -570,6 +664,11 @@ class CorrelationEngine:
             result.append(data)
         return result if result else None
 
+    def _pack_source_data(self) -> None:
+        """Switch finished source series to compact day-ordinal form for the pair phase."""
+        self._source_data = {idx: DaySeries.from_dict(data) for idx, data in self._source_data.items()}
+        self._qt.mark("pack_sources")
+
     # ─── Phase 5: Pre-compute quality flags ────────────────────────
 
     def _precompute_quality_flags(self) -> None:
@@ -608,9 +707,38 @@ class CorrelationEngine:
 
     # ─── Phase 6: Evaluate all pairs ───────────────────────────────
 
-    def _evaluate_all_pairs(self) -> list[CorrelationPairResult]:
+    async def _compute_pairs(self) -> list[CorrelationPairResult]:
+        """Phases 5–6, inline or in the compute process pool over chunks of pair rows."""
+        workers = self._config.engine.workers
+        if workers <= 0:
+            self._precompute_quality_flags()
+            return self._evaluate_all_pairs()
+
+        jobs = [
+            PairComputeJob(
+                report_id=self._report_id, config=self._config,
+                sources=self._sources, source_data=self._source_data,
+                single_select_metric_ids=self._single_select_metric_ids,
+                prev_state=self._prev_state, rows=rows,
+            )
+            for rows in split_pair_rows(len(self._sources), workers)
+        ]
+        loop = asyncio.get_running_loop()
+        executor = get_compute_executor(workers)
+        results = await asyncio.gather(*(loop.run_in_executor(executor, compute_pairs, job) for job in jobs))
+        pairs = [p for chunk, _state in results for p in chunk]
+        self._state = next((state for _chunk, state in results if state is not None), None)
+        self._qt.mark(f"compute_{len(pairs)}_pairs_{len(jobs)}_chunks")
+        return pairs
+
+    def _evaluate_all_pairs(self, rows: range | None = None) -> list[CorrelationPairResult]:
+        if rows is None:
+            rows = range(len(self._sources))
+        if self._config.engine.mode == "matrix":
+            return self._evaluate_all_pairs_matrix(rows)
+        lags = self._config.engine.lags
         pairs: list[CorrelationPairResult] = []
-        for i in range(len(self._sources)):
+        for i in rows:
             for j in range(i + 1, len(self._sources)):
                 sk_i, mt_i = self._sources[i]
                 sk_j, mt_j = self._sources[j]
@@ -625,8 +753,9 @@ class CorrelationEngine:
                 has_rolling = i in self._rolling_avg_sources or j in self._rolling_avg_sources
                 lag_variations: list[tuple] = [(data_i, data_j, sk_i, sk_j, mt_i, mt_j, i, j, 0)]
                 if not has_rolling:
-                    lag_variations.append((data_i, TimeSeriesTransform.shift_dates(data_j, 1), sk_i, sk_j, mt_i, mt_j, i, j, 1))
-                    lag_variations.append((data_j, TimeSeriesTransform.shift_dates(data_i, 1), sk_j, sk_i, mt_j, mt_i, j, i, 1))
+                    for lag in lags:
+                        lag_variations.append((data_i, self._shifted(j, lag), sk_i, sk_j, mt_i, mt_j, i, j, lag))
+                        lag_variations.append((data_j, self._shifted(i, lag), sk_j, sk_i, mt_j, mt_i, j, i, lag))
 
                 for data_a, data_b, sk_a, sk_b, mt_a, mt_b, idx_a, idx_b, lag in lag_variations:
                     row = self._eval_single_pair(data_a, data_b, sk_a, sk_b, mt_a, mt_b, idx_a, idx_b, lag, low_var, both_binary)
@@ -636,9 +765,142 @@ class CorrelationEngine:
         self._qt.mark(f"compute_{len(pairs)}_pairs")
         return pairs
 
+    def _evaluate_all_pairs_matrix(self, rows: range) -> list[CorrelationPairResult]:
+        """Same pairs, order and quality flags as the pairwise loop, from batched moments."""
+        sums = self._matrix_sums()
+        same_day = PairMoments.from_sums(0, sums[0])
+        lagged = [PairMoments.from_sums(lag, sums[lag]) for lag in self._config.engine.lags]
+        self._qt.mark("matrix_moments")
+
+        pairs: list[CorrelationPairResult] = []
+        for i in rows:
+            for j in range(i + 1, len(self._sources)):
+                sk_i, mt_i = self._sources[i]
+                sk_j, mt_j = self._sources[j]
+                if should_skip_pair(sk_i, sk_j, self._single_select_metric_ids):
+                    continue
+
+                low_var = (i in self._low_var_sources) or (j in self._low_var_sources)
+                both_binary = mt_i in BINARY_TYPES and mt_j in BINARY_TYPES
+
+                has_rolling = i in self._rolling_avg_sources or j in self._rolling_avg_sources
+                lag_variations: list[tuple] = [(same_day, sk_i, sk_j, mt_i, mt_j, i, j)]
+                if not has_rolling:
+                    for moments in lagged:
+                        lag_variations.append((moments, sk_i, sk_j, mt_i, mt_j, i, j))
+                        lag_variations.append((moments, sk_j, sk_i, mt_j, mt_i, j, i))
+
+                for moments, sk_a, sk_b, mt_a, mt_b, idx_a, idx_b in lag_variations:
+                    row = self._eval_matrix_pair(moments, sk_a, sk_b, mt_a, mt_b, idx_a, idx_b, low_var, both_binary)
+                    if row:
+                        pairs.append(row)
+
+        self._qt.mark(f"compute_{len(pairs)}_pairs")
+        return pairs
+
+    def _matrix_sums(self) -> dict[int, PairSums]:
+        """Per-lag pair sums — updated from the previous report when only a few days changed."""
+        engine = self._config.engine
+        series = [self._source_data.get(i, {}) for i in range(len(self._sources))]
+        keys = tuple(sk.to_str() for sk, _ in self._sources)
+        prev = self._prev_state
+        if prev is not None and (
+            prev.source_keys != keys or prev.lags != engine.lags or prev.chain >= engine.incremental_max_chain
+        ):
+            prev = None
+
+        if prev is not None:
+            matrix = SourceMatrix.from_series(series, shift=prev.matrix.shift)
+            kernel = MatrixPearson(matrix)
+            _start, changed = kernel.changed_days(prev.matrix)
+            if changed.sum() <= engine.incremental_max_changed_fraction * len(changed):
+                sums = {lag: kernel.updated_sums(prev.matrix, prev.sums[lag], lag) for lag in (0, *engine.lags)}
+                self._state = MatrixState(keys, engine.lags, matrix, sums, prev.chain + 1)
+                self._qt.mark(f"matrix_incremental_{int(changed.sum())}_days")
+                return sums
+
+        matrix = SourceMatrix.from_series(series)
+        kernel = MatrixPearson(matrix)
+        sums = {lag: kernel.sums(lag) for lag in (0, *engine.lags)}
+        self._state = MatrixState(keys, engine.lags, matrix, sums)
+        return sums
+
+    async def _load_previous_state(self) -> None:
+        engine = self._config.engine
+        if engine.mode != "matrix" or not engine.incremental:
+            return
+        payload = await self._repo.load_latest_report_state()
+        if payload is None:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            self._prev_state = await loop.run_in_executor(None, MatrixState.from_bytes, payload)
+        except (ValueError, KeyError, OSError):
+            logger.warning("Ignoring unreadable correlation state for user %s", self._user_id)
+        self._qt.mark("load_state")
+
+    async def _save_state(self) -> None:
+        """Store the matrix state for the next report, unless it exceeds engine.state_budget_bytes.
+
+        Without a stored state the next report runs a full computation.
+        Compression runs in a thread so the event loop keeps serving requests.
+        """
+        if self._state is None or not self._config.engine.incremental:
+            return
+        if self._state.nbytes > self._config.engine.state_budget_bytes:
+            self._qt.mark(f"skip_state_{self._state.nbytes}_bytes")
+            return
+        payload = await asyncio.get_running_loop().run_in_executor(None, self._state.to_bytes)
+        if not await self._repo.save_report_state(self._report_id, self._attempt, payload):
+            raise ReportCancelledError(self._report_id)
+        self._qt.mark("save_state")
+
+    def _shifted(self, idx: int, lag: int) -> Mapping[str, float]:
+        """Source series shifted forward by lag days — built once per (source, lag)."""
+        if lag == 0:
+            return self._source_data.get(idx, {})
+        key = (idx, lag)
+        if key not in self._shifted_data:
+            self._shifted_data[key] = TimeSeriesTransform.shift_dates(self._source_data.get(idx, {}), lag)
+        return self._shifted_data[key]
+
+    def _eval_matrix_pair(
+        self,
+        moments: PairMoments,
+        sk_a: SourceKey, sk_b: SourceKey, mt_a: str, mt_b: str,
+        idx_a: int, idx_b: int,
+        low_var: bool, both_binary: bool,
+    ) -> CorrelationPairResult | None:
+        result = MatrixPearson.result(moments, idx_a, idx_b)
+        r, n = result.r, result.n
+        if r is None:
+            return None
+        table = MatrixPearson.contingency(moments, idx_a, idx_b)
+        small_group = self._check_small_binary_group_counts(table, idx_a, idx_b)
+        p_val = round(result.p_value, 4)
+        wide_ci = (result.ci_lower is not None and result.ci_upper is not None
+                   and (result.ci_upper - result.ci_lower) > self._config.thresholds.ci_width)
+        fisher_hp = both_binary and self._fisher.p_value(*table[:4]) >= self._config.thresholds.p_value_significance
+        streak_reset = False
+        if idx_a in self._streak_sources or idx_b in self._streak_sources:
+            data_a = self._source_data.get(idx_a, {})
+            data_b = self._shifted(idx_b, moments.lag)
+            streak_reset = self._check_low_streak_resets(data_a, data_b, idx_a, idx_b)
+        qi = self._quality.determine_issue(n, p_val, low_variance=low_var, small_binary_group=small_group, wide_ci=wide_ci, fisher_high_p=fisher_hp, low_streak_resets=streak_reset)
+        return CorrelationPairResult(
+            report_id=self._report_id,
+            metric_a_id=sk_a.metric_id, metric_b_id=sk_b.metric_id,
+            checkpoint_a_id=sk_a.checkpoint_id, checkpoint_b_id=sk_b.checkpoint_id,
+            interval_a_id=sk_a.interval_id, interval_b_id=sk_b.interval_id,
+            source_key_a=sk_a.to_str(), source_key_b=sk_b.to_str(),
+            type_a=mt_a, type_b=mt_b,
+            correlation=r, data_points=n, lag_days=moments.lag, p_value=p_val,
+            quality_issue=qi,
+        )
+
     def _eval_single_pair(
         self,
-        data_a: dict[str, float], data_b: dict[str, float],
+        data_a: Mapping[str, float], data_b: Mapping[str, float],
         sk_a: SourceKey, sk_b: SourceKey, mt_a: str, mt_b: str,
         idx_a: int, idx_b: int, lag: int,
         low_var: bool, both_binary: bool,
@@ -651,7 +913,7 @@ class CorrelationEngine:
         p_val = round(result.p_value, 4)
         wide_ci = (result.ci_lower is not None and result.ci_upper is not None
                    and (result.ci_upper - result.ci_lower) > self._config.thresholds.ci_width)
-        fisher_hp = both_binary and fisher_exact_p(data_a, data_b) >= self._config.thresholds.p_value_significance
+        fisher_hp = both_binary and fisher_exact_p(data_a, data_b, self._fisher) >= self._config.thresholds.p_value_significance
         streak_reset = self._check_low_streak_resets(data_a, data_b, idx_a, idx_b)
         qi = self._quality.determine_issue(n, p_val, low_variance=low_var, small_binary_group=small_group, wide_ci=wide_ci, fisher_high_p=fisher_hp, low_streak_resets=streak_reset)
         return CorrelationPairResult(
@@ -667,7 +929,7 @@ class CorrelationEngine:
 
     def _check_small_binary_group(
         self,
-        data_a: dict[str, float], data_b: dict[str, float],
+        data_a: Mapping[str, float], data_b: Mapping[str, float],
         idx_a: int, idx_b: int,
     ) -> bool:
         if idx_a not in self._binary_sources and idx_b not in self._binary_sources:
@@ -682,9 +944,24 @@ class CorrelationEngine:
                 return True
         return False
 
+    def _check_small_binary_group_counts(
+        self, table: tuple[int, int, int, int, int], idx_a: int, idx_b: int,
+    ) -> bool:
+        """_check_small_binary_group over a precomputed 2×2 table."""
+        if idx_a not in self._binary_sources and idx_b not in self._binary_sources:
+            return False
+        both, only_a, only_b, _neither, n = table
+        min_group = self._config.thresholds.min_binary_group_size
+        for idx, count_true in ((idx_a, both + only_a), (idx_b, both + only_b)):
+            if idx not in self._binary_sources:
+                continue
+            if min(count_true, n - count_true) < min_group:
+                return True
+        return False
+
     def _check_low_streak_resets(
         self,
-        data_a: dict[str, float], data_b: dict[str, float],
+        data_a: Mapping[str, float], data_b: Mapping[str, float],
         idx_a: int, idx_b: int,
     ) -> bool:
         if idx_a not in self._streak_sources and idx_b not in self._streak_sources:
@@ -728,13 +1005,47 @@ class CorrelationEngine:
     # ─── Phase 8: Insert pairs ─────────────────────────────────────
 
     async def _insert_pairs(self, pairs: list[CorrelationPairResult]) -> None:
-        await self._repo.insert_pairs(pairs)
+        if not await self._repo.insert_pairs(self._report_id, self._attempt, pairs):
+            raise ReportCancelledError(self._report_id)
         self._qt.mark("insert_pairs")
 
+    async def _save_series(self, pairs: list[CorrelationPairResult]) -> None:
+        """Persist final series of paired sources so pair charts read them instead of recomputing.
+
+        Sources are taken in order of their strongest pair until
+        engine.series_budget_bytes is used up; the rest fall back to
+        SourceReconstructor. Rows go away with the report (ON DELETE CASCADE
+        when finalize_report drops older reports).
+        """
+        budget = self._config.engine.series_budget_bytes
+        if budget <= 0 or not pairs:
+            return
+        idx_by_key = {sk.to_str(): idx for idx, (sk, _mt) in enumerate(self._sources)}
+        series: list[tuple[str, bytes]] = []
+        seen: set[str] = set()
+        used = 0
+        for pr in sorted(pairs, key=lambda p: abs(p.correlation), reverse=True):
+            for key in (pr.source_key_a, pr.source_key_b):
+                if key in seen or key not in idx_by_key:
+                    continue
+                seen.add(key)
+                payload = DaySeries.from_dict(self._source_data.get(idx_by_key[key], {})).to_bytes()
+                if used + len(payload) > budget:
+                    continue
+                used += len(payload)
+                series.append((key, payload))
+        if not await self._repo.insert_report_series(self._report_id, self._attempt, series):
+            raise ReportCancelledError(self._report_id)
+        self._qt.mark(f"save_series_{len(series)}")
+
     # ─── Phase 9: Finalize ─────────────────────────────────────────
 
     async def _finalize(self) -> None:
-        await self._repo.finalize_report(self._report_id)
+        await self._analytics_repo.refresh_report_summary(self._report_id, self._config.thresholds)
+        self._qt.mark("summary")
+        finalized = await self._repo.finalize_report(self._report_id, self._attempt)
         self._qt.log()
+        if not finalized:
+            raise ReportCancelledError(self._report_id)
 
 
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 import math
+from collections.abc import Mapping
 from dataclasses import dataclass
 from statistics import mean, stdev
 from typing import Protocol
 
+from app.analytics.time_series import DaySeries, align
 from app.domain.constants import Z_SCORE_95
 
 
@@ -25,13 +27,13 @@ class CorrelationMethodResult:
 class CorrelationMethod(Protocol):
     """Protocol for pluggable correlation methods."""
 
-    def compute(self, a: dict[str, float], b: dict[str, float]) -> CorrelationMethodResult: ...
+    def compute(self, a: Mapping[str, float], b: Mapping[str, float]) -> CorrelationMethodResult: ...
 
 
 class PearsonMethod:
     """Pearson correlation with p-value and 95% CI."""
 
-    def compute(self, a: dict[str, float], b: dict[str, float]) -> CorrelationMethodResult:
+    def compute(self, a: Mapping[str, float], b: Mapping[str, float]) -> CorrelationMethodResult:
         calc = CorrelationCalculator(a, b)
         r, n = calc.pearson()
         if r is None:
@@ -48,11 +50,11 @@ class PearsonMethod:
 class CorrelationCalculator:
     """Вычисление корреляции между двумя временными рядами.
 
-    Инициализируется парой dict[str, float] (date→value).
+    Инициализируется парой date→value рядов (dict[str, float] или DaySeries).
     Кеширует Pearson r/n после первого вызова pearson().
     """
 
-    def __init__(self, a: dict[str, float], b: dict[str, float]) -> None:
+    def __init__(self, a: Mapping[str, float], b: Mapping[str, float]) -> None:
         self._a = a
         self._b = b
         self._r: float | None = None
@@ -63,15 +65,12 @@ class CorrelationCalculator:
         if self._computed:
             return
         self._computed = True
-        common = sorted(set(self._a) & set(self._b))
-        self._n = len(common)
+        xs, ys = align(self._a, self._b)
+        self._n = len(xs)
         if self._n < 3:
             self._r = None
             return
 
-        xs = [self._a[d] for d in common]
-        ys = [self._b[d] for d in common]
-
         mean_x, mean_y = mean(xs), mean(ys)
         try:
             std_x, std_y = stdev(xs), stdev(ys)
@@ -148,15 +147,15 @@ def confidence_interval_from_r(r: float, n: int) -> tuple[float, float] | None:
 
 
 def build_contingency_table(
-    a_by_date: dict[str, float], b_by_date: dict[str, float],
+    a_by_date: Mapping[str, float], b_by_date: Mapping[str, float],
 ) -> tuple[int, int, int, int, int]:
     """Build 2x2 contingency table from two binary data dicts."""
+    if isinstance(a_by_date, DaySeries) and isinstance(b_by_date, DaySeries):
+        return _bitset_contingency(a_by_date, b_by_date)
     a = b = c = d = 0
-    for date in a_by_date:
-        if date not in b_by_date:
-            continue
-        va = a_by_date[date] >= 0.5
-        vb = b_by_date[date] >= 0.5
+    for x, y in zip(*align(a_by_date, b_by_date)):
+        va = x >= 0.5
+        vb = y >= 0.5
         if va and vb:
             a += 1
         elif va and not vb:
@@ -169,26 +168,64 @@ def build_contingency_table(
 
 
 def fisher_exact_p(
-    a_by_date: dict[str, float], b_by_date: dict[str, float],
+    a_by_date: Mapping[str, float], b_by_date: Mapping[str, float],
+    fisher: FisherExact | None = None,
 ) -> float:
     """Two-sided Fisher's exact test p-value for two binary data series."""
-    a, b, c, d, n = build_contingency_table(a_by_date, b_by_date)
-    if n == 0:
-        return 1.0
-    row1 = a + b
-    col1 = a + c
-    log_p_obs = _log_hypergeometric(a, b, c, d)
-    a_min = max(0, row1 + col1 - n)
-    a_max = min(row1, col1)
-    p_total = 0.0
-    for a_i in range(a_min, a_max + 1):
-        b_i = row1 - a_i
-        c_i = col1 - a_i
-        d_i = n - row1 - col1 + a_i
-        log_p_i = _log_hypergeometric(a_i, b_i, c_i, d_i)
-        if log_p_i <= log_p_obs + 1e-10:
-            p_total += math.exp(log_p_i)
-    return min(p_total, 1.0)
+    a, b, c, d, _n = build_contingency_table(a_by_date, b_by_date)
+    return (fisher or FisherExact()).p_value(a, b, c, d)
+
+
+def fisher_exact_p_from_table(a: int, b: int, c: int, d: int) -> float:
+    """Two-sided Fisher's exact test p-value for a ready 2x2 contingency table."""
+    return FisherExact().p_value(a, b, c, d)
+
+
+class FisherExact:
+    """Точный тест Фишера с таблицей log(k!) и кэшем p-value по таблице (a, b, c, d).
+
+    One instance lives for a whole report: the log-factorial table grows to
+    the largest n seen, so each hypergeometric term is four lookups, and a
+    table that repeats (common among binary sources over the same days) is
+    computed once.
+    """
+
+    def __init__(self, max_n: int = 0) -> None:
+        self._log_fact: list[float] = [0.0]
+        self._memo: dict[tuple[int, int, int, int], float] = {}
+        self._ensure(max_n)
+
+    def _ensure(self, n: int) -> None:
+        lf = self._log_fact
+        for k in range(len(lf), n + 1):
+            lf.append(math.lgamma(k + 1))
+
+    def p_value(self, a: int, b: int, c: int, d: int) -> float:
+        key = (a, b, c, d)
+        p = self._memo.get(key)
+        if p is None:
+            p = self._memo[key] = self._compute(a, b, c, d)
+        return p
+
+    def _compute(self, a: int, b: int, c: int, d: int) -> float:
+        n = a + b + c + d
+        if n == 0:
+            return 1.0
+        self._ensure(n)
+        lf = self._log_fact
+        row1 = a + b
+        col1 = a + c
+        # log P(table) = const - sum of log(cell!) — margins are fixed
+        const = lf[row1] + lf[n - row1] + lf[col1] + lf[n - col1] - lf[n]
+        log_p_obs = const - lf[a] - lf[b] - lf[c] - lf[d]
+        a_min = max(0, row1 + col1 - n)
+        a_max = min(row1, col1)
+        p_total = 0.0
+        for a_i in range(a_min, a_max + 1):
+            log_p_i = const - lf[a_i] - lf[row1 - a_i] - lf[col1 - a_i] - lf[n - row1 - col1 + a_i]
+            if log_p_i <= log_p_obs + 1e-10:
+                p_total += math.exp(log_p_i)
+        return min(p_total, 1.0)
 
 
 # --- Private math helpers ---
@@ -244,13 +281,16 @@ def _betai(a: float, b: float, x: float) -> float:
     return 1.0 - front * _betacf(b, a, 1.0 - x) / b
 
 
-def _log_hypergeometric(a: int, b: int, c: int, d: int) -> float:
-    """Log probability of a specific 2x2 table under the hypergeometric distribution."""
-    n = a + b + c + d
-    return (
-        math.lgamma(a + b + 1) + math.lgamma(c + d + 1)
-        + math.lgamma(a + c + 1) + math.lgamma(b + d + 1)
-        - math.lgamma(n + 1)
-        - math.lgamma(a + 1) - math.lgamma(b + 1)
-        - math.lgamma(c + 1) - math.lgamma(d + 1)
-    )
+def _bitset_contingency(sa: DaySeries, sb: DaySeries) -> tuple[int, int, int, int, int]:
+    """build_contingency_table() via popcounts over the series' present/true bitsets."""
+    pa, ta = sa.bits()
+    pb, tb = sb.bits()
+    lo = min(sa.start, sb.start)
+    both = (pa << (sa.start - lo)) & (pb << (sb.start - lo))
+    ta = (ta << (sa.start - lo)) & both
+    tb = (tb << (sb.start - lo)) & both
+    n = both.bit_count()
+    a = (ta & tb).bit_count()
+    a_true = ta.bit_count()
+    b_true = tb.bit_count()
+    return a, a_true - a, b_true - a, n - a_true - b_true + a, n
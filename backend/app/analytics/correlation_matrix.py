@@ -0,0 +1,297 @@
+"""Batched Pearson kernel: all source pairs at once via masked matrix products.
+
+Sources are loaded once into a date-indexed dense matrix (rows = days,
+columns = sources) with a presence mask. Sufficient statistics for every
+ordered pair (n, Σx, Σy, Σx², Σy², Σxy) come from a handful of matrix
+products, so the O(n²) pair loop in the engine only does scalar lookups.
+
+The sums are additive over days, so a report can be refreshed from the
+previous report's sums by subtracting the old contribution of changed days
+and adding the new one (see MatrixPearson.updated_sums and MatrixState).
+"""
+
+from __future__ import annotations
+
+import io
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+from functools import lru_cache
+
+import numpy as np
+
+from app.analytics.correlation_math import (
+    CorrelationMethodResult, confidence_interval_from_r, p_value_from_r,
+)
+from app.analytics.time_series import DaySeries
+
+# Relative tolerance below which the variance over common days counts as zero
+# (statistics.stdev returns exactly 0 there; float sums leave ~1e-16 noise).
+_ZERO_VAR_RTOL = 1e-10
+
+
+class SourceMatrix:
+    """Плотная матрица значений источников по дням + маска наличия данных."""
+
+    __slots__ = ("values", "mask", "binary", "start_ordinal", "shift")
+
+    def __init__(
+        self, values: np.ndarray, mask: np.ndarray, binary: np.ndarray, start_ordinal: int,
+        shift: np.ndarray,
+    ) -> None:
+        self.values = values  # (days, sources) float64, minus shift per column, 0.0 where missing
+        self.mask = mask  # (days, sources) float64 0/1 presence
+        self.binary = binary  # (days, sources) float64 0/1 — value >= 0.5 and present
+        self.start_ordinal = start_ordinal
+        self.shift = shift  # (sources,) constant subtracted from each column
+
+    @property
+    def n_days(self) -> int:
+        return self.values.shape[0]
+
+    @property
+    def n_sources(self) -> int:
+        return self.values.shape[1]
+
+    @classmethod
+    def from_series(
+        cls, series: list[Mapping[str, float]], shift: np.ndarray | None = None,
+    ) -> SourceMatrix:
+        """Build the matrix from per-source date→value series (index = column).
+
+        By default every column is shifted by its first present value: correlation
+        is shift-invariant, and this keeps constant runs exactly zero and sums
+        well-conditioned. Pass the previous matrix's shift to keep sums comparable.
+        """
+        packed = [DaySeries.from_dict(data) for data in series]
+        spans = [(ds.start, ds.end) for ds in packed if len(ds)]
+        start = min((lo for lo, _ in spans), default=0)
+        n_days = max((hi for _, hi in spans), default=0) - start
+        raw = np.zeros((n_days, len(series)), dtype=np.float64)
+        mask = np.zeros((n_days, len(series)), dtype=np.float64)
+        for col, ds in enumerate(packed):
+            if not len(ds):
+                continue
+            rows = slice(ds.start - start, ds.end - start)
+            raw[rows, col] = np.frombuffer(ds.data, dtype=np.float64)
+            mask[rows, col] = np.frombuffer(ds.present, dtype=np.uint8)
+        binary = ((raw >= 0.5) & (mask > 0)).astype(np.float64)
+        if shift is None:
+            shift = np.zeros(len(series))
+            if n_days:
+                present = mask > 0
+                first_row = present.argmax(axis=0)
+                shift = np.where(present.any(axis=0), raw[first_row, np.arange(len(series))], 0.0)
+        values = (raw - shift) * mask
+        return cls(values, mask, binary, start, shift)
+
+    def aligned(self, start_ordinal: int, n_days: int) -> SourceMatrix:
+        """Same data placed on a wider day axis (rows outside the data are empty)."""
+        offset = self.start_ordinal - start_ordinal
+        out = []
+        for arr in (self.values, self.mask, self.binary):
+            padded = np.zeros((n_days, arr.shape[1]))
+            padded[offset:offset + self.n_days] = arr
+            out.append(padded)
+        return SourceMatrix(out[0], out[1], out[2], start_ordinal, self.shift)
+
+
+@dataclass(frozen=True, slots=True)
+class PairSums:
+    """Аддитивные суммы по дням для всех упорядоченных пар одного лага.
+
+    Element [a, b] sums over days t where source a has a value at t+lag
+    and source b at t.
+    """
+
+    n: np.ndarray
+    sx: np.ndarray
+    sy: np.ndarray
+    sxx: np.ndarray
+    syy: np.ndarray
+    sxy: np.ndarray
+    true_a: np.ndarray
+    true_b: np.ndarray
+    both_true: np.ndarray
+
+    @classmethod
+    def over_rows(cls, m: SourceMatrix, lead_rows: slice | np.ndarray, lag_rows: slice | np.ndarray) -> PairSums:
+        x_lead, x_lag = m.values[lead_rows], m.values[lag_rows]
+        k_lead, k_lag = m.mask[lead_rows], m.mask[lag_rows]
+        g_lead, g_lag = m.binary[lead_rows], m.binary[lag_rows]
+        return cls(
+            n=k_lead.T @ k_lag,
+            sx=x_lead.T @ k_lag,
+            sy=k_lead.T @ x_lag,
+            sxx=(x_lead * x_lead).T @ k_lag,
+            syy=k_lead.T @ (x_lag * x_lag),
+            sxy=x_lead.T @ x_lag,
+            true_a=g_lead.T @ k_lag,
+            true_b=k_lead.T @ g_lag,
+            both_true=g_lead.T @ g_lag,
+        )
+
+    def plus(self, other: PairSums, sign: float = 1.0) -> PairSums:
+        return PairSums(*(getattr(self, f.name) + sign * getattr(other, f.name) for f in fields(self)))
+
+
+@dataclass(frozen=True, slots=True)
+class PairMoments:
+    """Статистики всех упорядоченных пар для одного лага.
+
+    Element [a, b] describes source a at day t+lag against source b at day t.
+    """
+
+    lag: int
+    n: np.ndarray
+    r: np.ndarray
+    true_a: np.ndarray
+    true_b: np.ndarray
+    both_true: np.ndarray
+
+    @classmethod
+    def from_sums(cls, lag: int, sums: PairSums) -> PairMoments:
+        """Raw Pearson r from sums; counts are rounded back to exact integers."""
+        n = np.rint(sums.n)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            var_x = sums.sxx - sums.sx * sums.sx / n
+            var_y = sums.syy - sums.sy * sums.sy / n
+            cov = sums.sxy - sums.sx * sums.sy / n
+            zero_var = (var_x <= _ZERO_VAR_RTOL * sums.sxx) | (var_y <= _ZERO_VAR_RTOL * sums.syy)
+            r = cov / np.sqrt(var_x * var_y)
+        r = np.where(zero_var, 0.0, np.clip(r, -1.0, 1.0))
+        r = np.where(n < 3, np.nan, r)
+        return cls(
+            lag=lag, n=n, r=r,
+            true_a=np.rint(sums.true_a),
+            true_b=np.rint(sums.true_b),
+            both_true=np.rint(sums.both_true),
+        )
+
+
+class MatrixPearson:
+    """Pearson r/n/p/CI для всех пар источников через матричные произведения."""
+
+    def __init__(self, matrix: SourceMatrix) -> None:
+        self._m = matrix
+
+    def sums(self, lag: int = 0) -> PairSums:
+        """Sufficient statistics for every ordered pair at a lag."""
+        m = self._m
+        end = max(m.n_days - lag, 0)
+        return PairSums.over_rows(m, slice(lag, lag + end), slice(0, end))
+
+    def moments(self, lag: int = 0) -> PairMoments:
+        """Compute sufficient statistics and raw r for every ordered pair at a lag."""
+        return PairMoments.from_sums(lag, self.sums(lag))
+
+    def changed_days(self, previous: SourceMatrix) -> tuple[int, np.ndarray]:
+        """Common axis start and per-day flags where this matrix differs from previous."""
+        start = min(self._m.start_ordinal, previous.start_ordinal)
+        end = max(self._m.start_ordinal + self._m.n_days, previous.start_ordinal + previous.n_days)
+        new = self._m.aligned(start, end - start)
+        old = previous.aligned(start, end - start)
+        changed = ((new.values != old.values) | (new.mask != old.mask)).any(axis=1)
+        return start, changed
+
+    def updated_sums(self, previous: SourceMatrix, previous_sums: PairSums, lag: int = 0) -> PairSums:
+        """Sums for this matrix from the previous matrix's sums plus a delta over changed days.
+
+        Both matrices must have the same columns and the same per-column shift.
+        Only day pairs (t + lag, t) touching a changed day are recomputed.
+        """
+        start, changed = self.changed_days(previous)
+        n_days = len(changed)
+        if n_days <= lag:
+            return self.sums(lag)
+        affected = changed[lag:] | changed[:n_days - lag]
+        lag_rows = np.flatnonzero(affected)
+        if not len(lag_rows):
+            return previous_sums
+        lead_rows = lag_rows + lag
+        new = self._m.aligned(start, n_days)
+        old = previous.aligned(start, n_days)
+        removed = PairSums.over_rows(old, lead_rows, lag_rows)
+        added = PairSums.over_rows(new, lead_rows, lag_rows)
+        return previous_sums.plus(removed, -1.0).plus(added)
+
+    @staticmethod
+    def result(moments: PairMoments, a: int, b: int) -> CorrelationMethodResult:
+        """Per-pair result, numerically matching PearsonMethod.compute()."""
+        n = int(moments.n[a, b])
+        r_raw = moments.r[a, b]
+        if n < 3 or np.isnan(r_raw):
+            return CorrelationMethodResult(r=None, n=n, p_value=1.0, ci_lower=None, ci_upper=None)
+        r = round(float(r_raw), 3)
+        p_val, ci = _p_value_and_ci(r, n)
+        return CorrelationMethodResult(
+            r=r, n=n, p_value=p_val,
+            ci_lower=ci[0] if ci else None,
+            ci_upper=ci[1] if ci else None,
+        )
+
+    @staticmethod
+    def contingency(moments: PairMoments, a: int, b: int) -> tuple[int, int, int, int, int]:
+        """2×2 table (a, b, c, d, n) — same layout as build_contingency_table()."""
+        n = int(moments.n[a, b])
+        both = int(moments.both_true[a, b])
+        a_true = int(moments.true_a[a, b])
+        b_true = int(moments.true_b[a, b])
+        only_a = a_true - both
+        only_b = b_true - both
+        return both, only_a, only_b, n - both - only_a - only_b, n
+
+
+@lru_cache(maxsize=65536)
+def _p_value_and_ci(r: float, n: int) -> tuple[float, tuple[float, float] | None]:
+    """p-value and CI depend only on (rounded r, n) — memoized across pairs."""
+    return p_value_from_r(r, n), confidence_interval_from_r(r, n)
+
+
+@dataclass(frozen=True, slots=True)
+class MatrixState:
+    """Всё, что нужно следующему отчёту для инкрементального пересчёта."""
+
+    source_keys: tuple[str, ...]
+    lags: tuple[int, ...]
+    matrix: SourceMatrix
+    sums: dict[int, PairSums]
+    chain: int = 0  # incremental updates since the last full computation
+
+    @property
+    def nbytes(self) -> int:
+        """Uncompressed size of the arrays to_bytes() writes."""
+        m = self.matrix
+        size = m.values.nbytes + m.mask.size + m.binary.size + m.shift.nbytes
+        return size + sum(getattr(s, f.name).nbytes for s in self.sums.values() for f in fields(s))
+
+    def to_bytes(self) -> bytes:
+        arrays: dict[str, np.ndarray] = {
+            "source_keys": np.array(self.source_keys, dtype=str),
+            "lags": np.array(self.lags, dtype=np.int64),
+            "meta": np.array([self.matrix.start_ordinal, self.chain], dtype=np.int64),
+            "values": self.matrix.values,
+            "mask": self.matrix.mask.astype(np.uint8),
+            "binary": self.matrix.binary.astype(np.uint8),
+            "shift": self.matrix.shift,
+        }
+        for lag, sums in self.sums.items():
+            for f in fields(sums):
+                arrays[f"{lag}_{f.name}"] = getattr(sums, f.name)
+        buf = io.BytesIO()
+        np.savez_compressed(buf, **arrays)
+        return buf.getvalue()
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> MatrixState:
+        with np.load(io.BytesIO(payload), allow_pickle=False) as data:
+            start_ordinal, chain = (int(v) for v in data["meta"])
+            lags = tuple(int(v) for v in data["lags"])
+            matrix = SourceMatrix(
+                data["values"], data["mask"].astype(np.float64), data["binary"].astype(np.float64),
+                start_ordinal, data["shift"],
+            )
+            sums = {
+                lag: PairSums(*(data[f"{lag}_{f.name}"] for f in fields(PairSums)))
+                for lag in (0, *lags)
+            }
+            return cls(tuple(str(k) for k in data["source_keys"]), lags, matrix, sums, chain)
@@ -28,15 +28,19 @@ class PairFormatter:
 
     @staticmethod
     def category_filter_sql(category: str, thresholds: ThresholdsConfig) -> str:
-        """Build SQL WHERE clause for a category using configurable thresholds."""
+        """Build SQL WHERE clause for a category using configurable thresholds.
+
+        Filters on the stored quality_class/abs_correlation columns so the
+        (report_id, quality_class, abs_correlation, id) index serves the page.
+        """
         strong = thresholds.strong_correlation
         moderate = thresholds.moderate_correlation
         filters: dict[str, str] = {
-            "sig_strong": f"AND quality_issue IS NULL AND ABS(correlation) > {strong}",
-            "sig_medium": f"AND quality_issue IS NULL AND ABS(correlation) > {moderate} AND ABS(correlation) <= {strong}",
-            "sig_weak": f"AND quality_issue IS NULL AND ABS(correlation) <= {moderate}",
-            "maybe": "AND quality_issue IN ('wide_ci', 'fisher_exact_high_p', 'fdr_high_p_value')",
-            "insig": "AND quality_issue IS NOT NULL AND quality_issue NOT IN ('wide_ci', 'fisher_exact_high_p', 'fdr_high_p_value')",
+            "sig_strong": f"AND cp.quality_class = 'sig' AND cp.abs_correlation > {strong}",
+            "sig_medium": f"AND cp.quality_class = 'sig' AND cp.abs_correlation > {moderate} AND cp.abs_correlation <= {strong}",
+            "sig_weak": f"AND cp.quality_class = 'sig' AND cp.abs_correlation <= {moderate}",
+            "maybe": "AND cp.quality_class = 'maybe'",
+            "insig": "AND cp.quality_class = 'insig'",
             "all": "",
         }
         return filters.get(category, "")
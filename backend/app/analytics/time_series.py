@@ -1,29 +1,218 @@
 from __future__ import annotations
 
+import struct
+import zlib
+from array import array
+from collections.abc import Iterable, Iterator, Mapping
 from datetime import date as date_type, timedelta
+from functools import lru_cache
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+_BLOB_HEADER = struct.Struct("<iI")  # start ordinal, span in days
+
+
+@lru_cache(maxsize=65536)
+def iso_to_ordinal(d: str) -> int:
+    return date_type.fromisoformat(d).toordinal()
+
+
+@lru_cache(maxsize=65536)
+def ordinal_to_iso(o: int) -> str:
+    return date_type.fromordinal(o).isoformat()
+
+
+class DaySeries(Mapping[str, float]):
+    """Компактный дневной ряд: начальный ordinal + array('d') значений + битмап наличия.
+
+    Reads like a read-only dict[str, float] (ISO date → value), so existing
+    consumers keep working; alignment and shifting use integer day offsets.
+    """
+
+    __slots__ = ("start", "data", "present", "_count", "_bits")
+
+    def __init__(
+        self, start: int, data: array, present: bytearray, count: int | None = None,
+        bits: tuple[int, int] | None = None,
+    ) -> None:
+        self.start = start  # ordinal of values[0]
+        self.data = data  # array('d'), one slot per day in [start, start + len)
+        self.present = present  # 1 where the day has a value
+        self._count = sum(present) if count is None else count
+        self._bits = bits
+
+    @classmethod
+    def from_ordinals(cls, data: Mapping[int, float]) -> DaySeries:
+        if not data:
+            return cls(0, array("d"), bytearray(), 0)
+        start = min(data)
+        span = max(data) - start + 1
+        values = array("d", bytes(8 * span))
+        present = bytearray(span)
+        for o, v in data.items():
+            values[o - start] = v
+            present[o - start] = 1
+        return cls(start, values, present, len(data))
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, float]) -> DaySeries:
+        if isinstance(data, DaySeries):
+            return data
+        return cls.from_ordinals({iso_to_ordinal(d): v for d, v in data.items()})
+
+    @property
+    def end(self) -> int:
+        """Ordinal one past the last slot."""
+        return self.start + len(self.present)
+
+    def shift(self, days: int) -> DaySeries:
+        """Same values moved forward by N days — shares buffers, O(1)."""
+        return DaySeries(self.start + days, self.data, self.present, self._count, self._bits)
+
+    def bits(self) -> tuple[int, int]:
+        """(present, true) bitsets, bit i = day start + i; true means value >= 0.5. Cached."""
+        if self._bits is None:
+            present = "".join("1" if p else "0" for p in reversed(self.present))
+            true = "".join(
+                "1" if p and v >= 0.5 else "0" for v, p in zip(reversed(self.data), reversed(self.present))
+            )
+            self._bits = (int(present or "0", 2), int(true or "0", 2))
+        return self._bits
+
+    def ordinals(self) -> Iterator[int]:
+        start = self.start
+        for i, p in enumerate(self.present):
+            if p:
+                yield start + i
+
+    def get_ordinal(self, o: int) -> float | None:
+        i = o - self.start
+        if 0 <= i < len(self.present) and self.present[i]:
+            return self.data[i]
+        return None
+
+    def to_dict(self) -> dict[str, float]:
+        """Plain ISO-keyed dict for the API edge."""
+        return dict(self.items())
+
+    def to_bytes(self) -> bytes:
+        """zlib blob: header, presence bytes, float64 values (native byte order)."""
+        header = _BLOB_HEADER.pack(self.start, len(self.present))
+        return zlib.compress(header + bytes(self.present) + self.data.tobytes())
+
+    @classmethod
+    def from_bytes(cls, payload: bytes) -> DaySeries:
+        raw = zlib.decompress(payload)
+        start, span = _BLOB_HEADER.unpack_from(raw)
+        offset = _BLOB_HEADER.size
+        present = bytearray(raw[offset:offset + span])
+        values = array("d")
+        values.frombytes(raw[offset + span:offset + span + 8 * span])
+        return cls(start, values, present)
+
+    # --- Mapping protocol ---
+
+    def __getitem__(self, key: str) -> float:
+        v = self.get_ordinal(iso_to_ordinal(key))
+        if v is None:
+            raise KeyError(key)
+        return v
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.get_ordinal(iso_to_ordinal(key)) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (ordinal_to_iso(o) for o in self.ordinals())
+
+    def __len__(self) -> int:
+        return self._count
+
+    def values(self) -> list[float]:  # type: ignore[override]
+        return [v for v, p in zip(self.data, self.present) if p]
+
+    def items(self) -> list[tuple[str, float]]:  # type: ignore[override]
+        start = self.start
+        return [(ordinal_to_iso(start + i), v) for i, (v, p) in enumerate(zip(self.data, self.present)) if p]
+
+    def __repr__(self) -> str:
+        return f"DaySeries({self.to_dict()!r})"
+
+
+def align(a: Mapping[str, float], b: Mapping[str, float]) -> tuple[list[float], list[float]]:
+    """Values of a and b on their common days, in date order."""
+    if isinstance(a, DaySeries) and isinstance(b, DaySeries):
+        lo, hi = max(a.start, b.start), min(a.end, b.end)
+        xs: list[float] = []
+        ys: list[float] = []
+        ia, ib = lo - a.start, lo - b.start
+        pa, pb, va, vb = a.present, b.present, a.data, b.data
+        for k in range(hi - lo):
+            if pa[ia + k] and pb[ib + k]:
+                xs.append(va[ia + k])
+                ys.append(vb[ib + k])
+        return xs, ys
+    common = sorted(set(a) & set(b))
+    return [a[d] for d in common], [b[d] for d in common]
 
 
 class TimeSeriesTransform:
     """Производные временные ряды: скользящее среднее, стрики, агрегация чекпоинтов."""
 
     @staticmethod
-    def rolling_avg(data: dict[str, float], window: int) -> dict[str, float]:
+    def rolling_avg(data: Mapping[str, float], window: int) -> dict[str, float]:
         """Compute rolling average over a window of days.
 
         Only produces values for dates where the full window of data is present.
         """
-        if not data:
-            return {}
-        result: dict[str, float] = {}
-        for d_str in sorted(data):
-            d = date_type.fromisoformat(d_str)
-            vals: list[float] = []
-            for offset in range(window):
-                wd = str(d - timedelta(days=offset))
-                if wd in data:
-                    vals.append(data[wd])
-            if len(vals) == window:
-                result[d_str] = sum(vals) / window
+        return TimeSeriesTransform.rolling(data, (window,))[window]
+
+    @staticmethod
+    def rolling(
+        data: Mapping[str, float], windows: Iterable[int], stat: str = "mean",
+    ) -> dict[int, dict[str, float]]:
+        """Rolling mean / std / median for several windows over one dense day array.
+
+        A day gets a value only when all `window` days ending on it have data.
+        Presence counts, sums and sums of squares are prefix sums, so mean and
+        std cost O(days) per window whatever its length; median reads each
+        full window through a strided view. std is the sample one (window >= 2).
+        """
+        windows = list(windows)
+        result: dict[int, dict[str, float]] = {w: {} for w in windows}
+        ds = DaySeries.from_dict(data)
+        n = len(ds.present)
+        if n == 0:
+            return result
+        present = np.frombuffer(ds.present, dtype=np.uint8)
+        # Values centered on their (rounded, so integer data stays exact) mean
+        # keep the prefix-sum differences free of cancellation.
+        offset = float(np.round(np.frombuffer(ds.data, dtype=np.float64)[present == 1].mean()))
+        values = np.where(present == 1, np.frombuffer(ds.data, dtype=np.float64) - offset, 0.0)
+        counts = np.concatenate(([0], np.cumsum(present, dtype=np.int64)))
+        sums = np.concatenate(([0.0], np.cumsum(values)))
+        squares = np.concatenate(([0.0], np.cumsum(values * values))) if stat == "std" else None
+
+        for w in windows:
+            if w <= 0 or w > n or (stat == "std" and w < 2):
+                continue
+            # ends[k] = position of the last day of the k-th window
+            ends = np.nonzero(counts[w:] - counts[:n - w + 1] == w)[0] + (w - 1)
+            if len(ends) == 0:
+                continue
+            window_sums = sums[ends + 1] - sums[ends + 1 - w]
+            if stat == "mean":
+                out = window_sums / w + offset
+            elif stat == "std":
+                window_squares = squares[ends + 1] - squares[ends + 1 - w]
+                out = np.sqrt(np.maximum(window_squares - window_sums * window_sums / w, 0.0) / (w - 1))
+            elif stat == "median":
+                out = np.median(sliding_window_view(values, w)[ends - (w - 1)], axis=1) + offset
+            else:
+                raise ValueError(f"Unknown rolling stat: {stat}")
+            start = ds.start
+            result[w] = {ordinal_to_iso(start + int(e)): v for e, v in zip(ends, out.tolist())}
         return result
 
     @staticmethod
@@ -69,6 +258,8 @@ class TimeSeriesTransform:
         return result
 
     @staticmethod
-    def shift_dates(data: dict[str, float], days: int) -> dict[str, float]:
+    def shift_dates(data: Mapping[str, float], days: int) -> Mapping[str, float]:
         """Shift date keys forward by N days."""
+        if isinstance(data, DaySeries):
+            return data.shift(days)
         return {str(date_type.fromisoformat(d) + timedelta(days=days)): v for d, v in data.items()}
@@ -1,24 +1,43 @@
 from __future__ import annotations
 
 from collections import defaultdict
+from collections.abc import Awaitable, Callable
 from datetime import date as date_type
 from statistics import mean
 from typing import TYPE_CHECKING
 
+import numpy as np
+
 from app.analytics.value_converter import ValueConverter
 from app.domain.enums import MetricType
-from app.formula import evaluate_formula
+from app.formula import evaluate_formula_series
 
 if TYPE_CHECKING:
     from app.repositories.analytics_repository import AnalyticsRepository
 
 
 class ValueFetcher:
-    """Извлекает значения метрик из БД, возвращает dict[str, float] (date->value)."""
+    """Извлекает значения метрик из БД, возвращает dict[str, float] (date->value).
+
+    Whole-metric series (aggregated, and scale-normalized raw inputs of
+    computed metrics) are kept in the repository's series_cache, so every
+    fetcher over the same repository (trends, stats, distribution, pair
+    charts, computed metrics, a report's sources) builds each one once.
+    Callers get a copy and may modify it.
+    """
 
     def __init__(self, repo: AnalyticsRepository) -> None:
         self._repo = repo
 
+    async def _cached_series(
+        self, key: tuple[int, str, str, date_type, date_type], build: Callable[[], Awaitable[dict[str, float]]],
+    ) -> dict[str, float]:
+        cache = self._repo.series_cache
+        series = cache.get(key)
+        if series is None:
+            series = cache[key] = await build()
+        return dict(series)
+
     async def values_by_date_for_checkpoint(
         self,
         metric_id: int,
@@ -31,6 +50,19 @@ class ValueFetcher:
         free_interval_only: bool = False,
     ) -> dict[str, float]:
         """Get values by date for a metric, optionally filtered by checkpoint."""
+        if checkpoint_id is None and not free_interval_only:
+            return await self._cached_series(
+                (metric_id, "aggregate", metric_type, start_date, end_date),
+                lambda: self._aggregated_values(metric_id, metric_type, start_date, end_date),
+            )
+        return await self._aggregated_values(
+            metric_id, metric_type, start_date, end_date, checkpoint_id, free_interval_only=free_interval_only,
+        )
+
+    async def _aggregated_values(
+        self, metric_id: int, metric_type: str, start_date: date_type, end_date: date_type,
+        checkpoint_id: int | None = None, *, free_interval_only: bool = False,
+    ) -> dict[str, float]:
         value_table, extra_cols = ValueConverter.get_value_table(metric_type)
         rows = await self._repo.fetch_entries_values_with_checkpoint(
             metric_id, value_table, extra_cols, start_date, end_date, checkpoint_id,
@@ -63,6 +95,14 @@ class ValueFetcher:
         user_id: int,
     ) -> dict[str, float]:
         """Get values by date using scale→0..1 normalization (for computed metric evaluation)."""
+        return await self._cached_series(
+            (metric_id, "raw", metric_type, start_date, end_date),
+            lambda: self._raw_values(metric_id, metric_type, start_date, end_date),
+        )
+
+    async def _raw_values(
+        self, metric_id: int, metric_type: str, start_date: date_type, end_date: date_type,
+    ) -> dict[str, float]:
         value_table, extra_cols = ValueConverter.get_value_table(metric_type)
 
         scale_min, scale_max = None, None
@@ -152,29 +192,15 @@ class ValueFetcher:
         all_dates: set[str] = set()
         for d in source_data.values():
             all_dates.update(d.keys())
+        dates = sorted(all_dates)
 
-        result: dict[str, float] = {}
-        for d in sorted(all_dates):
-            values_for_day = {mid: source_data.get(mid, {}).get(d) for mid in ref_ids}
-            raw = evaluate_formula(formula, values_for_day, result_type)
-            if raw is not None:
-                if result_type == MetricType.bool:
-                    result[d] = 1.0 if raw else 0.0
-                elif result_type == MetricType.time:
-                    if isinstance(raw, str) and ":" in raw:
-                        h, m = map(int, raw.split(":"))
-                        result[d] = float(h * 60 + m)
-                    else:
-                        result[d] = float(raw)
-                elif result_type == MetricType.duration:
-                    if isinstance(raw, str) and "ч" in raw:
-                        parts = raw.replace("м", "").split("ч")
-                        result[d] = float(int(parts[0].strip()) * 60 + int(parts[1].strip()))
-                    else:
-                        result[d] = float(raw)
-                else:
-                    result[d] = float(raw)
-        return result
+        nan = float("nan")
+        columns = {
+            mid: np.fromiter((data.get(d, nan) for d in dates), dtype=np.float64, count=len(dates))
+            for mid, data in source_data.items()
+        }
+        values = evaluate_formula_series(formula, columns, len(dates), result_type)
+        return {d: v for d, v in zip(dates, values) if v is not None}
 
     async def time_ranges_by_date(
         self,
@@ -183,12 +209,7 @@ class ValueFetcher:
         end_date: date_type,
     ) -> dict[str, list[float]]:
         """Load free interval durations in minutes, grouped by date."""
-        rows = await self._repo.conn.fetch(
-            "SELECT date, time_start, time_end FROM entries "
-            "WHERE metric_id = $1 AND user_id = $2 AND date >= $3 AND date <= $4 "
-            "AND is_free_interval = true AND time_start IS NOT NULL AND time_end IS NOT NULL",
-            metric_id, self._repo.user_id, start_date, end_date,
-        )
+        rows = await self._repo.fetch_free_interval_times(metric_id, start_date, end_date)
         result: dict[str, list[float]] = {}
         for r in rows:
             d = str(r["date"])
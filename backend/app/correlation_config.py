@@ -62,11 +62,36 @@ class ThresholdsConfig:
     min_binary_group_size: int = 5
 
 
+ENGINE_MODES: frozenset[str] = frozenset({"matrix", "pairwise"})
+
+
+@dataclass(frozen=True)
+class EngineConfig:
+    mode: str = "matrix"
+    lags: tuple[int, ...] = (1,)
+    incremental: bool = True
+    incremental_max_changed_fraction: float = 0.25
+    incremental_max_chain: int = 30
+    workers: int = 2
+    series_budget_bytes: int = 8_000_000
+    state_budget_bytes: int = 32_000_000
+
+
+@dataclass(frozen=True)
+class JobsConfig:
+    max_concurrent: int = 2
+    max_per_user: int = 1
+    heartbeat_seconds: float = 15.0
+    stale_after_seconds: float = 90.0
+
+
 @dataclass(frozen=True)
 class CorrelationConfig:
     auto_sources: AutoSourcesConfig = field(default_factory=AutoSourcesConfig)
     quality_filters: QualityFiltersConfig = field(default_factory=QualityFiltersConfig)
     thresholds: ThresholdsConfig = field(default_factory=ThresholdsConfig)
+    engine: EngineConfig = field(default_factory=EngineConfig)
+    jobs: JobsConfig = field(default_factory=JobsConfig)
     method: str = "pearson"
 
 
@@ -112,6 +137,37 @@ def _parse_thresholds(raw_thresholds: dict[str, object]) -> ThresholdsConfig:
     return ThresholdsConfig(**kwargs)  # type: ignore[arg-type]
 
 
+def _parse_engine(raw_engine: dict[str, object]) -> EngineConfig:
+    """Extract engine settings; unknown modes fall back to the default.
+
+    Lags are day offsets on top of same-day (lag 0, always evaluated);
+    non-positive values are dropped, duplicates collapsed.
+    """
+    kwargs: dict[str, object] = {}
+    mode = raw_engine.get("mode")
+    if mode in ENGINE_MODES:
+        kwargs["mode"] = mode
+    if "lags" in raw_engine:
+        kwargs["lags"] = tuple(sorted({int(lag) for lag in raw_engine["lags"] if int(lag) > 0}))  # type: ignore[union-attr]
+    for name in ("incremental", "incremental_max_changed_fraction", "incremental_max_chain", "workers",
+                 "series_budget_bytes", "state_budget_bytes"):
+        if name in raw_engine:
+            kwargs[name] = raw_engine[name]
+    return EngineConfig(**kwargs)  # type: ignore[arg-type]
+
+
+def _parse_jobs(raw_jobs: dict[str, object]) -> JobsConfig:
+    """Extract report queue limits; caps below 1 are raised to 1."""
+    kwargs: dict[str, object] = {}
+    for name in JobsConfig.__dataclass_fields__:
+        if name in raw_jobs:
+            kwargs[name] = raw_jobs[name]
+    for cap in ("max_concurrent", "max_per_user"):
+        if cap in kwargs:
+            kwargs[cap] = max(1, int(kwargs[cap]))  # type: ignore[call-overload]
+    return JobsConfig(**kwargs)  # type: ignore[arg-type]
+
+
 def load_config(env: str | None = None, path: Path | None = None) -> CorrelationConfig:
     """Load config: prod as base, local overrides on top (if env=local)."""
     if env is None:
@@ -129,6 +185,8 @@ def load_config(env: str | None = None, path: Path | None = None) -> Correlation
     prod_sources = raw.get("prod", {}).get("auto_sources", {})
     prod_quality = raw.get("prod", {}).get("quality_filters", {})
     prod_thresholds = raw.get("prod", {}).get("thresholds", {})
+    prod_engine = raw.get("prod", {}).get("engine", {})
+    prod_jobs = raw.get("prod", {}).get("jobs", {})
     prod_method = raw.get("prod", {}).get("method", "pearson")
 
     # Merge local on top if env=local (table-level override)
@@ -136,20 +194,28 @@ def load_config(env: str | None = None, path: Path | None = None) -> Correlation
         local_sources = raw.get("local", {}).get("auto_sources", {})
         local_quality = raw.get("local", {}).get("quality_filters", {})
         local_thresholds = raw.get("local", {}).get("thresholds", {})
+        local_engine = raw.get("local", {}).get("engine", {})
+        local_jobs = raw.get("local", {}).get("jobs", {})
         merged_sources = {**prod_sources, **local_sources}
         merged_quality = {**prod_quality, **local_quality}
         merged_thresholds = {**prod_thresholds, **local_thresholds}
+        merged_engine = {**prod_engine, **local_engine}
+        merged_jobs = {**prod_jobs, **local_jobs}
         method = raw.get("local", {}).get("method", prod_method)
     else:
         merged_sources = prod_sources
         merged_quality = prod_quality
         merged_thresholds = prod_thresholds
+        merged_engine = prod_engine
+        merged_jobs = prod_jobs
         method = prod_method
 
     return CorrelationConfig(
         auto_sources=_parse_auto_sources(merged_sources),
         quality_filters=_parse_quality_filters(merged_quality),
         thresholds=_parse_thresholds(merged_thresholds),
+        engine=_parse_engine(merged_engine),
+        jobs=_parse_jobs(merged_jobs),
         method=method,
     )
 
@@ -304,13 +304,22 @@ async def _init_db_schema(conn):
         CREATE TABLE IF NOT EXISTS correlation_reports (
             id SERIAL PRIMARY KEY,
             user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
-            status VARCHAR(20) NOT NULL DEFAULT 'running',
+            status VARCHAR(20) NOT NULL DEFAULT 'queued',
             period_start DATE NOT NULL,
             period_end DATE NOT NULL,
             created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            started_at TIMESTAMPTZ,
+            heartbeat_at TIMESTAMPTZ,
+            phase VARCHAR(60),
+            progress REAL NOT NULL DEFAULT 0,
+            attempt INTEGER NOT NULL DEFAULT 0,
             finished_at TIMESTAMPTZ
         )
     """)
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_correlation_reports_active
+            ON correlation_reports(status, created_at) WHERE status IN ('queued', 'running', 'cancelling')
+    """)
 
     await conn.execute("""
         CREATE TABLE IF NOT EXISTS correlation_pairs (
@@ -330,7 +339,13 @@ async def _init_db_schema(conn):
             data_points INTEGER NOT NULL DEFAULT 0,
             p_value FLOAT,
             quality_issue VARCHAR(30),
-            adjusted_p_value FLOAT
+            adjusted_p_value FLOAT,
+            abs_correlation FLOAT GENERATED ALWAYS AS (ABS(correlation)) STORED,
+            quality_class VARCHAR(5) GENERATED ALWAYS AS (
+                CASE WHEN quality_issue IS NULL THEN 'sig'
+                     WHEN quality_issue IN ('wide_ci', 'fisher_exact_high_p', 'fdr_high_p_value') THEN 'maybe'
+                     ELSE 'insig' END
+            ) STORED
         )
     """)
 
@@ -365,6 +380,17 @@ async def _init_db_schema(conn):
     await conn.execute("""
         ALTER TABLE correlation_pairs ADD COLUMN IF NOT EXISTS adjusted_p_value FLOAT
     """)
+    await conn.execute("""
+        ALTER TABLE correlation_pairs ADD COLUMN IF NOT EXISTS abs_correlation FLOAT
+            GENERATED ALWAYS AS (ABS(correlation)) STORED
+    """)
+    await conn.execute("""
+        ALTER TABLE correlation_pairs ADD COLUMN IF NOT EXISTS quality_class VARCHAR(5) GENERATED ALWAYS AS (
+            CASE WHEN quality_issue IS NULL THEN 'sig'
+                 WHEN quality_issue IN ('wide_ci', 'fisher_exact_high_p', 'fdr_high_p_value') THEN 'maybe'
+                 ELSE 'insig' END
+        ) STORED
+    """)
 
     # Correlation pair statuses (favorite / archived)
     await conn.execute("""
@@ -380,6 +406,42 @@ async def _init_db_schema(conn):
         )
     """)
 
+    # Per-report sufficient statistics for incremental recomputation
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS correlation_report_state (
+            report_id INTEGER PRIMARY KEY REFERENCES correlation_reports(id) ON DELETE CASCADE,
+            payload BYTEA NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """)
+
+    # Final per-source series of a report (DaySeries blobs) for pair charts
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS correlation_report_series (
+            report_id INTEGER NOT NULL REFERENCES correlation_reports(id) ON DELETE CASCADE,
+            source_key VARCHAR(100) NOT NULL,
+            payload BYTEA NOT NULL,
+            PRIMARY KEY (report_id, source_key)
+        )
+    """)
+
+    # Per-report category/status counts (read by GET correlation-report instead of a pair scan)
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS correlation_report_summary (
+            report_id INTEGER PRIMARY KEY REFERENCES correlation_reports(id) ON DELETE CASCADE,
+            strong_correlation FLOAT NOT NULL,
+            moderate_correlation FLOAT NOT NULL,
+            total INTEGER NOT NULL,
+            sig_strong INTEGER NOT NULL,
+            sig_medium INTEGER NOT NULL,
+            sig_weak INTEGER NOT NULL,
+            maybe INTEGER NOT NULL,
+            insig INTEGER NOT NULL,
+            favorite INTEGER NOT NULL,
+            archived INTEGER NOT NULL
+        )
+    """)
+
     await conn.execute("""
         ALTER TYPE metric_type ADD VALUE IF NOT EXISTS 'integration'
     """)
@@ -612,6 +674,18 @@ async def _init_db_schema(conn):
         CREATE INDEX IF NOT EXISTS idx_correlation_pairs_report
         ON correlation_pairs(report_id)
     """)
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_correlation_pairs_report_abs
+        ON correlation_pairs(report_id, abs_correlation, id)
+    """)
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_correlation_pairs_report_class_abs
+        ON correlation_pairs(report_id, quality_class, abs_correlation, id)
+    """)
+    await conn.execute("""
+        CREATE INDEX IF NOT EXISTS idx_correlation_pairs_report_keys
+        ON correlation_pairs(report_id, source_key_a, source_key_b, lag_days)
+    """)
     await conn.execute("""
         CREATE INDEX IF NOT EXISTS idx_corr_pair_statuses_user
         ON correlation_pair_statuses(user_id)
@@ -696,4 +770,13 @@ async def _init_db_schema(conn):
         CREATE INDEX IF NOT EXISTS idx_daily_layout_user ON daily_layout(user_id)
     """)
 
+    # Per-user invalidation counters for the daily summary cache (app.services.daily_cache)
+    await conn.execute("""
+        CREATE TABLE IF NOT EXISTS user_cache_versions (
+            user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+            config_version BIGINT NOT NULL DEFAULT 0,
+            entries_version BIGINT NOT NULL DEFAULT 0
+        )
+    """)
+
 
@@ -2,12 +2,24 @@
 
 from __future__ import annotations
 
+import hashlib
 import math
+from collections import OrderedDict
+from collections.abc import Sequence
 from dataclasses import dataclass
-from statistics import mean, median, stdev, variance
+
+import numpy as np
 
 from app.domain.enums import MetricType
 
+# Up to this many values the KDE is one exact (n_points × n) broadcast;
+# above it values are linearly binned onto KDE_GRID_SIZE nodes first.
+KDE_EXACT_MAX_N = 20_000
+KDE_GRID_SIZE = 4096
+KDE_CACHE_SIZE = 128
+
+_kde_cache: OrderedDict[tuple[bytes, int], tuple[list[float], list[float]]] = OrderedDict()
+
 
 @dataclass
 class HistogramBin:
@@ -68,16 +80,24 @@ def _bin_label(bin_start: float, bin_end: float, metric_type: str) -> str:
     return f"{format_value(bin_start, metric_type)}–{format_value(bin_end, metric_type)}"
 
 
+def _sorted_array(values: Sequence[float]) -> np.ndarray:
+    return np.sort(np.asarray(values, dtype=np.float64))
+
+
 def compute_histogram(
-    values: list[float], metric_type: str, n_bins: int | None = None,
+    values: Sequence[float], metric_type: str, n_bins: int | None = None,
 ) -> list[HistogramBin]:
     """Build histogram bins using Sturges' rule."""
-    n = len(values)
+    return _histogram(_sorted_array(values), metric_type, n_bins)
+
+
+def _histogram(arr: np.ndarray, metric_type: str, n_bins: int | None = None) -> list[HistogramBin]:
+    n = len(arr)
     if n == 0:
         return []
 
-    v_min = min(values)
-    v_max = max(values)
+    v_min = float(arr[0])
+    v_max = float(arr[-1])
 
     if n_bins is None:
         n_bins = max(5, min(20, math.ceil(1 + math.log2(n))))
@@ -91,6 +111,8 @@ def compute_histogram(
         )]
 
     bin_width = (v_max - v_min) / n_bins
+    idx = np.minimum(((arr - v_min) / bin_width).astype(np.int64), n_bins - 1)
+    counts = np.bincount(idx, minlength=n_bins)
     bins: list[HistogramBin] = []
     for i in range(n_bins):
         b_start = v_min + i * bin_width
@@ -98,34 +120,55 @@ def compute_histogram(
         bins.append(HistogramBin(
             bin_start=b_start,
             bin_end=b_end,
-            count=0,
+            count=int(counts[i]),
             label=_bin_label(b_start, b_end, metric_type),
         ))
+    return bins
 
-    for v in values:
-        idx = int((v - v_min) / bin_width)
-        if idx >= n_bins:
-            idx = n_bins - 1
-        bins[idx].count += 1
 
-    return bins
+def _kde_density(arr: np.ndarray, xs: np.ndarray, h: float) -> np.ndarray:
+    """Gaussian kernel sum at xs: exact broadcast, or linear binning onto a fine grid for large n."""
+    if len(arr) <= KDE_EXACT_MAX_N:
+        z = (xs[:, None] - arr[None, :]) / h
+        return np.exp(-0.5 * z * z).sum(axis=1)
+    # Each value is split between its two neighbouring grid nodes; the kernel
+    # is then summed over KDE_GRID_SIZE weighted nodes instead of n values.
+    grid = np.linspace(xs[0], xs[-1], KDE_GRID_SIZE)
+    pos = (arr - grid[0]) / (grid[1] - grid[0])
+    left = np.minimum(pos.astype(np.int64), KDE_GRID_SIZE - 2)
+    frac = pos - left
+    weights = np.bincount(left, weights=1.0 - frac, minlength=KDE_GRID_SIZE)
+    weights += np.bincount(left + 1, weights=frac, minlength=KDE_GRID_SIZE)
+    z = (xs[:, None] - grid[None, :]) / h
+    return (np.exp(-0.5 * z * z) * weights[None, :]).sum(axis=1)
 
 
 def compute_kde(
-    values: list[float], n_points: int = 50,
+    values: Sequence[float], n_points: int = 50,
 ) -> tuple[list[float], list[float]]:
     """Gaussian KDE with Silverman bandwidth."""
-    n = len(values)
-    if n < 2:
-        return [], []
+    return _kde(_sorted_array(values), n_points)
+
+
+def _kde(arr: np.ndarray, n_points: int = 50) -> tuple[list[float], list[float]]:
+    """KDE of a sorted array, cached by the values' digest and n_points.
 
-    s = stdev(values)
-    if s == 0:
+    A repeated distribution request over unchanged data skips the kernel
+    sums, while any edited entry changes the digest.
+    """
+    n = len(arr)
+    if n < 2 or arr[0] == arr[-1]:
         return [], []
 
-    sorted_vals = sorted(values)
-    q1 = sorted_vals[n // 4]
-    q3 = sorted_vals[(3 * n) // 4]
+    key = (hashlib.blake2b(arr.tobytes(), digest_size=16).digest(), n_points)
+    cached = _kde_cache.get(key)
+    if cached is not None:
+        _kde_cache.move_to_end(key)
+        return list(cached[0]), list(cached[1])
+
+    s = float(arr.std(ddof=1))
+    q1 = float(arr[n // 4])
+    q3 = float(arr[(3 * n) // 4])
     iqr = q3 - q1
 
     # Silverman's rule of thumb
@@ -133,39 +176,35 @@ def compute_kde(
     if h <= 0:
         h = s * (n ** -0.2)
 
-    v_min = min(values)
-    v_max = max(values)
     padding = 3 * h
-    x_start = v_min - padding
-    x_end = v_max + padding
+    x_start = float(arr[0]) - padding
+    x_end = float(arr[-1]) + padding
     step = (x_end - x_start) / (n_points - 1) if n_points > 1 else 1.0
+    xs = x_start + np.arange(n_points) * step
 
-    xs: list[float] = []
-    ys: list[float] = []
     coeff = 1.0 / (n * h * math.sqrt(2 * math.pi))
+    ys = _kde_density(arr, xs, h) * coeff
+    result = ([round(float(x), 4) for x in xs], [round(float(y), 6) for y in ys])
 
-    for i in range(n_points):
-        x = x_start + i * step
-        density = 0.0
-        for v in values:
-            z = (x - v) / h
-            density += math.exp(-0.5 * z * z)
-        density *= coeff
-        xs.append(round(x, 4))
-        ys.append(round(density, 6))
+    _kde_cache[key] = result
+    if len(_kde_cache) > KDE_CACHE_SIZE:
+        _kde_cache.popitem(last=False)
+    return list(result[0]), list(result[1])
 
-    return xs, ys
 
-
-def compute_stats(values: list[float]) -> DistributionStats:
+def compute_stats(values: Sequence[float]) -> DistributionStats:
     """Compute descriptive statistics including skewness and kurtosis."""
-    n = len(values)
-    m = mean(values)
-    med = median(values)
+    return _stats(_sorted_array(values))
+
 
-    if n < 2:
+def _stats(arr: np.ndarray) -> DistributionStats:
+    n = len(arr)
+    m = float(arr.mean())
+    med = float(np.median(arr))
+
+    if n < 2 or arr[0] == arr[-1]:
         return DistributionStats(
-            mean=round(m, 4),
+            mean=round(float(arr[0]) if n else m, 4),
             median=round(med, 4),
             variance=0.0,
             std_dev=0.0,
@@ -173,25 +212,21 @@ def compute_stats(values: list[float]) -> DistributionStats:
             kurtosis=None,
         )
 
-    var = variance(values)
-    sd = stdev(values)
-
-    skew: float | None = None
-    kurt: float | None = None
+    dev = arr - m
+    dev2 = dev * dev
+    var = float(dev2.sum()) / (n - 1)
+    sd = math.sqrt(var)
 
-    if sd > 0:
-        skew = sum((v - m) ** 3 for v in values) / n / (sd ** 3)
-        kurt = sum((v - m) ** 4 for v in values) / n / (sd ** 4) - 3.0
-        skew = round(skew, 4)
-        kurt = round(kurt, 4)
+    skew = float((dev2 * dev).sum()) / n / (sd ** 3)
+    kurt = float((dev2 * dev2).sum()) / n / (sd ** 4) - 3.0
 
     return DistributionStats(
         mean=round(m, 4),
         median=round(med, 4),
         variance=round(var, 4),
         std_dev=round(sd, 4),
-        skewness=skew,
-        kurtosis=kurt,
+        skewness=round(skew, 4),
+        kurtosis=round(kurt, 4),
     )
 
 
@@ -252,12 +287,13 @@ def _build_display_stats(
 
 
 def compute_distribution(
-    values: list[float], metric_type: str,
+    values: Sequence[float], metric_type: str,
 ) -> DistributionResult:
-    """Compute full distribution analysis: histogram + KDE + stats."""
-    bins = compute_histogram(values, metric_type)
-    kde_x, kde_y = compute_kde(values)
-    stats = compute_stats(values)
+    """Compute full distribution analysis: histogram + KDE + stats from one sorted array."""
+    arr = _sorted_array(values)
+    bins = _histogram(arr, metric_type)
+    kde_x, kde_y = _kde(arr)
+    stats = _stats(arr)
     display = _build_display_stats(stats, metric_type)
     return DistributionResult(
         bins=bins,
@@ -265,5 +301,5 @@ def compute_distribution(
         kde_y=kde_y,
         stats=stats,
         display_stats=display,
-        n=len(values),
+        n=len(arr),
     )
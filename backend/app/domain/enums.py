@@ -44,9 +44,12 @@ __all__ = [
 
 class ReportStatus(str, Enum):
     """Статус корреляционного отчёта (correlation_reports.status)."""
+    QUEUED = "queued"
     RUNNING = "running"
+    CANCELLING = "cancelling"
     DONE = "done"
     ERROR = "error"
+    CANCELLED = "cancelled"
 
 
 class CorrelationStrength(str, Enum):
@@ -42,3 +42,11 @@ class ConflictError(DomainError):
     def __init__(self, detail: str) -> None:
         self.detail = detail
         super().__init__(detail)
+
+
+class ReportCancelledError(DomainError):
+    """Отчёт отменён более новым запросом того же пользователя."""
+
+    def __init__(self, report_id: int) -> None:
+        self.report_id = report_id
+        super().__init__(f"Correlation report {report_id} was cancelled")
@@ -8,13 +8,23 @@ Token format (JSONB):
   {"type": "lparen"}
   {"type": "rparen"}
 
-Evaluation uses recursive descent with standard operator precedence:
+Formulas are parsed once with recursive descent and standard operator
+precedence, then compiled (see compile_formula):
   comparison = expr (('>' | '<') expr)?
   expr       = term (('+' | '-') term)*
   term       = factor (('*' | '/') factor)*
   factor     = '(' expr ')' | metric_ref | number
 """
 
+from __future__ import annotations
+
+import json
+import math
+from collections.abc import Callable, Mapping
+from functools import lru_cache
+
+import numpy as np
+
 from app.domain.constants import MINUTES_PER_DAY
 from app.domain.enums import MetricType
 
@@ -23,6 +33,10 @@ class _MissingValue(Exception):
     pass
 
 
+class _InvalidFormula(Exception):
+    pass
+
+
 def get_referenced_metric_ids(tokens: list[dict]) -> list[int]:
     return [t["id"] for t in tokens if t.get("type") == "metric"]
 
@@ -150,16 +164,85 @@ def convert_metric_value(
 
 def evaluate_formula(
     tokens: list[dict],
-    values_by_id: dict[int, float | None],
+    values_by_id: Mapping[int, float | None],
     result_type: str,
 ) -> bool | int | float | str | None:
     if not tokens:
         return None
-    try:
-        val, pos = _parse_comparison(tokens, 0, values_by_id)
-        return _format_result(val, result_type)
-    except (ZeroDivisionError, _MissingValue):
-        return None
+    value = compile_formula(tokens)(values_by_id)
+    return None if value is None else _format_result(value, result_type)
+
+
+def evaluate_formula_series(
+    tokens: list[dict],
+    columns: Mapping[int, np.ndarray],
+    length: int,
+    result_type: str,
+) -> list[float | None]:
+    """Numeric result per position of date-aligned source columns (NaN = no value).
+
+    Same semantics as evaluate_formula day by day: a missing operand or a
+    division by zero gives None, and the result is what the formatted
+    value of result_type means as a number (bool → 1/0, time → minutes
+    of day, duration → whole minutes, int/float → rounded).
+    """
+    if not tokens:
+        return [None] * length
+    raw = compile_formula(tokens).evaluate_arrays(columns, length)
+    return [None if math.isnan(v) else formula_result_number(v, result_type) for v in raw.tolist()]
+
+
+def formula_result_number(value: float, result_type: str) -> float:
+    """The number behind _format_result(value, result_type)."""
+    if result_type == MetricType.bool:
+        return 1.0 if value > 0 else 0.0
+    if result_type == "int":
+        return float(round(value))
+    if result_type == MetricType.time:
+        return float(int(value) % MINUTES_PER_DAY)
+    if result_type == MetricType.duration:
+        return float(max(0, int(round(value))))
+    return float(round(value, 4))
+
+
+class CompiledFormula:
+    """Формула, разобранная один раз в замыкания: скалярное и по массивам."""
+
+    __slots__ = ("_scalar", "_vector")
+
+    def __init__(self, tokens: list[dict]) -> None:
+        try:
+            node, _pos = _parse_comparison(tokens, 0)
+        except _InvalidFormula:
+            node = None
+        self._scalar = _scalar_closure(node) if node is not None else None
+        self._vector = _vector_closure(node) if node is not None else None
+
+    def __call__(self, values_by_id: Mapping[int, float | None]) -> float | None:
+        """Raw value for one day, None if an operand is missing or a divisor is zero."""
+        if self._scalar is None:
+            return None
+        try:
+            return self._scalar(values_by_id)
+        except (ZeroDivisionError, _MissingValue):
+            return None
+
+    def evaluate_arrays(self, columns: Mapping[int, np.ndarray], length: int) -> np.ndarray:
+        """Raw values over aligned float64 columns; NaN where __call__ would give None."""
+        if self._vector is None:
+            return np.full(length, np.nan)
+        with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+            return np.broadcast_to(self._vector(columns, length), (length,)).astype(np.float64)
+
+
+def compile_formula(tokens: list[dict]) -> CompiledFormula:
+    """Compiled formula, cached by the canonical JSON of its tokens."""
+    return _compile_cached(json.dumps(tokens, sort_keys=True))
+
+
+@lru_cache(maxsize=1024)
+def _compile_cached(key: str) -> CompiledFormula:
+    return CompiledFormula(json.loads(key))
 
 
 def _format_result(value: float, result_type: str):
@@ -181,71 +264,132 @@ def _format_result(value: float, result_type: str):
     return round(value, 4)
 
 
-def _parse_comparison(tokens, pos, values):
-    left, pos = _parse_expr(tokens, pos, values)
+# ── Parser: tokens → AST ──────────────────────────────────────────
+# Nodes: ("number", float) | ("metric", id) | (op, left, right).
+# A token sequence the grammar cannot read raises _InvalidFormula and the
+# formula evaluates to None for every day, as the old per-day parser did.
+
+
+def _parse_comparison(tokens, pos):
+    left, pos = _parse_expr(tokens, pos)
     if pos < len(tokens):
         t = tokens[pos]
         if t.get("type") == "op" and t.get("value") in (">", "<"):
             op = t["value"]
             pos += 1
-            right, pos = _parse_expr(tokens, pos, values)
-            left = 1.0 if (left > right if op == ">" else left < right) else 0.0
+            right, pos = _parse_expr(tokens, pos)
+            left = (op, left, right)
     return left, pos
 
 
-def _parse_expr(tokens, pos, values):
-    left, pos = _parse_term(tokens, pos, values)
+def _parse_expr(tokens, pos):
+    left, pos = _parse_term(tokens, pos)
     while pos < len(tokens):
         t = tokens[pos]
         if t.get("type") == "op" and t.get("value") in ("+", "-"):
             op = t["value"]
             pos += 1
-            right, pos = _parse_term(tokens, pos, values)
-            if op == "+":
-                left = left + right
-            else:
-                left = left - right
+            right, pos = _parse_term(tokens, pos)
+            left = (op, left, right)
         else:
             break
     return left, pos
 
 
-def _parse_term(tokens, pos, values):
-    left, pos = _parse_factor(tokens, pos, values)
+def _parse_term(tokens, pos):
+    left, pos = _parse_factor(tokens, pos)
     while pos < len(tokens):
         t = tokens[pos]
         if t.get("type") == "op" and t.get("value") in ("*", "/"):
             op = t["value"]
             pos += 1
-            right, pos = _parse_factor(tokens, pos, values)
-            if op == "*":
-                left = left * right
-            else:
-                if right == 0:
-                    raise ZeroDivisionError()
-                left = left / right
+            right, pos = _parse_factor(tokens, pos)
+            left = (op, left, right)
         else:
             break
     return left, pos
 
 
-def _parse_factor(tokens, pos, values):
+def _parse_factor(tokens, pos):
     if pos >= len(tokens):
-        raise _MissingValue()
+        raise _InvalidFormula()
     t = tokens[pos]
     tt = t.get("type")
     if tt == "lparen":
         pos += 1
-        val, pos = _parse_expr(tokens, pos, values)
+        node, pos = _parse_expr(tokens, pos)
         if pos < len(tokens) and tokens[pos].get("type") == "rparen":
             pos += 1
-        return val, pos
+        return node, pos
     if tt == "number":
-        return float(t["value"]), pos + 1
+        return ("number", float(t["value"])), pos + 1
     if tt == "metric":
-        mid = t["id"]
-        v = values.get(mid)
-        if v is None:
-            raise _MissingValue()
-        return float(v), pos + 1
-    raise _MissingValue()
+        return ("metric", t["id"]), pos + 1
+    raise _InvalidFormula()
+
+
+# ── Closures: AST → callables ─────────────────────────────────────
+
+
+def _scalar_closure(node) -> Callable[[Mapping[int, float | None]], float]:
+    kind = node[0]
+    if kind == "number":
+        const = node[1]
+        return lambda values: const
+    if kind == "metric":
+        mid = node[1]
+
+        def metric(values):
+            v = values.get(mid)
+            if v is None:
+                raise _MissingValue()
+            return float(v)
+        return metric
+
+    left, right = _scalar_closure(node[1]), _scalar_closure(node[2])
+    if kind == "+":
+        return lambda values: left(values) + right(values)
+    if kind == "-":
+        return lambda values: left(values) - right(values)
+    if kind == "*":
+        return lambda values: left(values) * right(values)
+    if kind == "/":
+        def divide(values):
+            a, b = left(values), right(values)
+            if b == 0:
+                raise ZeroDivisionError()
+            return a / b
+        return divide
+    if kind == ">":
+        return lambda values: 1.0 if left(values) > right(values) else 0.0
+    return lambda values: 1.0 if left(values) < right(values) else 0.0
+
+
+def _vector_closure(node) -> Callable[[Mapping[int, np.ndarray], int], np.ndarray | float]:
+    kind = node[0]
+    if kind == "number":
+        const = node[1]
+        return lambda cols, n: const
+    if kind == "metric":
+        mid = node[1]
+        return lambda cols, n: cols[mid] if mid in cols else np.full(n, np.nan)
+
+    left, right = _vector_closure(node[1]), _vector_closure(node[2])
+    if kind == "+":
+        return lambda cols, n: np.add(left(cols, n), right(cols, n))
+    if kind == "-":
+        return lambda cols, n: np.subtract(left(cols, n), right(cols, n))
+    if kind == "*":
+        return lambda cols, n: np.multiply(left(cols, n), right(cols, n))
+    if kind == "/":
+        def divide(cols, n):
+            a, b = left(cols, n), right(cols, n)
+            return np.where(np.equal(b, 0), np.nan, np.divide(a, b))
+        return divide
+    compare = np.greater if kind == ">" else np.less
+
+    def comparison(cols, n):
+        a, b = left(cols, n), right(cols, n)
+        missing = np.isnan(a) | np.isnan(b)
+        return np.where(missing, np.nan, compare(a, b).astype(np.float64))
+    return comparison
@@ -8,9 +8,12 @@ from __future__ import annotations
 
 from collections import defaultdict
 from datetime import date as date_type, datetime, timezone
+from functools import lru_cache
 from typing import TYPE_CHECKING
 from urllib.parse import urlparse
 
+import numpy as np
+
 if TYPE_CHECKING:
     from app.repositories.integrations_repository import IntegrationsRepository
 
@@ -27,9 +30,9 @@ async def process_and_store(
     Returns:
         {"total_seconds": int, "active_seconds": int, "apps": [...], "domains": [...]}
     """
-    active_intervals = _build_active_intervals(afk_events)
+    active_intervals, breaks = _scan_afk_events(afk_events)
 
-    app_durations = _compute_app_durations(window_events, active_intervals)
+    app_durations, ctx_switches = _scan_window_events(window_events, active_intervals)
 
     total_seconds = sum(int(e.get("duration", 0)) for e in window_events)
     active_seconds = sum(app_durations.values())
@@ -42,8 +45,6 @@ async def process_and_store(
     first_activity, last_activity = _compute_time_boundaries(active_intervals, for_date)
     afk_seconds = _compute_afk_time(active_intervals, first_activity, last_activity)
     longest_session = _compute_longest_session(active_intervals)
-    ctx_switches = _compute_context_switches(window_events, active_intervals)
-    breaks = _compute_break_count(afk_events)
 
     async with repo.conn.transaction():
         await repo.upsert_aw_daily_summary(
@@ -84,14 +85,23 @@ async def process_and_store(
     }
 
 
-def _build_active_intervals(afk_events: list[dict]) -> list[tuple[float, float]]:
-    """Build sorted, merged list of (start_ts, end_ts) where user is NOT afk."""
+def _scan_afk_events(
+    afk_events: list[dict], break_threshold: int = 300,
+) -> tuple[list[tuple[float, float]], int]:
+    """One pass over AFK events: merged active intervals and the number of breaks.
+
+    Intervals are sorted, merged (start_ts, end_ts) spans where the user is NOT
+    afk; a break is an AFK period of at least ``break_threshold`` seconds.
+    """
     intervals = []
+    breaks = 0
     for e in afk_events:
-        if e.get("data", {}).get("status") == "not-afk":
+        status = e.get("data", {}).get("status")
+        if status == "not-afk":
             start = _parse_ts(e["timestamp"])
-            end = start + float(e.get("duration", 0))
-            intervals.append((start, end))
+            intervals.append((start, start + float(e.get("duration", 0))))
+        elif status == "afk" and float(e.get("duration", 0)) >= break_threshold:
+            breaks += 1
     intervals.sort()
     merged = []
     for s, e in intervals:
@@ -99,7 +109,81 @@ def _build_active_intervals(afk_events: list[dict]) -> list[tuple[float, float]]
             merged[-1] = (merged[-1][0], max(merged[-1][1], e))
         else:
             merged.append((s, e))
-    return merged
+    return merged, breaks
+
+
+def _build_active_intervals(afk_events: list[dict]) -> list[tuple[float, float]]:
+    """Build sorted, merged list of (start_ts, end_ts) where user is NOT afk."""
+    return _scan_afk_events(afk_events)[0]
+
+
+def _compute_break_count(afk_events: list[dict], threshold: int = 300) -> int:
+    """Count AFK periods longer than threshold (default 5 min)."""
+    return _scan_afk_events(afk_events, threshold)[1]
+
+
+def _event_spans(events: list[dict]) -> tuple[np.ndarray, np.ndarray]:
+    """Start and end Unix timestamps of events as float arrays."""
+    n = len(events)
+    starts = np.fromiter((_parse_ts(e["timestamp"]) for e in events), dtype=float, count=n)
+    durations = np.fromiter((float(e.get("duration", 0)) for e in events), dtype=float, count=n)
+    return starts, starts + durations
+
+
+def _active_overlaps(
+    starts: np.ndarray, ends: np.ndarray, intervals: list[tuple[float, float]],
+) -> np.ndarray:
+    """Active seconds inside each [start, end] span.
+
+    ``intervals`` are sorted and disjoint, so active time up to any instant is
+    a running total over the intervals ending before it plus the part of the
+    one it falls into; a span's overlap is the difference at its two ends.
+    All boundaries are placed with one vectorized binary search instead of a
+    scan of the interval list per event.
+    """
+    if not intervals or len(starts) == 0:
+        return np.zeros(len(starts))
+    bounds = np.asarray(intervals, dtype=float)
+    i_start, i_end = bounds[:, 0], bounds[:, 1]
+    active_before = np.concatenate(([0.0], np.cumsum(i_end - i_start)))
+    last = len(i_start) - 1
+
+    def active_until(t: np.ndarray) -> np.ndarray:
+        k = np.searchsorted(i_end, t, side="right")
+        inside = np.clip(t - i_start[np.minimum(k, last)], 0.0, None)
+        return active_before[k] + np.where(k <= last, inside, 0.0)
+
+    return np.maximum(active_until(ends) - active_until(starts), 0.0)
+
+
+def _whole_seconds(durations: dict[str, float]) -> dict[str, int]:
+    # Round to AW's microsecond resolution first so float noise cannot drop a second
+    return {k: int(round(v, 6)) for k, v in durations.items()}
+
+
+def _scan_window_events(
+    window_events: list[dict],
+    active_intervals: list[tuple[float, float]],
+) -> tuple[dict[str, int], int]:
+    """Per-app active seconds and context switches in one pass over events in time order.
+
+    A context switch is an app change between consecutive events that have
+    any active time.
+    """
+    starts, ends = _event_spans(window_events)
+    active = _active_overlaps(starts, ends, active_intervals)
+    app_dur: dict[str, float] = defaultdict(float)
+    switches = 0
+    prev_app = None
+    for i in np.argsort(starts, kind="stable"):
+        app = window_events[i].get("data", {}).get("app", "unknown")
+        dur = float(active[i])
+        app_dur[app] += dur
+        if dur > 0:
+            if prev_app is not None and app != prev_app:
+                switches += 1
+            prev_app = app
+    return _whole_seconds(app_dur), switches
 
 
 def _compute_app_durations(
@@ -107,15 +191,23 @@ def _compute_app_durations(
     active_intervals: list[tuple[float, float]],
 ) -> dict[str, int]:
     """Compute per-app active duration in seconds."""
-    app_dur: dict[str, float] = defaultdict(float)
-    for e in window_events:
-        app = e.get("data", {}).get("app", "unknown")
-        start = _parse_ts(e["timestamp"])
-        duration = float(e.get("duration", 0))
-        end = start + duration
-        active_dur = _intersect_duration(start, end, active_intervals)
-        app_dur[app] += active_dur
-    return {k: int(v) for k, v in app_dur.items()}
+    return _scan_window_events(window_events, active_intervals)[0]
+
+
+def _compute_context_switches(
+    window_events: list[dict],
+    active_intervals: list[tuple[float, float]],
+) -> int:
+    """Count app changes during active time."""
+    return _scan_window_events(window_events, active_intervals)[1]
+
+
+@lru_cache(maxsize=4096)
+def _url_domain(url: str) -> str:
+    try:
+        return urlparse(url).netloc or url
+    except Exception:
+        return url
 
 
 def _compute_domain_durations(
@@ -123,39 +215,27 @@ def _compute_domain_durations(
     active_intervals: list[tuple[float, float]],
 ) -> dict[str, int]:
     """Compute per-domain active duration in seconds."""
+    starts, ends = _event_spans(web_events)
+    active = _active_overlaps(starts, ends, active_intervals)
     domain_dur: dict[str, float] = defaultdict(float)
-    for e in web_events:
-        url = e.get("data", {}).get("url", "")
-        try:
-            domain = urlparse(url).netloc or url
-        except Exception:
-            domain = url
-        start = _parse_ts(e["timestamp"])
-        duration = float(e.get("duration", 0))
-        end = start + duration
-        active_dur = _intersect_duration(start, end, active_intervals)
-        domain_dur[domain] += active_dur
-    return {k: int(v) for k, v in domain_dur.items()}
+    for e, dur in zip(web_events, active.tolist()):
+        domain_dur[_url_domain(e.get("data", {}).get("url", ""))] += dur
+    return _whole_seconds(domain_dur)
 
 
 def _intersect_duration(
     start: float, end: float, intervals: list[tuple[float, float]]
 ) -> float:
     """Calculate how much of [start, end] overlaps with the given sorted intervals."""
-    total = 0.0
-    for i_start, i_end in intervals:
-        if i_start >= end:
-            break
-        if i_end <= start:
-            continue
-        overlap_start = max(start, i_start)
-        overlap_end = min(end, i_end)
-        total += max(0, overlap_end - overlap_start)
-    return total
+    return float(_active_overlaps(np.array([start]), np.array([end]), intervals)[0])
 
 
+@lru_cache(maxsize=65536)
 def _parse_ts(ts_str: str) -> float:
-    """Parse ISO timestamp to Unix timestamp (float seconds)."""
+    """Parse ISO timestamp to Unix timestamp (float seconds).
+
+    Cached: window, web and AFK buckets share most of their boundaries.
+    """
     dt = datetime.fromisoformat(ts_str.replace("Z", "+00:00"))
     return dt.timestamp()
 
@@ -199,113 +279,9 @@ def _compute_longest_session(active_intervals: list[tuple[float, float]]) -> int
     return int(max(end - start for start, end in active_intervals))
 
 
-def _compute_context_switches(
-    window_events: list[dict],
-    active_intervals: list[tuple[float, float]],
-) -> int:
-    """Count app changes during active time."""
-    if not window_events or not active_intervals:
-        return 0
-    sorted_events = sorted(window_events, key=lambda e: _parse_ts(e["timestamp"]))
-    switches = 0
-    prev_app = None
-    for e in sorted_events:
-        start = _parse_ts(e["timestamp"])
-        dur = float(e.get("duration", 0))
-        end = start + dur
-        if _intersect_duration(start, end, active_intervals) <= 0:
-            continue
-        app = e.get("data", {}).get("app", "unknown")
-        if prev_app is not None and app != prev_app:
-            switches += 1
-        prev_app = app
-    return switches
-
-
-def _compute_break_count(afk_events: list[dict], threshold: int = 300) -> int:
-    """Count AFK periods longer than threshold (default 5 min)."""
-    count = 0
-    for e in afk_events:
-        if e.get("data", {}).get("status") == "afk":
-            dur = float(e.get("duration", 0))
-            if dur >= threshold:
-                count += 1
-    return count
-
-
 async def compute_integration_metrics(
     repo: IntegrationsRepository,
     for_date: date_type,
 ) -> None:
     """Compute values for all AW integration metrics for this user/date."""
-    from app.repositories.entry_repository import EntryRepository
-    entry_repo = EntryRepository(repo.conn, repo.user_id)
-
-    rows = await repo.get_aw_integration_metrics()
-    if not rows:
-        return
-
-    # Load daily summary once
-    summary = await repo.get_aw_summary_full(for_date)
-
-    # Unique apps count
-    unique_apps = None
-
-    for r in rows:
-        metric_id = r["metric_id"]
-        key = r["metric_key"]
-        value_type = r["value_type"]
-        value = None
-
-        if key == "active_screen_time":
-            value = (summary["active_seconds"] // 60) if summary else 0
-        elif key == "total_screen_time":
-            value = (summary["total_seconds"] // 60) if summary else 0
-        elif key == "first_activity":
-            if summary and summary["first_activity_time"]:
-                ts = summary["first_activity_time"]
-                value = f"{ts.hour:02d}:{ts.minute:02d}"
-            else:
-                continue  # no data — skip
-        elif key == "last_activity":
-            if summary and summary["last_activity_time"]:
-                ts = summary["last_activity_time"]
-                value = f"{ts.hour:02d}:{ts.minute:02d}"
-            else:
-                continue
-        elif key == "afk_time":
-            value = (summary["afk_seconds"] // 60) if summary else 0
-        elif key == "longest_session":
-            value = (summary["longest_session_seconds"] // 60) if summary else 0
-        elif key == "context_switches":
-            value = summary["context_switches"] if summary else 0
-        elif key == "break_count":
-            value = summary["break_count"] if summary else 0
-        elif key == "unique_apps":
-            if unique_apps is None:
-                unique_apps = await repo.get_unique_apps_count(for_date)
-            value = unique_apps
-        elif key == "category_time":
-            cat_id = r["activitywatch_category_id"]
-            if cat_id:
-                secs = await repo.get_category_time_seconds(for_date, cat_id)
-                value = secs // 60
-            else:
-                value = 0
-        elif key == "app_time":
-            app_name = r["config_app_name"]
-            if app_name:
-                secs = await repo.get_app_time_seconds(for_date, app_name)
-                value = secs // 60
-            else:
-                value = 0
-        else:
-            continue
-
-        # Upsert entry + value
-        existing = await repo.get_entry_by_metric_date(metric_id, for_date)
-        if existing:
-            await entry_repo.update_value(existing["id"], value, value_type, entry_date=for_date, metric_id=metric_id)
-        else:
-            entry_id = await repo.create_entry(metric_id, for_date)
-            await entry_repo.insert_value(entry_id, value, value_type, entry_date=for_date, metric_id=metric_id)
+    await repo.recompute_aw_integration_metrics(for_date)
@@ -9,10 +9,12 @@ from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 
+from app.analytics.compute_pool import shutdown_compute_executor
 from app.database import create_pool, close_pool, init_db, pool as app_pool
 from app.domain.exceptions import EntityNotFoundError, DuplicateEntityError, InvalidOperationError, ConflictError
 from app.migrations import run_migrations
 from app.routers import metrics, entries, daily, analytics, auth, export_import, integrations, categories, notes, insights, checkpoints, layout
+from app.services.report_queue import report_queue
 
 SLOW_REQUEST_MS = int(os.environ.get("SLOW_REQUEST_MS", "500"))
 _timing_logger = logging.getLogger("timing")
@@ -48,7 +50,10 @@ async def lifespan(app: FastAPI):
     await run_migrations(db_pool)
     async with db_pool.acquire() as conn:
         await conn.execute("ANALYZE")
+    report_queue.start()
     yield
+    await report_queue.stop()
+    shutdown_compute_executor()
     await close_pool()
 
 
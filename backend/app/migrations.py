@@ -918,6 +918,34 @@ MIGRATIONS = [
         CREATE INDEX IF NOT EXISTS idx_entries_free_interval
             ON entries(metric_id, user_id, date) WHERE is_free_interval;
     """),
+    (32, "correlation_report_queue", """
+        ALTER TABLE correlation_reports ALTER COLUMN status SET DEFAULT 'queued';
+        ALTER TABLE correlation_reports ADD COLUMN IF NOT EXISTS started_at TIMESTAMPTZ;
+        ALTER TABLE correlation_reports ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMPTZ;
+        ALTER TABLE correlation_reports ADD COLUMN IF NOT EXISTS phase VARCHAR(60);
+        ALTER TABLE correlation_reports ADD COLUMN IF NOT EXISTS progress REAL NOT NULL DEFAULT 0;
+        CREATE INDEX IF NOT EXISTS idx_correlation_reports_active
+            ON correlation_reports(status, created_at) WHERE status IN ('queued', 'running');
+    """),
+    (33, "correlation_pairs_keyset_columns", """
+        ALTER TABLE correlation_pairs ADD COLUMN IF NOT EXISTS abs_correlation FLOAT
+            GENERATED ALWAYS AS (ABS(correlation)) STORED;
+        ALTER TABLE correlation_pairs ADD COLUMN IF NOT EXISTS quality_class VARCHAR(5) GENERATED ALWAYS AS (
+            CASE WHEN quality_issue IS NULL THEN 'sig'
+                 WHEN quality_issue IN ('wide_ci', 'fisher_exact_high_p', 'fdr_high_p_value') THEN 'maybe'
+                 ELSE 'insig' END
+        ) STORED;
+        CREATE INDEX IF NOT EXISTS idx_correlation_pairs_report_abs
+            ON correlation_pairs(report_id, abs_correlation, id);
+        CREATE INDEX IF NOT EXISTS idx_correlation_pairs_report_class_abs
+            ON correlation_pairs(report_id, quality_class, abs_correlation, id);
+    """),
+    (34, "correlation_report_attempts", """
+        ALTER TABLE correlation_reports ADD COLUMN IF NOT EXISTS attempt INTEGER NOT NULL DEFAULT 0;
+        DROP INDEX IF EXISTS idx_correlation_reports_active;
+        CREATE INDEX IF NOT EXISTS idx_correlation_reports_active
+            ON correlation_reports(status, created_at) WHERE status IN ('queued', 'running', 'cancelling');
+    """),
 ]
 
 
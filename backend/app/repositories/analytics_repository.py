@@ -1,16 +1,34 @@
 """Repository for analytics SQL operations (router-facing)."""
 
+from collections.abc import AsyncIterator
 from datetime import date as date_type
 
 import asyncpg
 
 from app.correlation_config import ThresholdsConfig
+from app.domain.enums import PairStatus
 from app.repositories.base import BaseRepository
 
+_SUMMARY_FIELDS = ("total", "sig_strong", "sig_medium", "sig_weak", "maybe", "insig", "favorite", "archived")
+_SUMMARY_COLUMNS = ", ".join(_SUMMARY_FIELDS)
+
+
+def _category_thresholds(thresholds: ThresholdsConfig | None) -> tuple[float, float]:
+    if thresholds is None:
+        return 0.7, 0.3
+    return float(thresholds.strong_correlation), float(thresholds.moderate_correlation)
+
 
 class AnalyticsRepository(BaseRepository):
     """Data access for analytics endpoints (routers/analytics.py)."""
 
+    def __init__(self, conn: asyncpg.Connection, user_id: int) -> None:
+        super().__init__(conn, user_id)
+        # Per-metric series built by ValueFetcher, keyed by (metric_id,
+        # normalization, metric_type, start, end). Lives as long as the
+        # repository: one API request or one correlation report.
+        self.series_cache: dict[tuple[int, str, str, date_type, date_type], dict[str, float]] = {}
+
     # ── Metric lookups ──────────────────────────────────────────────
 
     async def get_metric_with_config(self, metric_id: int) -> asyncpg.Record | None:
@@ -23,6 +41,18 @@ class AnalyticsRepository(BaseRepository):
             metric_id, self.user_id,
         )
 
+    async def get_metrics_with_config(self, metric_ids: list[int]) -> dict[int, asyncpg.Record]:
+        """get_metric_with_config for many metrics in one query; unknown ids are absent."""
+        rows = await self.conn.fetch(
+            """SELECT md.*, cc.formula, cc.result_type, ic.value_type AS ic_value_type
+               FROM metric_definitions md
+               LEFT JOIN computed_config cc ON cc.metric_id = md.id
+               LEFT JOIN integration_config ic ON ic.metric_id = md.id
+               WHERE md.id = ANY($1) AND md.user_id = $2""",
+            list(metric_ids), self.user_id,
+        )
+        return {r["id"]: r for r in rows}
+
     async def get_metric_with_computed_config(self, metric_id: int) -> asyncpg.Record | None:
         return await self.conn.fetchrow(
             """SELECT md.*, cc.formula, cc.result_type
@@ -81,8 +111,9 @@ class AnalyticsRepository(BaseRepository):
             metric_id, start, end, self.user_id,
         )
 
-    async def get_bool_streak_rows(self, metric_id: int) -> list[asyncpg.Record]:
-        return await self.conn.fetch(
+    def iter_bool_streak_days(self, metric_id: int) -> AsyncIterator[asyncpg.Record]:
+        """Per-day all-true flag of a bool metric, newest day first (streamed)."""
+        return self._stream(
             """SELECT e.date, bool_and(vb.value) AS day_value
                FROM entries e
                JOIN values_bool vb ON vb.entry_id = e.id
@@ -94,11 +125,34 @@ class AnalyticsRepository(BaseRepository):
 
     # ── Streaks ──────────────────────────────────────────────────────
 
-    async def get_enabled_bool_metrics(self) -> list[asyncpg.Record]:
+    async def get_current_bool_streaks(self) -> list[asyncpg.Record]:
+        """Enabled bool metrics with a current streak > 0, in sort order.
+
+        The streak counts the latest entry days with an all-true value back to
+        the first day that is not: a running count of such breaks from the
+        newest day (gaps-and-islands) marks the current island as breaks = 0.
+        """
         return await self.conn.fetch(
-            """SELECT * FROM metric_definitions
-               WHERE enabled = TRUE AND user_id = $1 AND type = 'bool'
-               ORDER BY sort_order""",
+            """WITH days AS (
+                   SELECT e.metric_id, e.date, bool_and(vb.value) AS day_value
+                   FROM entries e
+                   JOIN values_bool vb ON vb.entry_id = e.id
+                   JOIN metric_definitions md ON md.id = e.metric_id
+                   WHERE e.user_id = $1 AND md.enabled = TRUE AND md.type = 'bool'
+                   GROUP BY e.metric_id, e.date
+               ),
+               islands AS (
+                   SELECT metric_id,
+                          COUNT(*) FILTER (WHERE day_value IS NOT TRUE)
+                              OVER (PARTITION BY metric_id ORDER BY date DESC) AS breaks
+                   FROM days
+               )
+               SELECT md.id, md.name, md.private, COUNT(*) AS current_streak
+               FROM islands i
+               JOIN metric_definitions md ON md.id = i.metric_id
+               WHERE i.breaks = 0
+               GROUP BY md.id
+               ORDER BY md.sort_order, md.id""",
             self.user_id,
         )
 
@@ -107,13 +161,27 @@ class AnalyticsRepository(BaseRepository):
     async def create_report(self, start: date_type, end: date_type) -> int:
         return await self.conn.fetchval(
             """INSERT INTO correlation_reports (user_id, status, period_start, period_end)
-               VALUES ($1, 'running', $2, $3) RETURNING id""",
+               VALUES ($1, 'queued', $2, $3) RETURNING id""",
             self.user_id, start, end,
         )
 
+    async def cancel_active_reports(self) -> None:
+        """Cancel the user's queued and running reports.
+
+        A running one becomes cancelling: it stops at its next phase and keeps
+        its concurrency slot until then, when its task deletes the row.
+        """
+        await self.conn.execute(
+            """UPDATE correlation_reports
+               SET status = CASE WHEN status = 'running' THEN 'cancelling' ELSE 'cancelled' END,
+                   finished_at = now()
+               WHERE user_id = $1 AND status IN ('queued', 'running')""",
+            self.user_id,
+        )
+
     async def get_all_reports(self) -> list[asyncpg.Record]:
         return await self.conn.fetch(
-            """SELECT id, status, period_start, period_end, created_at
+            """SELECT id, status, period_start, period_end, created_at, phase, progress
                FROM correlation_reports
                WHERE user_id = $1
                ORDER BY created_at DESC""",
@@ -123,32 +191,48 @@ class AnalyticsRepository(BaseRepository):
     async def get_report_pair_counts(
         self, report_id: int, thresholds: ThresholdsConfig | None = None,
     ) -> asyncpg.Record:
-        strong = thresholds.strong_correlation if thresholds else 0.7
-        moderate = thresholds.moderate_correlation if thresholds else 0.3
+        """Counts from correlation_report_summary; rebuilt by a pair scan if missing or thresholds changed."""
+        strong, moderate = _category_thresholds(thresholds)
+        row = await self.conn.fetchrow(
+            f"""SELECT {_SUMMARY_COLUMNS} FROM correlation_report_summary
+               WHERE report_id = $1 AND strong_correlation = $2 AND moderate_correlation = $3""",
+            report_id, strong, moderate,
+        )
+        if row is None:
+            row = await self.refresh_report_summary(report_id, thresholds)
+        return row
+
+    async def refresh_report_summary(
+        self, report_id: int, thresholds: ThresholdsConfig | None = None,
+    ) -> asyncpg.Record:
+        """Scan the report's pairs once and store category/status counts for these thresholds."""
+        strong, moderate = _category_thresholds(thresholds)
         return await self.conn.fetchrow(
-            f"""SELECT
+            f"""INSERT INTO correlation_report_summary
+                   (report_id, strong_correlation, moderate_correlation, {_SUMMARY_COLUMNS})
+               SELECT
+                   $1, $3::float, $4::float,
                    COUNT(*) AS total,
-                   COUNT(*) FILTER (WHERE quality_issue IS NULL AND ABS(correlation) > {strong}) AS sig_strong,
-                   COUNT(*) FILTER (WHERE quality_issue IS NULL AND ABS(correlation) > {moderate}
-                                    AND ABS(correlation) <= {strong}) AS sig_medium,
-                   COUNT(*) FILTER (WHERE quality_issue IS NULL AND ABS(correlation) <= {moderate}) AS sig_weak,
+                   COUNT(*) FILTER (WHERE quality_issue IS NULL AND ABS(correlation) > $3) AS sig_strong,
+                   COUNT(*) FILTER (WHERE quality_issue IS NULL AND ABS(correlation) > $4
+                                    AND ABS(correlation) <= $3) AS sig_medium,
+                   COUNT(*) FILTER (WHERE quality_issue IS NULL AND ABS(correlation) <= $4) AS sig_weak,
                    COUNT(*) FILTER (WHERE quality_issue IN ('wide_ci', 'fisher_exact_high_p')) AS maybe,
                    COUNT(*) FILTER (WHERE quality_issue IS NOT NULL
                                     AND quality_issue NOT IN ('wide_ci', 'fisher_exact_high_p')) AS insig,
-                   COUNT(*) FILTER (WHERE EXISTS (
-                       SELECT 1 FROM correlation_pair_statuses cps
-                       WHERE cps.user_id = $2 AND cps.source_key_a = cp.source_key_a
-                         AND cps.source_key_b = cp.source_key_b AND cps.lag_days = cp.lag_days
-                         AND cps.status = 'favorite'
-                   )) AS favorite,
-                   COUNT(*) FILTER (WHERE EXISTS (
-                       SELECT 1 FROM correlation_pair_statuses cps
-                       WHERE cps.user_id = $2 AND cps.source_key_a = cp.source_key_a
-                         AND cps.source_key_b = cp.source_key_b AND cps.lag_days = cp.lag_days
-                         AND cps.status = 'archived'
-                   )) AS archived
-               FROM correlation_pairs cp WHERE cp.report_id = $1""",
-            report_id, self.user_id,
+                   COUNT(*) FILTER (WHERE cps.status = 'favorite') AS favorite,
+                   COUNT(*) FILTER (WHERE cps.status = 'archived') AS archived
+               FROM correlation_pairs cp
+               LEFT JOIN correlation_pair_statuses cps
+                   ON cps.user_id = $2 AND cps.source_key_a = cp.source_key_a
+                   AND cps.source_key_b = cp.source_key_b AND cps.lag_days = cp.lag_days
+               WHERE cp.report_id = $1
+               ON CONFLICT (report_id) DO UPDATE SET
+                   strong_correlation = EXCLUDED.strong_correlation,
+                   moderate_correlation = EXCLUDED.moderate_correlation,
+                   {", ".join(f"{c} = EXCLUDED.{c}" for c in _SUMMARY_FIELDS)}
+               RETURNING {_SUMMARY_COLUMNS}""",
+            report_id, self.user_id, strong, moderate,
         )
 
     async def get_report_owned(self, report_id: int) -> asyncpg.Record | None:
@@ -175,11 +259,23 @@ class AnalyticsRepository(BaseRepository):
     async def fetch_pairs_page(
         self, report_id: int, cat_filter: str, metric_filter: str,
         args_base: list, limit: int, offset: int, status_filter: str = "",
+        after: tuple[float, int] | None = None,
     ) -> list[asyncpg.Record]:
-        limit_idx = len(args_base) + 1
-        offset_idx = len(args_base) + 2
+        """Page ordered by (abs_correlation, id) descending.
+
+        With `after` (the last row of the previous page) the page starts
+        right below it — a keyset seek instead of skipping `offset` rows.
+        """
+        args = [*args_base]
+        keyset = ""
+        if after is not None:
+            keyset = f" AND (cp.abs_correlation, cp.id) < (${len(args) + 1}, ${len(args) + 2})"
+            args.extend(after)
+            offset = 0
+        limit_idx = len(args) + 1
+        offset_idx = len(args) + 2
         return await self.conn.fetch(
-            f"""SELECT cp.id AS pair_id,
+            f"""SELECT cp.id AS pair_id, cp.abs_correlation,
                        cp.type_a, cp.type_b, cp.correlation, cp.data_points, cp.lag_days, cp.p_value, cp.quality_issue,
                        cp.metric_a_id, cp.metric_b_id, cp.checkpoint_a_id, cp.checkpoint_b_id,
                        cp.interval_a_id, cp.interval_b_id,
@@ -205,10 +301,10 @@ class AnalyticsRepository(BaseRepository):
                 LEFT JOIN correlation_pair_statuses cps
                     ON cps.user_id = {self.user_id} AND cps.source_key_a = cp.source_key_a
                     AND cps.source_key_b = cp.source_key_b AND cps.lag_days = cp.lag_days
-                WHERE cp.report_id = $1 {cat_filter}{metric_filter}{status_filter}
-                ORDER BY ABS(cp.correlation) DESC
+                WHERE cp.report_id = $1 {cat_filter}{metric_filter}{status_filter}{keyset}
+                ORDER BY cp.abs_correlation DESC, cp.id DESC
                 LIMIT ${limit_idx} OFFSET ${offset_idx}""",
-            *args_base, limit, offset,
+            *args, limit, offset,
         )
 
     # ── Pair statuses ────────────────────────────────────────────────
@@ -216,27 +312,65 @@ class AnalyticsRepository(BaseRepository):
     async def set_pair_status(
         self, source_key_a: str, source_key_b: str, lag_days: int, status: str,
     ) -> None:
-        """Upsert статуса пары (INSERT ON CONFLICT UPDATE)."""
-        await self.conn.execute(
-            """INSERT INTO correlation_pair_statuses
-                   (user_id, source_key_a, source_key_b, lag_days, status)
-               VALUES ($1, $2, $3, $4, $5)
-               ON CONFLICT (user_id, source_key_a, source_key_b, lag_days)
-               DO UPDATE SET status = $5, created_at = now()""",
-            self.user_id, source_key_a, source_key_b, lag_days, status,
-        )
+        """Upsert статуса пары (INSERT ON CONFLICT UPDATE) и счётчиков в сводках отчётов."""
+        async with self.conn.transaction():
+            old = await self._lock_pair_status(source_key_a, source_key_b, lag_days)
+            await self.conn.execute(
+                """INSERT INTO correlation_pair_statuses
+                       (user_id, source_key_a, source_key_b, lag_days, status)
+                   VALUES ($1, $2, $3, $4, $5)
+                   ON CONFLICT (user_id, source_key_a, source_key_b, lag_days)
+                   DO UPDATE SET status = $5, created_at = now()""",
+                self.user_id, source_key_a, source_key_b, lag_days, status,
+            )
+            await self._adjust_summary_status_counts(source_key_a, source_key_b, lag_days, old, status)
 
     async def remove_pair_status(
         self, source_key_a: str, source_key_b: str, lag_days: int,
     ) -> None:
-        """Удалить статус пары."""
-        await self.conn.execute(
-            """DELETE FROM correlation_pair_statuses
-               WHERE user_id = $1 AND source_key_a = $2
-                 AND source_key_b = $3 AND lag_days = $4""",
+        """Удалить статус пары и вычесть его из сводок отчётов."""
+        async with self.conn.transaction():
+            old = await self._lock_pair_status(source_key_a, source_key_b, lag_days)
+            await self.conn.execute(
+                """DELETE FROM correlation_pair_statuses
+                   WHERE user_id = $1 AND source_key_a = $2
+                     AND source_key_b = $3 AND lag_days = $4""",
+                self.user_id, source_key_a, source_key_b, lag_days,
+            )
+            await self._adjust_summary_status_counts(source_key_a, source_key_b, lag_days, old, None)
+
+    async def _lock_pair_status(self, source_key_a: str, source_key_b: str, lag_days: int) -> str | None:
+        return await self.conn.fetchval(
+            """SELECT status FROM correlation_pair_statuses
+               WHERE user_id = $1 AND source_key_a = $2 AND source_key_b = $3 AND lag_days = $4
+               FOR UPDATE""",
             self.user_id, source_key_a, source_key_b, lag_days,
         )
 
+    async def _adjust_summary_status_counts(
+        self, source_key_a: str, source_key_b: str, lag_days: int,
+        old: str | None, new: str | None,
+    ) -> None:
+        """Shift favorite/archived counters of every stored summary that contains this pair."""
+        d_fav = (new == PairStatus.FAVORITE) - (old == PairStatus.FAVORITE)
+        d_arch = (new == PairStatus.ARCHIVED) - (old == PairStatus.ARCHIVED)
+        if not d_fav and not d_arch:
+            return
+        await self.conn.execute(
+            """UPDATE correlation_report_summary s
+               SET favorite = s.favorite + $5 * c.n, archived = s.archived + $6 * c.n
+               FROM (
+                   SELECT cp.report_id, COUNT(*) AS n
+                   FROM correlation_pairs cp
+                   JOIN correlation_reports r ON r.id = cp.report_id
+                   WHERE r.user_id = $1 AND cp.source_key_a = $2
+                     AND cp.source_key_b = $3 AND cp.lag_days = $4
+                   GROUP BY cp.report_id
+               ) c
+               WHERE s.report_id = c.report_id""",
+            self.user_id, source_key_a, source_key_b, lag_days, d_fav, d_arch,
+        )
+
     async def get_metric_names_icons(self, ids: list[int]) -> list[asyncpg.Record]:
         if not ids:
             return []
@@ -413,31 +547,118 @@ class AnalyticsRepository(BaseRepository):
             metric_id, self.user_id, start, end,
         )
 
+    async def fetch_free_interval_times(
+        self, metric_id: int, start: date_type, end: date_type,
+    ) -> list[asyncpg.Record]:
+        return await self.conn.fetch(
+            "SELECT date, time_start, time_end FROM entries "
+            "WHERE metric_id = $1 AND user_id = $2 AND date >= $3 AND date <= $4 "
+            "AND is_free_interval = true AND time_start IS NOT NULL AND time_end IS NOT NULL",
+            metric_id, self.user_id, start, end,
+        )
+
+    # ── Bulk loads (whole user, one query per table) ─────────────────
+    # Entry/value loads are streamed: they grow with the user's history.
+
+    def iter_all_entries_values(
+        self, value_table: str, extra_cols: str, start: date_type, end: date_type,
+    ) -> AsyncIterator[asyncpg.Record]:
+        return self._stream(
+            f"""SELECT e.metric_id, e.checkpoint_id, e.interval_id, e.is_free_interval,
+                       e.date, v.value{extra_cols}
+                FROM entries e
+                JOIN {value_table} v ON v.entry_id = e.id
+                WHERE e.user_id = $1 AND e.date >= $2 AND e.date <= $3
+                ORDER BY e.date""",
+            self.user_id, start, end,
+        )
+
+    def iter_all_enum_entries(self, start: date_type, end: date_type) -> AsyncIterator[asyncpg.Record]:
+        return self._stream(
+            """SELECT e.metric_id, e.checkpoint_id, e.interval_id, e.date, ve.selected_option_ids
+               FROM entries e
+               JOIN values_enum ve ON ve.entry_id = e.id
+               WHERE e.user_id = $1 AND e.date >= $2 AND e.date <= $3
+               ORDER BY e.date""",
+            self.user_id, start, end,
+        )
+
+    async def fetch_all_note_counts(self, start: date_type, end: date_type) -> list[asyncpg.Record]:
+        return await self.conn.fetch(
+            """SELECT metric_id, date, COUNT(*) as cnt FROM notes
+               WHERE user_id = $1 AND date >= $2 AND date <= $3
+               GROUP BY metric_id, date""",
+            self.user_id, start, end,
+        )
+
+    async def fetch_all_free_interval_times(self, start: date_type, end: date_type) -> list[asyncpg.Record]:
+        return await self.conn.fetch(
+            "SELECT metric_id, date, time_start, time_end FROM entries "
+            "WHERE user_id = $1 AND date >= $2 AND date <= $3 "
+            "AND is_free_interval = true AND time_start IS NOT NULL AND time_end IS NOT NULL",
+            self.user_id, start, end,
+        )
+
+    async def fetch_all_enum_options_enabled(self) -> list[asyncpg.Record]:
+        return await self.conn.fetch(
+            """SELECT eo.metric_id, eo.id, eo.label, eo.sort_order
+               FROM enum_options eo
+               JOIN metric_definitions md ON md.id = eo.metric_id
+               WHERE md.user_id = $1 AND eo.enabled = TRUE
+               ORDER BY eo.metric_id, eo.sort_order""",
+            self.user_id,
+        )
+
+    async def get_all_metric_types(self) -> dict[int, str]:
+        rows = await self.conn.fetch(
+            "SELECT id, type FROM metric_definitions WHERE user_id = $1", self.user_id,
+        )
+        return {r["id"]: r["type"] for r in rows}
+
+    async def get_all_metrics_with_multiple_checkpoints(self) -> set[int]:
+        rows = await self.conn.fetch(
+            """SELECT mc.metric_id FROM metric_checkpoints mc
+               JOIN metric_definitions md ON md.id = mc.metric_id
+               WHERE md.user_id = $1 AND mc.enabled = TRUE
+               GROUP BY mc.metric_id HAVING COUNT(*) >= 2""",
+            self.user_id,
+        )
+        return {r["metric_id"] for r in rows}
+
+    async def get_all_scale_config_bounds(self) -> dict[int, tuple[int | None, int | None]]:
+        rows = await self.conn.fetch(
+            """SELECT sc.metric_id, sc.scale_min, sc.scale_max
+               FROM scale_config sc
+               JOIN metric_definitions md ON md.id = sc.metric_id
+               WHERE md.user_id = $1""",
+            self.user_id,
+        )
+        return {r["metric_id"]: (r["scale_min"], r["scale_max"]) for r in rows}
+
     # ── Pair chart ───────────────────────────────────────────────────
 
     async def get_pair_with_report(self, pair_id: int) -> asyncpg.Record | None:
+        """Pair with its report period plus privacy, name and computed result type of both metrics."""
         return await self.conn.fetchrow(
-            """SELECT cp.*, cr.period_start, cr.period_end, cr.user_id
+            """SELECT cp.*, cr.period_start, cr.period_end, cr.user_id,
+                      COALESCE(ma.private, FALSE) AS private_a, COALESCE(mb.private, FALSE) AS private_b,
+                      ma.name AS name_a, mb.name AS name_b,
+                      cca.result_type AS result_type_a, ccb.result_type AS result_type_b
                FROM correlation_pairs cp
                JOIN correlation_reports cr ON cr.id = cp.report_id
+               LEFT JOIN metric_definitions ma ON ma.id = cp.metric_a_id
+               LEFT JOIN metric_definitions mb ON mb.id = cp.metric_b_id
+               LEFT JOIN computed_config cca ON cca.metric_id = cp.metric_a_id
+               LEFT JOIN computed_config ccb ON ccb.metric_id = cp.metric_b_id
                WHERE cp.id = $1""",
             pair_id,
         )
 
-    async def get_metric_privacy(self, metric_id: int) -> bool:
-        row = await self.conn.fetchrow(
-            "SELECT private FROM metric_definitions WHERE id = $1", metric_id,
-        )
-        return row["private"] if row else False
-
-    async def get_computed_result_type(self, metric_id: int) -> str | None:
-        cfg = await self.conn.fetchrow(
-            "SELECT result_type FROM computed_config WHERE metric_id = $1", metric_id,
-        )
-        return cfg["result_type"] if cfg else None
-
-    async def get_metric_name(self, metric_id: int) -> str | None:
-        row = await self.conn.fetchrow(
-            "SELECT name FROM metric_definitions WHERE id = $1", metric_id,
+    async def load_report_series(self, report_id: int, source_keys: list[str]) -> dict[str, bytes]:
+        """Stored DaySeries blobs of a report by source_key; keys outside the budget are absent."""
+        rows = await self.conn.fetch(
+            """SELECT source_key, payload FROM correlation_report_series
+               WHERE report_id = $1 AND source_key = ANY($2)""",
+            report_id, source_keys,
         )
-        return row["name"] if row else None
+        return {r["source_key"]: r["payload"] for r in rows}
@@ -1,11 +1,14 @@
 """Base repository — общий паттерн доступа к данным с изоляцией по user_id."""
 
+from collections.abc import AsyncIterator
 from typing import Any
 
 import asyncpg
 
 from app.domain.exceptions import EntityNotFoundError
 
+STREAM_BATCH_SIZE = 1000
+
 
 class BaseRepository:
     """Базовый репозиторий с привязкой к соединению и пользователю."""
@@ -34,10 +37,53 @@ class BaseRepository:
             raise EntityNotFoundError(table, entity_id)
         return row
 
+    async def _stream_batches(
+        self, query: str, *args: Any, batch_size: int = STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[list[asyncpg.Record]]:
+        """Yield the query result in lists of at most ``batch_size`` records.
+
+        Reads through a server-side cursor, so only one batch is held client-side.
+        Cursors need a transaction: the caller's is reused, otherwise a read-only
+        one is held until the result is exhausted — consume it to the end (or
+        close the generator) before the connection is released.
+        """
+        if self.conn.is_in_transaction():
+            cursor = await self.conn.cursor(query, *args)
+            while batch := await cursor.fetch(batch_size):
+                yield batch
+            return
+        async with self.conn.transaction(readonly=True):
+            cursor = await self.conn.cursor(query, *args)
+            while batch := await cursor.fetch(batch_size):
+                yield batch
+
+    async def _stream(
+        self, query: str, *args: Any, batch_size: int = STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[asyncpg.Record]:
+        """Yield the query result record by record (see ``_stream_batches``)."""
+        async for batch in self._stream_batches(query, *args, batch_size=batch_size):
+            for r in batch:
+                yield r
+
     def transaction(self):
         """Return a transaction context manager for the underlying connection."""
         return self.conn.transaction()
 
+    async def bump_cache_versions(self, *, config: bool = False, entries: bool = False) -> None:
+        """Invalidate the user's cached daily summaries.
+
+        ``config`` — metric definitions, checkpoints, intervals, enum options or layout
+        changed; ``entries`` — entries, values or notes changed.
+        """
+        await self.conn.execute(
+            """INSERT INTO user_cache_versions (user_id, config_version, entries_version)
+               VALUES ($1, $2, $3)
+               ON CONFLICT (user_id) DO UPDATE SET
+                   config_version = user_cache_versions.config_version + EXCLUDED.config_version,
+                   entries_version = user_cache_versions.entries_version + EXCLUDED.entries_version""",
+            self.user_id, int(config), int(entries),
+        )
+
     async def _fetch_all_owned(
         self,
         table: str,
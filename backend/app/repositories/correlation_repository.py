@@ -8,6 +8,14 @@ import asyncpg
 
 from app.repositories.base import BaseRepository
 
+# correlation_pairs columns in CorrelationPairResult field order.
+PAIR_COLUMNS: tuple[str, ...] = (
+    "report_id", "metric_a_id", "metric_b_id", "checkpoint_a_id", "checkpoint_b_id",
+    "interval_a_id", "interval_b_id",
+    "source_key_a", "source_key_b", "type_a", "type_b", "correlation", "data_points", "lag_days", "p_value",
+    "quality_issue", "adjusted_p_value",
+)
+
 
 class CorrelationRepository(BaseRepository):
     """Data access for correlation engine (analytics/correlation_engine.py)."""
@@ -80,31 +88,132 @@ class CorrelationRepository(BaseRepository):
         )
         return {r["metric_id"]: r["multi_select"] for r in rows}
 
-    async def insert_pairs(self, pairs: list) -> None:
-        """Insert CorrelationPairResult list into correlation_pairs."""
-        if pairs:
-            await self.conn.executemany(
-                """INSERT INTO correlation_pairs
-                   (report_id, metric_a_id, metric_b_id, checkpoint_a_id, checkpoint_b_id,
-                    interval_a_id, interval_b_id,
-                    source_key_a, source_key_b, type_a, type_b, correlation, data_points, lag_days, p_value, quality_issue,
-                    adjusted_p_value)
-                   VALUES ($1,$2,$3,$4,$5,$6,$7,$8,$9,$10,$11,$12,$13,$14,$15,$16,$17)""",
-                [astuple(p) for p in pairs],
+    async def _hold_claim(self, report_id: int, attempt: int) -> bool:
+        """Share-lock the report row if this attempt still runs it (call inside a transaction).
+
+        The lock makes requeue_stale wait for the write to commit, so the
+        pairs/series it clears include everything this attempt wrote.
+        """
+        held = await self.conn.fetchval(
+            """SELECT 1 FROM correlation_reports
+               WHERE id = $1 AND attempt = $2 AND status = 'running'
+               FOR SHARE""",
+            report_id, attempt,
+        )
+        return held is not None
+
+    async def insert_pairs(self, report_id: int, attempt: int, pairs: list) -> bool:
+        """Insert CorrelationPairResult list into correlation_pairs; False if the claim was lost.
+
+        Binary COPY: one round trip for the whole report instead of a Bind/Execute per row.
+        """
+        if not pairs:
+            return True
+        async with self.conn.transaction():
+            if not await self._hold_claim(report_id, attempt):
+                return False
+            await self.conn.copy_records_to_table(
+                "correlation_pairs",
+                records=[astuple(p) for p in pairs],
+                columns=PAIR_COLUMNS,
             )
+        return True
 
-    async def finalize_report(self, report_id: int) -> None:
-        await self.conn.execute(
-            "UPDATE correlation_reports SET status = 'done', finished_at = now() WHERE id = $1",
-            report_id,
+    async def insert_report_series(self, report_id: int, attempt: int, series: list[tuple[str, bytes]]) -> bool:
+        """Store (source_key, DaySeries blob) rows of a report; False if the claim was lost."""
+        if not series:
+            return True
+        async with self.conn.transaction():
+            if not await self._hold_claim(report_id, attempt):
+                return False
+            await self.conn.copy_records_to_table(
+                "correlation_report_series",
+                records=[(report_id, key, payload) for key, payload in series],
+                columns=("report_id", "source_key", "payload"),
+            )
+        return True
+
+    async def load_latest_report_state(self) -> bytes | None:
+        """Serialized MatrixState of the user's latest finished report, if any."""
+        return await self.conn.fetchval(
+            """SELECT s.payload
+               FROM correlation_report_state s
+               JOIN correlation_reports r ON r.id = s.report_id
+               WHERE r.user_id = $1 AND r.status = 'done'
+               ORDER BY r.created_at DESC
+               LIMIT 1""",
+            self.user_id,
+        )
+
+    async def save_report_state(self, report_id: int, attempt: int, payload: bytes) -> bool:
+        """Store the report's serialized MatrixState; False if the claim was lost."""
+        async with self.conn.transaction():
+            if not await self._hold_claim(report_id, attempt):
+                return False
+            await self.conn.execute(
+                """INSERT INTO correlation_report_state (report_id, payload) VALUES ($1, $2)
+                   ON CONFLICT (report_id) DO UPDATE SET payload = EXCLUDED.payload""",
+                report_id, payload,
+            )
+        return True
+
+    async def update_report_progress(
+        self, report_id: int, attempt: int, phase: str | None, progress: float,
+    ) -> str | None:
+        """Record the finished phase; returns the report status.
+
+        None when the report is gone or was requeued (another attempt owns it);
+        cancelling if it was superseded meanwhile.
+        """
+        return await self.conn.fetchval(
+            """UPDATE correlation_reports
+               SET phase = COALESCE($3, phase),
+                   progress = CASE WHEN status = 'running' THEN $4 ELSE progress END,
+                   heartbeat_at = now()
+               WHERE id = $1 AND attempt = $2
+               RETURNING status""",
+            report_id, attempt, phase, progress,
         )
+
+    async def finalize_report(self, report_id: int, attempt: int) -> bool:
+        """Mark the report done and drop the user's older reports; False if it was cancelled or requeued.
+
+        Older reports still cancelling keep their row until their task exits.
+        """
+        async with self.conn.transaction():
+            done = await self.conn.fetchval(
+                """UPDATE correlation_reports
+                   SET status = 'done', finished_at = now(), phase = NULL, progress = 1
+                   WHERE id = $1 AND attempt = $2 AND status = 'running'
+                   RETURNING id""",
+                report_id, attempt,
+            )
+            if done is None:
+                return False
+            await self.conn.execute(
+                "DELETE FROM correlation_reports WHERE user_id = $1 AND id < $2 AND status <> 'cancelling'",
+                self.user_id, report_id,
+            )
+        return True
+
+    async def mark_report_error(self, report_id: int, attempt: int) -> None:
+        """Failed run: error, or cancelled if it had been superseded meanwhile."""
         await self.conn.execute(
-            "DELETE FROM correlation_reports WHERE user_id = $1 AND id != $2",
-            self.user_id, report_id,
+            """UPDATE correlation_reports
+               SET status = CASE WHEN status = 'cancelling' THEN 'cancelled' ELSE 'error' END,
+                   finished_at = now()
+               WHERE id = $1 AND attempt = $2 AND status IN ('running', 'cancelling')""",
+            report_id, attempt,
         )
 
-    async def mark_report_error(self, report_id: int) -> None:
+    async def delete_cancelled_report(self, report_id: int, attempt: int) -> None:
+        """Drop a superseded report once its run has stopped.
+
+        Only a cancelled/cancelling row of the same attempt is deleted: a run
+        stopped because its report was requeued leaves the queued row alone.
+        """
         await self.conn.execute(
-            "UPDATE correlation_reports SET status = 'error', finished_at = now() WHERE id = $1",
-            report_id,
+            """DELETE FROM correlation_reports
+               WHERE id = $1 AND user_id = $2 AND attempt = $3 AND status IN ('cancelling', 'cancelled')""",
+            report_id, self.user_id, attempt,
         )
@@ -6,12 +6,23 @@ from datetime import date as date_type
 import asyncpg
 
 from app.repositories.base import BaseRepository
+from app.repositories.entry_repository import _VALUE_COLUMNS, _VALUE_COLUMNS_SQL, _VALUE_JOINS, joined_value
 from app.repositories.metric_repository import _METRIC_WITH_CONFIG_SQL
 
 
 class DailyRepository(BaseRepository):
     """Data access for daily summary endpoint."""
 
+    async def get_cache_versions(self) -> tuple[int, int]:
+        """Current (config_version, entries_version) of the user's daily cache."""
+        row = await self.conn.fetchrow(
+            "SELECT config_version, entries_version FROM user_cache_versions WHERE user_id = $1",
+            self.user_id,
+        )
+        if row is None:
+            return 0, 0
+        return row["config_version"], row["entries_version"]
+
     async def get_enabled_metrics_with_config(self) -> list[asyncpg.Record]:
         return await self.conn.fetch(
             _METRIC_WITH_CONFIG_SQL + """
@@ -20,11 +31,39 @@ class DailyRepository(BaseRepository):
             self.user_id,
         )
 
-    async def get_entries_for_date(self, d: date_type) -> list[asyncpg.Record]:
-        return await self.conn.fetch(
-            "SELECT * FROM entries WHERE date = $1 AND user_id = $2",
+    async def get_entries_with_values(
+        self, d: date_type, metric_type_map: dict[int, str],
+    ) -> tuple[list[asyncpg.Record], dict[int, object], dict[int, dict]]:
+        """Entries of the date with their values in one round-trip.
+
+        Every value table is LEFT JOINed; the value is taken from the table of
+        the metric's storage type (``metric_type_map``, bool when unknown).
+        Returns (entries, values_map, scale_context_map).
+        """
+        rows = await self.conn.fetch(
+            f"""SELECT e.*, {_VALUE_COLUMNS_SQL}
+               FROM entries e {_VALUE_JOINS}
+               WHERE e.date = $1 AND e.user_id = $2""",
             d, self.user_id,
         )
+        values_map: dict[int, object] = {}
+        scale_context_map: dict[int, dict] = {}
+        for r in rows:
+            mt = metric_type_map.get(r["metric_id"], "bool")
+            if mt not in _VALUE_COLUMNS:
+                continue
+            v = joined_value(r, mt)
+            if v is None:
+                continue
+            eid = r["id"]
+            if mt == "scale":
+                scale_context_map[eid] = {
+                    "scale_min": r["v_scale_min"],
+                    "scale_max": r["v_scale_max"],
+                    "scale_step": r["v_scale_step"],
+                }
+            values_map[eid] = v
+        return rows, values_map, scale_context_map
 
     async def get_daily_layout(self) -> list[asyncpg.Record]:
         """Get daily layout block ordering for user."""
@@ -144,69 +183,6 @@ class DailyRepository(BaseRepository):
             d, self.user_id, metric_ids,
         )
 
-    async def batch_load_values(
-        self, entry_ids_by_type: dict[str, list[int]],
-    ) -> tuple[dict[int, object], dict[int, dict]]:
-        """Batch-load all entry values by type. Returns (values_map, scale_context_map)."""
-        values_map: dict[int, object] = {}
-        scale_context_map: dict[int, dict] = {}
-
-        if entry_ids_by_type.get("bool"):
-            rows = await self.conn.fetch(
-                "SELECT entry_id, value FROM values_bool WHERE entry_id = ANY($1)",
-                entry_ids_by_type["bool"],
-            )
-            for r in rows:
-                values_map[r["entry_id"]] = r["value"]
-
-        if entry_ids_by_type.get("number"):
-            rows = await self.conn.fetch(
-                "SELECT entry_id, value FROM values_number WHERE entry_id = ANY($1)",
-                entry_ids_by_type["number"],
-            )
-            for r in rows:
-                values_map[r["entry_id"]] = r["value"]
-
-        if entry_ids_by_type.get("time"):
-            rows = await self.conn.fetch(
-                "SELECT entry_id, value FROM values_time WHERE entry_id = ANY($1)",
-                entry_ids_by_type["time"],
-            )
-            for r in rows:
-                ts = r["value"]
-                values_map[r["entry_id"]] = f"{ts.hour:02d}:{ts.minute:02d}"
-
-        if entry_ids_by_type.get("scale"):
-            rows = await self.conn.fetch(
-                "SELECT entry_id, value, scale_min, scale_max, scale_step FROM values_scale WHERE entry_id = ANY($1)",
-                entry_ids_by_type["scale"],
-            )
-            for r in rows:
-                values_map[r["entry_id"]] = r["value"]
-                scale_context_map[r["entry_id"]] = {
-                    "scale_min": r["scale_min"],
-                    "scale_max": r["scale_max"],
-                    "scale_step": r["scale_step"],
-                }
-
-        if entry_ids_by_type.get("duration"):
-            rows = await self.conn.fetch(
-                "SELECT entry_id, value FROM values_duration WHERE entry_id = ANY($1)",
-                entry_ids_by_type["duration"],
-            )
-            for r in rows:
-                values_map[r["entry_id"]] = r["value"]
-
-        if entry_ids_by_type.get("enum"):
-            rows = await self.conn.fetch(
-                "SELECT entry_id, selected_option_ids FROM values_enum WHERE entry_id = ANY($1)",
-                entry_ids_by_type["enum"],
-            )
-            for r in rows:
-                values_map[r["entry_id"]] = list(r["selected_option_ids"])
-
-        return values_map, scale_context_map
-
     async def get_enum_options_for_metrics(
         self, metric_ids: list[int],
     ) -> dict[int, list]:
@@ -234,19 +210,14 @@ class DailyRepository(BaseRepository):
         if not metric_ids:
             return notes_count_map, notes_by_metric
 
-        nc_rows = await self.conn.fetch(
-            "SELECT metric_id, COUNT(*) AS cnt FROM notes WHERE metric_id = ANY($1) AND user_id = $2 AND date = $3 GROUP BY metric_id",
-            metric_ids, self.user_id, d,
-        )
-        for r in nc_rows:
-            notes_count_map[r["metric_id"]] = r["cnt"]
-
-        n_rows = await self.conn.fetch(
+        rows = await self.conn.fetch(
             "SELECT id, metric_id, text, created_at FROM notes WHERE metric_id = ANY($1) AND user_id = $2 AND date = $3 ORDER BY created_at",
             metric_ids, self.user_id, d,
         )
-        for r in n_rows:
+        for r in rows:
             notes_by_metric[r["metric_id"]].append({
                 "id": r["id"], "text": r["text"], "created_at": str(r["created_at"]),
             })
+        for mid, notes in notes_by_metric.items():
+            notes_count_map[mid] = len(notes)
         return notes_count_map, notes_by_metric
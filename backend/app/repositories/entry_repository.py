@@ -22,6 +22,43 @@ _BINDING_COLUMNS = (
     "iv_start.label || ' → ' || iv_end.label AS interval_label"
 )
 
+# SQL fragments: every values_* table LEFT JOINed onto entries e, one v_<type> column each
+_VALUE_JOINS = """
+    LEFT JOIN values_bool vb ON vb.entry_id = e.id
+    LEFT JOIN values_number vn ON vn.entry_id = e.id
+    LEFT JOIN values_time vt ON vt.entry_id = e.id
+    LEFT JOIN values_scale vs ON vs.entry_id = e.id
+    LEFT JOIN values_duration vd ON vd.entry_id = e.id
+    LEFT JOIN values_enum ve ON ve.entry_id = e.id
+"""
+_VALUE_COLUMNS_SQL = (
+    "vb.value AS v_bool, vn.value AS v_number, vt.value AS v_time, "
+    "vs.value AS v_scale, vs.scale_min AS v_scale_min, "
+    "vs.scale_max AS v_scale_max, vs.scale_step AS v_scale_step, "
+    "vd.value AS v_duration, ve.selected_option_ids AS v_enum"
+)
+
+# Storage type → value column of _VALUE_COLUMNS_SQL
+_VALUE_COLUMNS = {
+    MetricType.bool: "v_bool", MetricType.number: "v_number", MetricType.time: "v_time",
+    MetricType.scale: "v_scale", MetricType.duration: "v_duration", MetricType.enum: "v_enum",
+}
+
+
+def joined_value(row, metric_type: str) -> bool | str | int | list[int] | None:
+    """Value of a row read with _VALUE_JOINS, shaped like EntryRepository.get_entry_value.
+
+    Unknown storage types read the bool column, as get_entry_value does.
+    """
+    v = row[_VALUE_COLUMNS.get(metric_type, "v_bool")]
+    if v is None:
+        return None
+    if metric_type == MetricType.time:
+        return f"{v.hour:02d}:{v.minute:02d}"
+    if metric_type == MetricType.enum:
+        return list(v)
+    return v
+
 
 class EntryRepository(BaseRepository):
     """Data access for entries and values_* tables."""
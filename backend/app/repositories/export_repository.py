@@ -1,10 +1,12 @@
 """Repository for export SQL operations."""
 
 from collections import defaultdict
+from collections.abc import AsyncIterator
 
 import asyncpg
 
-from app.repositories.base import BaseRepository
+from app.repositories.base import STREAM_BATCH_SIZE, BaseRepository
+from app.repositories.entry_repository import _VALUE_COLUMNS_SQL, _VALUE_JOINS
 
 
 class ExportRepository(BaseRepository):
@@ -107,20 +109,21 @@ class ExportRepository(BaseRepository):
             self.user_id,
         )
 
-    async def get_entries_for_export(self) -> list[asyncpg.Record]:
-        return await self.conn.fetch(
-            """SELECT e.*,
-                      e.checkpoint_id, cp.label AS checkpoint_label,
-                      e.interval_id, iv_start.label AS interval_start_label,
-                      iv_end.label AS interval_end_label
+    def iter_entries_for_export(self, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[asyncpg.Record]:
+        """Entries with binding labels and values (v_* columns), newest date first."""
+        query = f"""SELECT e.*,
+                      cp.label AS checkpoint_label,
+                      iv_start.label AS interval_start_label,
+                      iv_end.label AS interval_end_label,
+                      {_VALUE_COLUMNS_SQL}
                FROM entries e
                LEFT JOIN checkpoints cp ON cp.id = e.checkpoint_id
                LEFT JOIN intervals iv ON iv.id = e.interval_id
                LEFT JOIN checkpoints iv_start ON iv_start.id = iv.start_checkpoint_id
                LEFT JOIN checkpoints iv_end ON iv_end.id = iv.end_checkpoint_id
-               WHERE e.user_id = $1 ORDER BY e.date DESC, e.metric_id""",
-            self.user_id,
-        )
+               {_VALUE_JOINS}
+               WHERE e.user_id = $1 ORDER BY e.date DESC, e.metric_id"""
+        return self._stream(query, self.user_id, batch_size=batch_size)
 
     async def get_aw_daily(self) -> list[asyncpg.Record]:
         return await self.conn.fetch(
@@ -128,18 +131,18 @@ class ExportRepository(BaseRepository):
             self.user_id,
         )
 
-    async def get_aw_apps(self) -> list[asyncpg.Record]:
-        return await self.conn.fetch(
+    def iter_aw_apps(self, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[asyncpg.Record]:
+        return self._stream(
             "SELECT date, app_name, source, duration_seconds FROM activitywatch_app_usage WHERE user_id = $1 ORDER BY date, duration_seconds DESC",
-            self.user_id,
+            self.user_id, batch_size=batch_size,
         )
 
-    async def get_notes_for_export(self) -> list[asyncpg.Record]:
-        return await self.conn.fetch(
+    def iter_notes_for_export(self, batch_size: int = STREAM_BATCH_SIZE) -> AsyncIterator[asyncpg.Record]:
+        return self._stream(
             """SELECT n.date, md.slug AS metric_slug, n.text, n.created_at
                FROM notes n
                JOIN metric_definitions md ON md.id = n.metric_id
                WHERE n.user_id = $1
                ORDER BY n.date, n.created_at""",
-            self.user_id,
+            self.user_id, batch_size=batch_size,
         )
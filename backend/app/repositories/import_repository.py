@@ -1,12 +1,19 @@
 """Repository for import SQL operations."""
 
 from collections import defaultdict
-from datetime import date as date_type, time as time_type
+from datetime import date as date_type
 
 import asyncpg
 
 from app.repositories.base import BaseRepository
 
+# Column order of records passed to stage_entries
+ENTRY_STAGE_COLUMNS = (
+    "row_num", "metric_id", "date", "checkpoint_id", "interval_id",
+    "is_free_checkpoint", "recorded_at", "is_free_interval", "time_start", "time_end",
+    "value_type", "v_bool", "v_int", "v_time", "v_enum",
+)
+
 
 class ImportRepository(BaseRepository):
     """Data access for import operations."""
@@ -261,65 +268,143 @@ class ImportRepository(BaseRepository):
             self.user_id)
         return {r["label"]: r["id"] for r in rows}
 
-    async def check_entry_duplicate(
-        self, metric_id: int, d: date_type,
-        checkpoint_id: int | None = None, interval_id: int | None = None,
-        is_free_checkpoint: bool = False,
-        is_free_interval: bool = False,
-        time_start: time_type | None = None,
-        time_end: time_type | None = None,
-    ) -> bool:
-        if is_free_checkpoint:
-            return False
-        if is_free_interval:
-            if time_start is not None and time_end is not None:
-                val = await self.conn.fetchval(
-                    "SELECT id FROM entries WHERE metric_id=$1 AND user_id=$2 AND date=$3 "
-                    "AND time_start=$4 AND time_end=$5",
-                    metric_id, self.user_id, d, time_start, time_end)
-                return val is not None
-            return False
-        if checkpoint_id is not None:
-            val = await self.conn.fetchval(
-                "SELECT id FROM entries WHERE metric_id=$1 AND user_id=$2 AND date=$3 AND checkpoint_id=$4",
-                metric_id, self.user_id, d, checkpoint_id)
-        elif interval_id is not None:
-            val = await self.conn.fetchval(
-                "SELECT id FROM entries WHERE metric_id=$1 AND user_id=$2 AND date=$3 AND interval_id=$4",
-                metric_id, self.user_id, d, interval_id)
-        else:
-            val = await self.conn.fetchval(
-                "SELECT id FROM entries WHERE metric_id=$1 AND user_id=$2 AND date=$3 AND checkpoint_id IS NULL AND interval_id IS NULL",
-                metric_id, self.user_id, d)
-        return val is not None
+    async def create_entry_stage(self) -> None:
+        """Temp table for bulk entry import; dropped when the import transaction ends."""
+        await self.conn.execute("""
+            CREATE TEMP TABLE IF NOT EXISTS import_entry_stage (
+                row_num INTEGER NOT NULL,
+                metric_id INTEGER NOT NULL,
+                date DATE NOT NULL,
+                checkpoint_id INTEGER,
+                interval_id INTEGER,
+                is_free_checkpoint BOOLEAN NOT NULL,
+                recorded_at TIMESTAMPTZ,
+                is_free_interval BOOLEAN NOT NULL,
+                time_start TIME,
+                time_end TIME,
+                value_type VARCHAR(20) NOT NULL,
+                v_bool BOOLEAN,
+                v_int INTEGER,
+                v_time TIMESTAMPTZ,
+                v_enum INTEGER[],
+                entry_id INTEGER,
+                status VARCHAR(20) NOT NULL DEFAULT 'new',
+                error TEXT
+            ) ON COMMIT DROP
+        """)
+
+    async def stage_entries(self, records: list[tuple]) -> None:
+        """COPY parsed CSV rows (ENTRY_STAGE_COLUMNS order) into the stage table."""
+        if records:
+            await self.conn.copy_records_to_table(
+                "import_entry_stage", records=records, columns=ENTRY_STAGE_COLUMNS,
+            )
 
-    async def create_entry(
-        self, metric_id: int, d: date_type,
-        checkpoint_id: int | None = None, interval_id: int | None = None,
-        is_free_checkpoint: bool = False,
-        recorded_at: str | None = None,
-        is_free_interval: bool = False,
-        time_start: time_type | None = None,
-        time_end: time_type | None = None,
-    ) -> int:
-        if is_free_checkpoint and recorded_at:
-            return await self.conn.fetchval(
-                "INSERT INTO entries (metric_id, user_id, date, checkpoint_id, interval_id, is_free_checkpoint, recorded_at) "
-                "VALUES ($1,$2,$3,$4,$5,$6,$7) RETURNING id",
-                metric_id, self.user_id, d, checkpoint_id, interval_id, True, recorded_at)
-        if is_free_interval:
-            return await self.conn.fetchval(
-                "INSERT INTO entries (metric_id, user_id, date, is_free_interval, time_start, time_end) "
-                "VALUES ($1,$2,$3,$4,$5,$6) RETURNING id",
-                metric_id, self.user_id, d, True, time_start, time_end)
-        return await self.conn.fetchval(
-            "INSERT INTO entries (metric_id, user_id, date, checkpoint_id, interval_id, is_free_checkpoint) "
-            "VALUES ($1,$2,$3,$4,$5,$6) RETURNING id",
-            metric_id, self.user_id, d, checkpoint_id, interval_id, is_free_checkpoint)
+    async def apply_entry_stage(self) -> tuple[int, int, list[tuple[int, str]]]:
+        """Insert staged entries and values with set-based SQL.
 
-    async def get_enum_option_labels(self, metric_id: int) -> dict[str, int]:
-        rows = await self.conn.fetch("SELECT id, label FROM enum_options WHERE metric_id=$1", metric_id)
-        return {r["label"]: r["id"] for r in rows}
+        Rows bound to a checkpoint/interval the user does not own become errors;
+        rows matching an existing entry or an earlier staged row become duplicates
+        (same rules as the per-entry API: free checkpoints never collide, free
+        intervals collide on time range, unbound rows on any unbound entry).
+        Returns (imported, duplicates, [(row_num, error)]).
+        """
+        await self.conn.execute(
+            """UPDATE import_entry_stage s SET status = 'error',
+                   error = 'checkpoint ' || s.checkpoint_id || ' not found'
+               WHERE s.checkpoint_id IS NOT NULL AND NOT EXISTS (
+                   SELECT 1 FROM checkpoints c WHERE c.id = s.checkpoint_id AND c.user_id = $1)""",
+            self.user_id)
+        await self.conn.execute(
+            """UPDATE import_entry_stage s SET status = 'error',
+                   error = 'interval ' || s.interval_id || ' not found'
+               WHERE s.interval_id IS NOT NULL AND NOT EXISTS (
+                   SELECT 1 FROM intervals i WHERE i.id = s.interval_id AND i.user_id = $1)""",
+            self.user_id)
+        await self.conn.execute(
+            """UPDATE import_entry_stage s SET status = 'duplicate'
+               WHERE s.status = 'new' AND NOT s.is_free_checkpoint AND EXISTS (
+                   SELECT 1 FROM entries e
+                   WHERE e.user_id = $1 AND e.metric_id = s.metric_id AND e.date = s.date
+                     AND CASE
+                         WHEN s.is_free_interval THEN e.time_start = s.time_start AND e.time_end = s.time_end
+                         WHEN s.checkpoint_id IS NOT NULL THEN e.checkpoint_id = s.checkpoint_id
+                         WHEN s.interval_id IS NOT NULL THEN e.interval_id = s.interval_id
+                         ELSE e.checkpoint_id IS NULL AND e.interval_id IS NULL
+                     END)""",
+            self.user_id)
+        await self.conn.execute(
+            """UPDATE import_entry_stage s SET status = 'duplicate'
+               FROM (
+                   SELECT row_num,
+                          CASE
+                              WHEN is_free_checkpoint THEN FALSE
+                              WHEN is_free_interval THEN row_number() OVER (
+                                  PARTITION BY metric_id, date, time_start, time_end ORDER BY row_num) > 1
+                              WHEN checkpoint_id IS NOT NULL THEN row_number() OVER (
+                                  PARTITION BY metric_id, date, checkpoint_id ORDER BY row_num) > 1
+                              WHEN interval_id IS NOT NULL THEN row_number() OVER (
+                                  PARTITION BY metric_id, date, interval_id ORDER BY row_num) > 1
+                              ELSE COALESCE(count(*) FILTER (
+                                       WHERE checkpoint_id IS NULL AND interval_id IS NULL) OVER (
+                                  PARTITION BY metric_id, date ORDER BY row_num
+                                  ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING), 0) > 0
+                          END AS dup
+                   FROM import_entry_stage
+                   WHERE status <> 'error'
+               ) d
+               WHERE d.row_num = s.row_num AND d.dup AND s.status = 'new'""")
+        await self.conn.execute(
+            """UPDATE import_entry_stage
+               SET entry_id = nextval(pg_get_serial_sequence('entries', 'id'))
+               WHERE status = 'new'""")
+        imported = await self.conn.fetchval(
+            """WITH ins AS (
+                   INSERT INTO entries (id, metric_id, user_id, date, checkpoint_id, interval_id,
+                                        is_free_checkpoint, recorded_at, is_free_interval, time_start, time_end)
+                   SELECT entry_id, metric_id, $1, date, checkpoint_id, interval_id,
+                          is_free_checkpoint, COALESCE(recorded_at, now()), is_free_interval, time_start, time_end
+                   FROM import_entry_stage WHERE status = 'new' ORDER BY row_num
+                   RETURNING 1)
+               SELECT count(*) FROM ins""",
+            self.user_id)
+        await self.conn.execute(
+            """INSERT INTO values_bool (entry_id, value)
+               SELECT entry_id, v_bool FROM import_entry_stage WHERE status = 'new' AND value_type = 'bool'""")
+        await self.conn.execute(
+            """INSERT INTO values_number (entry_id, value)
+               SELECT entry_id, v_int FROM import_entry_stage WHERE status = 'new' AND value_type = 'number'""")
+        await self.conn.execute(
+            """INSERT INTO values_duration (entry_id, value)
+               SELECT entry_id, v_int FROM import_entry_stage WHERE status = 'new' AND value_type = 'duration'""")
+        await self.conn.execute(
+            """INSERT INTO values_time (entry_id, value)
+               SELECT entry_id, v_time FROM import_entry_stage WHERE status = 'new' AND value_type = 'time'""")
+        await self.conn.execute(
+            """INSERT INTO values_enum (entry_id, selected_option_ids)
+               SELECT entry_id, v_enum FROM import_entry_stage WHERE status = 'new' AND value_type = 'enum'""")
+        await self.conn.execute(
+            """INSERT INTO values_scale (entry_id, value, scale_min, scale_max, scale_step)
+               SELECT s.entry_id, s.v_int,
+                      COALESCE(sc.scale_min, 1), COALESCE(sc.scale_max, 5), COALESCE(sc.scale_step, 1)
+               FROM import_entry_stage s LEFT JOIN scale_config sc ON sc.metric_id = s.metric_id
+               WHERE s.status = 'new' AND s.value_type = 'scale'""")
+        duplicates = await self.conn.fetchval(
+            "SELECT count(*) FROM import_entry_stage WHERE status = 'duplicate'")
+        rows = await self.conn.fetch(
+            "SELECT row_num, error FROM import_entry_stage WHERE status = 'error' ORDER BY row_num")
+        return imported, duplicates, [(r["row_num"], r["error"]) for r in rows]
+
+    async def get_enum_option_label_lookup(self, metric_ids: list[int]) -> dict[int, dict[str, int]]:
+        """Lookup: metric_id → {label: option_id} over all options (enabled or not)."""
+        result: dict[int, dict[str, int]] = defaultdict(dict)
+        if not metric_ids:
+            return result
+        rows = await self.conn.fetch(
+            "SELECT metric_id, id, label FROM enum_options WHERE metric_id = ANY($1)", metric_ids)
+        for r in rows:
+            result[r["metric_id"]][r["label"]] = r["id"]
+        return result
 
     async def insert_metric_checkpoint_on_fly(self, metric_id: int, checkpoint_id: int, sort_order: int) -> None:
         await self.conn.execute(
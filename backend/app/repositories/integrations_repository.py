@@ -248,54 +248,100 @@ class IntegrationsRepository(BaseRepository):
                 rows,
             )
 
-    async def get_aw_integration_metrics(self) -> list[asyncpg.Record]:
-        return await self.conn.fetch(
-            """SELECT md.id AS metric_id, ic.metric_key, ic.value_type,
-                      icc.activitywatch_category_id, iac.app_name AS config_app_name
-               FROM metric_definitions md
-               JOIN integration_config ic ON ic.metric_id = md.id
-               LEFT JOIN integration_category_config icc ON icc.metric_id = md.id
-               LEFT JOIN integration_app_config iac ON iac.metric_id = md.id
-               WHERE md.user_id = $1 AND ic.provider = 'activitywatch' AND md.enabled = TRUE""",
-            self.user_id,
-        )
-
-    async def get_aw_summary_full(self, for_date: date_type) -> asyncpg.Record | None:
-        return await self.conn.fetchrow(
-            """SELECT total_seconds, active_seconds,
-                      first_activity_time, last_activity_time,
-                      afk_seconds, longest_session_seconds,
-                      context_switches, break_count
-               FROM activitywatch_daily_summary
-               WHERE user_id = $1 AND date = $2""",
-            self.user_id, for_date,
-        )
-
-    async def get_unique_apps_count(self, for_date: date_type) -> int:
-        val = await self.conn.fetchval(
-            """SELECT COUNT(DISTINCT app_name) FROM activitywatch_app_usage
-               WHERE user_id = $1 AND date = $2 AND source = 'window'""",
+    async def recompute_aw_integration_metrics(self, for_date: date_type) -> int:
+        """Recompute every enabled AW integration metric for the date in one statement.
+
+        App usage is aggregated once per app and per category, joined with the
+        daily summary and fanned out to the metrics; entries and values are then
+        upserted together. Minute values are whole minutes. first/last_activity
+        are skipped while there is no activity time. Returns the number of
+        metrics written.
+        """
+        return await self.conn.fetchval(
+            """WITH metrics AS (
+                   SELECT md.id AS metric_id, ic.metric_key, ic.value_type,
+                          icc.activitywatch_category_id AS category_id,
+                          NULLIF(iac.app_name, '') AS app_name
+                   FROM metric_definitions md
+                   JOIN integration_config ic ON ic.metric_id = md.id
+                   LEFT JOIN integration_category_config icc ON icc.metric_id = md.id
+                   LEFT JOIN integration_app_config iac ON iac.metric_id = md.id
+                   WHERE md.user_id = $1 AND ic.provider = 'activitywatch' AND md.enabled = TRUE
+               ),
+               window_usage AS (
+                   SELECT au.app_name, au.duration_seconds, acm.activitywatch_category_id AS category_id
+                   FROM activitywatch_app_usage au
+                   LEFT JOIN activitywatch_app_category_map acm
+                       ON acm.app_name = au.app_name AND acm.user_id = au.user_id
+                   WHERE au.user_id = $1 AND au.date = $2 AND au.source = 'window'
+               ),
+               app_totals AS (
+                   SELECT app_name, SUM(duration_seconds) AS seconds FROM window_usage GROUP BY app_name
+               ),
+               category_totals AS (
+                   SELECT category_id, SUM(duration_seconds) AS seconds
+                   FROM window_usage WHERE category_id IS NOT NULL GROUP BY category_id
+               ),
+               summary AS (
+                   SELECT * FROM activitywatch_daily_summary WHERE user_id = $1 AND date = $2
+               ),
+               computed AS (
+                   SELECT m.metric_id, m.value_type,
+                          CASE m.metric_key
+                              WHEN 'active_screen_time' THEN COALESCE(s.active_seconds, 0) / 60
+                              WHEN 'total_screen_time' THEN COALESCE(s.total_seconds, 0) / 60
+                              WHEN 'afk_time' THEN COALESCE(s.afk_seconds, 0) / 60
+                              WHEN 'longest_session' THEN COALESCE(s.longest_session_seconds, 0) / 60
+                              WHEN 'context_switches' THEN COALESCE(s.context_switches, 0)
+                              WHEN 'break_count' THEN COALESCE(s.break_count, 0)
+                              WHEN 'unique_apps' THEN (SELECT COUNT(*) FROM app_totals)
+                              WHEN 'category_time' THEN COALESCE(ct.seconds, 0) / 60
+                              WHEN 'app_time' THEN COALESCE(apt.seconds, 0) / 60
+                          END AS num_value,
+                          ($2::date + date_trunc('minute', (CASE m.metric_key
+                              WHEN 'first_activity' THEN s.first_activity_time
+                              WHEN 'last_activity' THEN s.last_activity_time
+                          END) AT TIME ZONE 'UTC')::time) AT TIME ZONE 'UTC' AS time_value
+                   FROM metrics m
+                   LEFT JOIN summary s ON TRUE
+                   LEFT JOIN category_totals ct ON ct.category_id = m.category_id
+                   LEFT JOIN app_totals apt ON apt.app_name = m.app_name
+               ),
+               ready AS (
+                   SELECT * FROM computed
+                   WHERE CASE value_type
+                             WHEN 'time' THEN time_value IS NOT NULL
+                             WHEN 'number' THEN num_value IS NOT NULL
+                             WHEN 'duration' THEN num_value IS NOT NULL
+                             ELSE FALSE END
+               ),
+               upserted AS (
+                   INSERT INTO entries (metric_id, user_id, date)
+                   SELECT metric_id, $1, $2 FROM ready
+                   ON CONFLICT (metric_id, user_id, date)
+                       WHERE checkpoint_id IS NULL AND interval_id IS NULL
+                         AND NOT is_free_checkpoint AND NOT is_free_interval
+                   DO UPDATE SET date = EXCLUDED.date
+                   RETURNING id, metric_id
+               ),
+               number_values AS (
+                   INSERT INTO values_number (entry_id, value)
+                   SELECT u.id, r.num_value FROM upserted u JOIN ready r USING (metric_id)
+                   WHERE r.value_type = 'number'
+                   ON CONFLICT (entry_id) DO UPDATE SET value = EXCLUDED.value
+               ),
+               duration_values AS (
+                   INSERT INTO values_duration (entry_id, value)
+                   SELECT u.id, r.num_value FROM upserted u JOIN ready r USING (metric_id)
+                   WHERE r.value_type = 'duration'
+                   ON CONFLICT (entry_id) DO UPDATE SET value = EXCLUDED.value
+               ),
+               time_values AS (
+                   INSERT INTO values_time (entry_id, value)
+                   SELECT u.id, r.time_value FROM upserted u JOIN ready r USING (metric_id)
+                   WHERE r.value_type = 'time'
+                   ON CONFLICT (entry_id) DO UPDATE SET value = EXCLUDED.value
+               )
+               SELECT COUNT(*) FROM upserted""",
             self.user_id, for_date,
         )
-        return val or 0
-
-    async def get_category_time_seconds(self, for_date: date_type, cat_id: int) -> int:
-        val = await self.conn.fetchval(
-            """SELECT COALESCE(SUM(au.duration_seconds), 0)
-               FROM activitywatch_app_usage au
-               JOIN activitywatch_app_category_map acm
-                   ON acm.app_name = au.app_name AND acm.user_id = au.user_id
-               WHERE au.user_id = $1 AND au.date = $2 AND acm.activitywatch_category_id = $3
-                     AND au.source = 'window'""",
-            self.user_id, for_date, cat_id,
-        )
-        return val or 0
-
-    async def get_app_time_seconds(self, for_date: date_type, app_name: str) -> int:
-        val = await self.conn.fetchval(
-            """SELECT COALESCE(duration_seconds, 0)
-               FROM activitywatch_app_usage
-               WHERE user_id = $1 AND date = $2 AND app_name = $3 AND source = 'window'""",
-            self.user_id, for_date, app_name,
-        )
-        return val or 0
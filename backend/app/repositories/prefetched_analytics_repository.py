@@ -0,0 +1,162 @@
+"""AnalyticsRepository that serves per-metric entry reads from bulk-loaded tables."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import AsyncIterator
+from datetime import date as date_type
+from typing import Any
+
+import asyncpg
+
+from app.repositories.analytics_repository import AnalyticsRepository
+
+
+class PrefetchedAnalyticsRepository(AnalyticsRepository):
+    """Загружает записи пользователя за окно отчёта одним запросом на таблицу.
+
+    The correlation engine asks for the same metric once per checkpoint,
+    interval, enum option and auto source; trends/batch asks for many metrics
+    and their computed-metric inputs. Here every value table (and enum,
+    notes, free-interval times, scale bounds, enum options, metric types,
+    checkpoint counts) is pulled in one query the first time it is needed and
+    the per-metric methods filter rows in memory. Requests for any other date
+    window fall through to the database.
+    """
+
+    def __init__(
+        self, conn: asyncpg.Connection, user_id: int, start: date_type, end: date_type,
+    ) -> None:
+        super().__init__(conn, user_id)
+        self._window = (start, end)
+        self._values: dict[str, dict[int, list[Any]]] = {}
+        self._enum: dict[int, list[Any]] | None = None
+        self._notes: dict[int, list[Any]] | None = None
+        self._free_times: dict[int, list[Any]] | None = None
+        self._scale_bounds: dict[int, tuple[int | None, int | None]] | None = None
+        self._enum_options: dict[int, list[Any]] | None = None
+        self._metric_types: dict[int, str] | None = None
+        self._multi_checkpoint: set[int] | None = None
+
+    def _covers(self, start: date_type, end: date_type) -> bool:
+        return (start, end) == self._window
+
+    @staticmethod
+    def _by_metric(rows: list[Any]) -> dict[int, list[Any]]:
+        grouped: dict[int, list[Any]] = defaultdict(list)
+        for r in rows:
+            grouped[r["metric_id"]].append(r)
+        return grouped
+
+    @staticmethod
+    async def _stream_by_metric(rows: AsyncIterator[Any]) -> dict[int, list[Any]]:
+        """Group a streamed result without materialising the full record list first."""
+        grouped: dict[int, list[Any]] = defaultdict(list)
+        async for r in rows:
+            grouped[r["metric_id"]].append(r)
+        return grouped
+
+    async def _value_rows(self, metric_id: int, value_table: str, extra_cols: str) -> list[Any]:
+        if value_table not in self._values:
+            self._values[value_table] = await self._stream_by_metric(
+                self.iter_all_entries_values(value_table, extra_cols, *self._window),
+            )
+        return self._values[value_table].get(metric_id, [])
+
+    async def _enum_rows(self, metric_id: int) -> list[Any]:
+        if self._enum is None:
+            self._enum = await self._stream_by_metric(self.iter_all_enum_entries(*self._window))
+        return self._enum.get(metric_id, [])
+
+    # ── Per-metric reads (ValueFetcher interface) ────────────────────
+
+    async def fetch_entries_values_with_checkpoint(
+        self, metric_id: int, value_table: str, extra_cols: str,
+        start: date_type, end: date_type, checkpoint_id: int | None = None,
+        *, free_interval_only: bool = False,
+    ) -> list[Any]:
+        if not self._covers(start, end):
+            return await super().fetch_entries_values_with_checkpoint(
+                metric_id, value_table, extra_cols, start, end, checkpoint_id,
+                free_interval_only=free_interval_only,
+            )
+        return [
+            r for r in await self._value_rows(metric_id, value_table, extra_cols)
+            if (checkpoint_id is None or r["checkpoint_id"] == checkpoint_id)
+            and (not free_interval_only or r["is_free_interval"])
+        ]
+
+    async def fetch_entries_values_with_interval(
+        self, metric_id: int, value_table: str, extra_cols: str,
+        start: date_type, end: date_type, interval_id: int | None = None,
+    ) -> list[Any]:
+        if not self._covers(start, end):
+            return await super().fetch_entries_values_with_interval(
+                metric_id, value_table, extra_cols, start, end, interval_id,
+            )
+        return [
+            r for r in await self._value_rows(metric_id, value_table, extra_cols)
+            if interval_id is None or r["interval_id"] == interval_id
+        ]
+
+    async def fetch_enum_entries_with_checkpoint(
+        self, metric_id: int, start: date_type, end: date_type,
+        checkpoint_id: int | None = None,
+    ) -> list[Any]:
+        if not self._covers(start, end):
+            return await super().fetch_enum_entries_with_checkpoint(metric_id, start, end, checkpoint_id)
+        return [
+            r for r in await self._enum_rows(metric_id)
+            if checkpoint_id is None or r["checkpoint_id"] == checkpoint_id
+        ]
+
+    async def fetch_enum_entries_with_interval(
+        self, metric_id: int, start: date_type, end: date_type,
+        interval_id: int | None = None,
+    ) -> list[Any]:
+        if not self._covers(start, end):
+            return await super().fetch_enum_entries_with_interval(metric_id, start, end, interval_id)
+        return [
+            r for r in await self._enum_rows(metric_id)
+            if interval_id is None or r["interval_id"] == interval_id
+        ]
+
+    async def fetch_note_counts(
+        self, metric_id: int, start: date_type, end: date_type,
+    ) -> list[Any]:
+        if not self._covers(start, end):
+            return await super().fetch_note_counts(metric_id, start, end)
+        if self._notes is None:
+            self._notes = self._by_metric(await self.fetch_all_note_counts(*self._window))
+        return self._notes.get(metric_id, [])
+
+    async def fetch_free_interval_times(
+        self, metric_id: int, start: date_type, end: date_type,
+    ) -> list[Any]:
+        if not self._covers(start, end):
+            return await super().fetch_free_interval_times(metric_id, start, end)
+        if self._free_times is None:
+            self._free_times = self._by_metric(await self.fetch_all_free_interval_times(*self._window))
+        return self._free_times.get(metric_id, [])
+
+    async def get_scale_config_bounds(self, metric_id: int) -> tuple[int | None, int | None]:
+        if self._scale_bounds is None:
+            self._scale_bounds = await self.get_all_scale_config_bounds()
+        if metric_id in self._scale_bounds:
+            return self._scale_bounds[metric_id]
+        return await super().get_scale_config_bounds(metric_id)
+
+    async def get_enum_options_enabled(self, metric_id: int) -> list[Any]:
+        if self._enum_options is None:
+            self._enum_options = self._by_metric(await self.fetch_all_enum_options_enabled())
+        return self._enum_options.get(metric_id, [])
+
+    async def get_metric_types_by_ids(self, metric_ids: list[int]) -> dict[int, str]:
+        if self._metric_types is None:
+            self._metric_types = await self.get_all_metric_types()
+        return {mid: self._metric_types[mid] for mid in metric_ids if mid in self._metric_types}
+
+    async def has_multiple_enabled_checkpoints(self, metric_id: int) -> bool:
+        if self._multi_checkpoint is None:
+            self._multi_checkpoint = await self.get_all_metrics_with_multiple_checkpoints()
+        return metric_id in self._multi_checkpoint
@@ -0,0 +1,93 @@
+"""Repository for the correlation report job queue (correlation_reports)."""
+
+import asyncpg
+
+# Serializes claims across API processes so the global cap holds.
+_CLAIM_LOCK_KEY = 0x636F7272  # "corr"
+
+
+class ReportQueueRepository:
+    """Data access for queued/running correlation reports. No user_id binding — queue spans all users."""
+
+    def __init__(self, conn: asyncpg.Connection) -> None:
+        self.conn = conn
+
+    async def claim_reports(self, max_concurrent: int, max_per_user: int) -> list[asyncpg.Record]:
+        """Move the oldest claimable queued reports to running and return them.
+
+        Runs in one transaction under an advisory lock: the global count of
+        busy reports is read and the claim is limited to the free slots.
+        Busy means running or cancelling — a superseded run keeps its slot
+        until its task exits. A user with max_per_user busy reports is skipped;
+        superseded jobs are cancelled on create, so a user has at most one
+        queued report. Each claim bumps ``attempt``: the run's writes carry it,
+        so a run whose report was requeued and claimed again cannot write.
+        """
+        async with self.conn.transaction():
+            await self.conn.execute("SELECT pg_advisory_xact_lock($1)", _CLAIM_LOCK_KEY)
+            busy = await self.conn.fetchval(
+                "SELECT COUNT(*) FROM correlation_reports WHERE status IN ('running', 'cancelling')",
+            )
+            free = max_concurrent - busy
+            if free <= 0:
+                return []
+            return await self.conn.fetch(
+                """WITH busy AS (
+                       SELECT user_id, COUNT(*) AS cnt FROM correlation_reports
+                       WHERE status IN ('running', 'cancelling') GROUP BY user_id
+                   ),
+                   picked AS (
+                       SELECT r.id FROM correlation_reports r
+                       LEFT JOIN busy b ON b.user_id = r.user_id
+                       WHERE r.status = 'queued' AND COALESCE(b.cnt, 0) < $2
+                       ORDER BY r.created_at, r.id
+                       LIMIT $1
+                       FOR UPDATE OF r SKIP LOCKED
+                   )
+                   UPDATE correlation_reports cr
+                   SET status = 'running', started_at = now(), heartbeat_at = now(),
+                       phase = NULL, progress = 0, attempt = cr.attempt + 1
+                   FROM picked WHERE cr.id = picked.id
+                   RETURNING cr.id, cr.user_id, cr.period_start, cr.period_end, cr.attempt""",
+                free, max_per_user,
+            )
+
+    async def requeue_stale(self, stale_after_seconds: float) -> int:
+        """Return running reports without a recent heartbeat to the queue (crashed or restarted worker).
+
+        The attempt is bumped so a run that is merely slow (still alive) is
+        fenced off at once, and the pairs/series/state it already wrote are removed
+        so the next attempt starts clean. Stale cancelling reports are marked
+        cancelled, releasing their slot.
+        """
+        async with self.conn.transaction():
+            await self.conn.execute(
+                """UPDATE correlation_reports SET status = 'cancelled'
+                   WHERE status = 'cancelling'
+                     AND (heartbeat_at IS NULL OR heartbeat_at < now() - make_interval(secs => $1))""",
+                float(stale_after_seconds),
+            )
+            ids = [r["id"] for r in await self.conn.fetch(
+                """UPDATE correlation_reports
+                   SET status = 'queued', started_at = NULL, heartbeat_at = NULL, phase = NULL,
+                       progress = 0, attempt = attempt + 1
+                   WHERE status = 'running'
+                     AND (heartbeat_at IS NULL OR heartbeat_at < now() - make_interval(secs => $1))
+                   RETURNING id""",
+                float(stale_after_seconds),
+            )]
+            if ids:
+                await self.conn.execute("DELETE FROM correlation_pairs WHERE report_id = ANY($1)", ids)
+                await self.conn.execute("DELETE FROM correlation_report_series WHERE report_id = ANY($1)", ids)
+                await self.conn.execute("DELETE FROM correlation_report_state WHERE report_id = ANY($1)", ids)
+        return len(ids)
+
+    async def heartbeat(self, claims: list[tuple[int, int]]) -> None:
+        """Refresh (report_id, attempt) claims that are still current."""
+        if claims:
+            await self.conn.execute(
+                """UPDATE correlation_reports SET heartbeat_at = now()
+                   WHERE status IN ('running', 'cancelling')
+                     AND (id, attempt) IN (SELECT * FROM unnest($1::int[], $2::int[]))""",
+                [c[0] for c in claims], [c[1] for c in claims],
+            )
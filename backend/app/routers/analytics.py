@@ -3,7 +3,6 @@ from pydantic import BaseModel
 
 from app.database import get_db
 from app.auth import get_current_user, get_privacy_mode
-from app.correlation_config import correlation_config
 from app.repositories.analytics_repository import AnalyticsRepository
 from app.services.analytics_service import AnalyticsService
 from app.services.correlation_service import CorrelationService
@@ -97,7 +96,7 @@ async def create_correlation_report(
     db=Depends(get_db),
     current_user: dict = Depends(get_current_user),
 ):
-    return await _corr_service(db, current_user).create_report(body.start, body.end, correlation_config)
+    return await _corr_service(db, current_user).create_report(body.start, body.end)
 
 
 @router.get("/correlation-report")
@@ -113,12 +112,15 @@ async def get_correlation_pairs(
     limit: int = 50,
     metric_ids: str | None = Query(None),
     status: str | None = Query(None),
+    cursor: str | None = Query(None),
+    include_total: bool = True,
     db=Depends(get_db),
     current_user: dict = Depends(get_current_user),
     privacy_mode: bool = Depends(get_privacy_mode),
 ):
     return await _corr_service(db, current_user).get_pairs(
         report_id, category, offset, limit, metric_ids, privacy_mode, status=status,
+        cursor=cursor, include_total=include_total,
     )
 
 
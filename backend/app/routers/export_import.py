@@ -1,9 +1,11 @@
 """Export and import data in ZIP format (metrics + entries)."""
+from collections.abc import AsyncIterator
 from datetime import datetime
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from fastapi.responses import StreamingResponse
 
+from app import database as _db_module
 from app.database import get_db
 from app.auth import get_current_user
 from app.repositories.export_repository import ExportRepository
@@ -14,13 +16,19 @@ from app.services.import_service import ImportService
 router = APIRouter(prefix="/api/export", tags=["export"])
 
 
+async def _export_stream(user_id: int) -> AsyncIterator[bytes]:
+    """Own connection for the lifetime of the response; one read-only snapshot for all files."""
+    async with _db_module.pool.acquire() as conn:
+        async with conn.transaction(isolation="repeatable_read", readonly=True):
+            async for chunk in ExportService(ExportRepository(conn, user_id), conn).stream_zip():
+                yield chunk
+
+
 @router.get("/csv")
-async def export_data(db=Depends(get_db), current_user: dict = Depends(get_current_user)):
-    service = ExportService(ExportRepository(db, current_user["id"]), db)
-    zip_buffer = await service.export_zip()
+async def export_data(current_user: dict = Depends(get_current_user)):
     filename = f"life_analytics_{current_user['username']}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
     return StreamingResponse(
-        iter([zip_buffer.getvalue()]),
+        _export_stream(current_user["id"]),
         media_type="application/zip",
         headers={"Content-Disposition": f"attachment; filename={filename}"},
     )
@@ -10,6 +10,7 @@ from app.domain.enums import MetricType
 from app.formula import get_referenced_metric_ids
 from app.domain.privacy import mask_name, is_blocked, PRIVATE_MASK
 from app.repositories.analytics_repository import AnalyticsRepository
+from app.repositories.prefetched_analytics_repository import PrefetchedAnalyticsRepository
 from app.timing import QueryTimer
 
 
@@ -20,8 +21,33 @@ class AnalyticsService:
         self.user_id = repo.user_id
 
     async def trends(self, metric_id: int, start: str, end: str, privacy_mode: bool) -> dict:
-        qt = QueryTimer(f"trends/{metric_id}")
         metric = await self.repo.get_metric_with_config(metric_id)
+        return await self._trend(self.repo, metric_id, metric, start, end, privacy_mode)
+
+    async def trends_batch(self, metric_ids: list[int], start: str, end: str, privacy_mode: bool) -> list[dict]:
+        """Trends of many metrics over one window.
+
+        Metric configs come from one query; values, enum options, checkpoint
+        counts and computed-metric inputs are loaded once per table through
+        PrefetchedAnalyticsRepository and shared by all metrics of the batch.
+        """
+        if not metric_ids:
+            return []
+        metrics = await self.repo.get_metrics_with_config(metric_ids)
+        repo = self.repo
+        if metrics:
+            repo = PrefetchedAnalyticsRepository(
+                self.conn, self.user_id, date_type.fromisoformat(start), date_type.fromisoformat(end),
+            )
+        return [
+            await self._trend(repo, metric_id, metrics.get(metric_id), start, end, privacy_mode)
+            for metric_id in metric_ids
+        ]
+
+    async def _trend(
+        self, repo: AnalyticsRepository, metric_id: int, metric, start: str, end: str, privacy_mode: bool,
+    ) -> dict:
+        qt = QueryTimer(f"trends/{metric_id}")
         if not metric:
             return {"error": "Metric not found"}
         qt.mark("metric")
@@ -32,44 +58,37 @@ class AnalyticsService:
         if mt == MetricType.integration:
             mt = metric["ic_value_type"] or MetricType.number
         start_d, end_d = date_type.fromisoformat(start), date_type.fromisoformat(end)
+        fetcher = ValueFetcher(repo)
 
         if metric["type"] == MetricType.computed:
             formula = ValueConverter.parse_formula(metric.get("formula"))
             ref_ids = get_referenced_metric_ids(formula)
-            aggregated = await ValueFetcher(self.repo).values_by_date_for_computed(
+            aggregated = await fetcher.values_by_date_for_computed(
                 formula, metric.get("result_type") or "float", ref_ids, start_d, end_d, self.user_id)
         elif mt == MetricType.text:
-            rows = await self.repo.get_notes_by_date(metric_id, start_d, end_d)
+            rows = sorted(await repo.fetch_note_counts(metric_id, start_d, end_d), key=lambda r: r["date"])
             qt.mark("values"); qt.log()
             return {"metric_id": metric_id, "metric_name": metric["name"], "metric_type": "text",
                     "start": start, "end": end, "points": [{"date": str(r["date"]), "value": r["cnt"]} for r in rows]}
         elif mt == MetricType.enum:
-            opts = await self.repo.get_enum_options_enabled(metric_id)
+            opts = await repo.get_enum_options_enabled(metric_id)
             option_series = {}
             for o in opts:
-                series = await ValueFetcher(self.repo).values_by_date_for_enum_option(metric_id, o["id"], start_d, end_d, self.user_id)
+                series = await fetcher.values_by_date_for_enum_option(metric_id, o["id"], start_d, end_d, self.user_id)
                 option_series[o["label"]] = [{"date": d, "value": v} for d, v in sorted(series.items())]
             qt.mark("values"); qt.log()
             return {"metric_id": metric_id, "metric_name": metric["name"], "metric_type": "enum",
                     "start": start, "end": end, "options": [{"id": o["id"], "label": o["label"]} for o in opts], "option_series": option_series}
         else:
-            value_table, extra_cols = ValueConverter.get_value_table(mt)
-            rows = await self.repo.get_entries_with_values(metric_id, value_table, extra_cols, start_d, end_d)
-            aggregated = ValueConverter.aggregate_by_date(rows, mt)
+            aggregated = await fetcher.values_by_date_for_checkpoint(metric_id, mt, start_d, end_d, self.user_id)
         qt.mark("values")
         points = [{"date": d, "value": v} for d, v in sorted(aggregated.items())]
         display_name = metric["name"]
-        if mt == MetricType.bool and await self.repo.has_multiple_enabled_checkpoints(metric_id):
+        if mt == MetricType.bool and await repo.has_multiple_enabled_checkpoints(metric_id):
             display_name = f"{display_name} (хоть раз)"
         qt.mark("display_name"); qt.log()
         return {"metric_id": metric_id, "metric_name": display_name, "start": start, "end": end, "points": points}
 
-    async def trends_batch(self, metric_ids: list[int], start: str, end: str, privacy_mode: bool) -> list[dict]:
-        results = []
-        for metric_id in metric_ids:
-            results.append(await self.trends(metric_id, start, end, privacy_mode))
-        return results
-
     async def metric_stats(self, metric_id: int, start: str, end: str, privacy_mode: bool) -> dict:
         qt = QueryTimer(f"metric-stats/{metric_id}")
         metric = await self.repo.get_metric_with_config(metric_id)
@@ -132,22 +151,12 @@ class AnalyticsService:
         }
 
     async def streaks(self, privacy_mode: bool) -> dict:
-        metrics = await self.repo.get_enabled_bool_metrics()
-        result = []
-        for m in metrics:
-            m_private = m.get("private", False)
-            m_blocked = is_blocked(m_private, privacy_mode)
-            rows = await self.repo.get_bool_streak_rows(m["id"])
-            current_streak = 0
-            for r in rows:
-                if r["day_value"] is True:
-                    current_streak += 1
-                else:
-                    break
-            if current_streak > 0:
-                result.append({"metric_id": m["id"], "metric_name": mask_name(m["name"], m_private, privacy_mode),
-                               "current_streak": 0 if m_blocked else current_streak})
-        return {"streaks": result}
+        rows = await self.repo.get_current_bool_streaks()
+        return {"streaks": [
+            {"metric_id": r["id"], "metric_name": mask_name(r["name"], r["private"], privacy_mode),
+             "current_streak": 0 if is_blocked(r["private"], privacy_mode) else r["current_streak"]}
+            for r in rows
+        ]}
 
     # ── Private stat helpers ──────────────────────────────────────
 
@@ -211,15 +220,13 @@ class AnalyticsService:
         if mt == MetricType.bool:
             yc = sum(1 for v in aggregated.values() if v == 1.0); nc = te - yc
             yp = round(yc / te * 100, 1) if te > 0 else 0
-            srows = await self.repo.get_bool_streak_rows(metric_id)
-            cs = 0
-            for r in srows:
-                if r["day_value"] is True: cs += 1
-                else: break
-            ls = run = 0
-            for r in reversed(srows):
+            cs = ls = run = 0; current = True
+            async for r in self.repo.iter_bool_streak_days(metric_id):
                 if r["day_value"] is True: run += 1; ls = max(ls, run)
-                else: run = 0
+                else:
+                    if current: cs = run; current = False
+                    run = 0
+            if current: cs = run
             result.update({"yes_percent": yp, "yes_count": yc, "no_count": nc, "current_streak": cs, "longest_streak": ls})
         elif mt == MetricType.time:
             if values:
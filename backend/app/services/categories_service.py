@@ -37,6 +37,7 @@ class CategoriesService:
 
         sort_order = await self.repo.get_next_sort_order()
         cat_id = await self.repo.create(name, parent_id, sort_order)
+        await self.repo.bump_cache_versions(config=True)
         return CategoryOut(id=cat_id, name=name, parent_id=parent_id, sort_order=sort_order)
 
     async def update(self, cat_id: int, name: str | None, parent_id: int | None) -> CategoryOut:
@@ -65,10 +66,13 @@ class CategoriesService:
             raise InvalidOperationError("Nothing to update")
 
         updated = await self.repo.update(cat_id, updates, params)
+        await self.repo.bump_cache_versions(config=True)
         return CategoryOut(**dict(updated))
 
     async def delete(self, cat_id: int) -> None:
         await self.repo.delete(cat_id)
+        await self.repo.bump_cache_versions(config=True)
 
     async def reorder(self, items: list[dict]) -> None:
         await self.repo.reorder(items)
+        await self.repo.bump_cache_versions(config=True)
@@ -27,6 +27,7 @@ class CheckpointsService:
         await self._layout.add_block("checkpoint", checkpoint_id)
         for iv in await self.repo.get_active_intervals():
             await self._layout.add_block("interval", iv["id"])
+        await self.repo.bump_cache_versions(config=True)
         return CheckpointSettingsOut(id=checkpoint_id, label=label, sort_order=sort_order, description=description, usage_count=0, usage_metric_names=[])
 
     async def update(self, checkpoint_id: int, label: str | None, description: str | None = None) -> CheckpointSettingsOut:
@@ -38,6 +39,7 @@ class CheckpointsService:
             await self.repo.update_label(checkpoint_id, label)
         if description is not None:
             await self.repo.update_description(checkpoint_id, description.strip() or None)
+        await self.repo.bump_cache_versions(config=True)
         updated = await self.repo.get_updated(checkpoint_id)
         usage = await self.repo.get_enabled_usage_count(checkpoint_id)
         names = await self.repo.get_enabled_metric_names(checkpoint_id) if usage > 0 else []
@@ -65,6 +67,7 @@ class CheckpointsService:
         # Add new intervals that appeared
         for new_iv_id in new_intervals - old_intervals:
             await self._layout.add_block("interval", new_iv_id)
+        await self.repo.bump_cache_versions(config=True)
 
     async def merge(self, source_id: int, target_id: int) -> dict:
         if source_id == target_id:
@@ -72,6 +75,7 @@ class CheckpointsService:
         await self.repo.get_by_id(source_id)
         await self.repo.get_by_id(target_id)
         stats = await self.repo.merge(source_id, target_id)
+        await self.repo.bump_cache_versions(config=True)
         return {"ok": True, **stats}
 
     async def get_intervals(self) -> list[dict]:
@@ -80,3 +84,4 @@ class CheckpointsService:
 
     async def reorder(self, items: list[dict]) -> None:
         await self.repo.reorder(items)
+        await self.repo.bump_cache_versions(config=True)
@@ -1,22 +1,22 @@
 """Service layer for correlation reports and pair charts — extracted from AnalyticsService."""
 
-import asyncio
 import logging
+from collections.abc import Mapping
 from datetime import date as date_type, timedelta
 
-from app import database as _db_module
 from app.analytics.correlation_math import PearsonMethod
 from app.analytics.pair_formatter import PairFormatter
 from app.analytics.source_reconstructor import SourceReconstructor
-from app.analytics.time_series import TimeSeriesTransform
+from app.analytics.time_series import DaySeries, TimeSeriesTransform
 from app.analytics.value_converter import ValueConverter
 from app.analytics.value_fetcher import ValueFetcher
-from app.correlation_config import CorrelationConfig, correlation_config
-from app.domain.enums import MetricType, PairStatus
+from app.correlation_config import correlation_config
+from app.domain.enums import MetricType, PairStatus, ReportStatus
 from app.formula import get_referenced_metric_ids
+from app.domain.exceptions import InvalidOperationError
 from app.domain.privacy import is_blocked, PRIVATE_MASK
 from app.repositories.analytics_repository import AnalyticsRepository
-from app.repositories.correlation_repository import CorrelationRepository
+from app.services.report_queue import report_queue
 from app.source_key import SourceKey, STREAK_TYPES
 
 logger = logging.getLogger(__name__)
@@ -52,12 +52,15 @@ class CorrelationService:
             "pairs": [{"date": d, "a": round(a_by_date[d], 2), "b": round(b_by_date[d], 2)} for d in common],
         }
 
-    async def create_report(self, start: str, end: str, config) -> dict:
+    async def create_report(self, start: str, end: str) -> dict:
+        """Queue a report; the user's earlier queued/running reports are superseded."""
         start_date = date_type.fromisoformat(start)
         end_date = date_type.fromisoformat(end)
-        report_id = await self.repo.create_report(start_date, end_date)
-        asyncio.create_task(run_correlation_report(report_id, self.user_id, start, end, config=config))
-        return {"report_id": report_id, "status": "running"}
+        async with self.repo.transaction():
+            await self.repo.cancel_active_reports()
+            report_id = await self.repo.create_report(start_date, end_date)
+        report_queue.kick()
+        return {"report_id": report_id, "status": ReportStatus.QUEUED.value}
 
     async def get_latest_report(self) -> dict:
         rows = await self.repo.get_all_reports()
@@ -66,9 +69,12 @@ class CorrelationService:
         running = None
         done_row = None
         for r in rows:
-            if r["status"] == "running" and running is None:
-                running = {"id": r["id"], "status": "running", "created_at": r["created_at"].isoformat()}
-            elif r["status"] == "done" and done_row is None:
+            if r["status"] in (ReportStatus.QUEUED, ReportStatus.RUNNING) and running is None:
+                running = {
+                    "id": r["id"], "status": r["status"], "created_at": r["created_at"].isoformat(),
+                    "phase": r["phase"], "progress": round(r["progress"], 2),
+                }
+            elif r["status"] == ReportStatus.DONE and done_row is None:
                 done_row = r
         report = None
         if done_row:
@@ -89,11 +95,16 @@ class CorrelationService:
     async def get_pairs(
         self, report_id: int, category: str, offset: int, limit: int,
         metric_ids_str: str | None, privacy_mode: bool,
-        status: str | None = None,
+        status: str | None = None, cursor: str | None = None, include_total: bool = True,
     ) -> dict:
+        """Page of pairs; `cursor` (next_cursor of the previous page) seeks instead of offset.
+
+        With include_total=False the COUNT query is skipped and total is None.
+        """
         report_row = await self.repo.get_report_owned(report_id)
         if not report_row:
-            return {"pairs": [], "total": 0, "has_more": False}
+            return {"pairs": [], "total": 0, "has_more": False, "next_cursor": None}
+        after = self._parse_cursor(cursor) if cursor else None
 
         cat_filter = PairFormatter.category_filter_sql(category, correlation_config.thresholds)
         metric_filter = ""
@@ -107,10 +118,14 @@ class CorrelationService:
 
         status_filter = self._build_status_filter(status)
 
-        total = await self.repo.count_pairs(report_id, cat_filter, metric_filter, args_base, status_filter)
-        pairs = await self.repo.fetch_pairs_page(
-            report_id, cat_filter, metric_filter, args_base, limit, offset, status_filter,
+        total = None
+        if include_total:
+            total = await self.repo.count_pairs(report_id, cat_filter, metric_filter, args_base, status_filter)
+        rows = await self.repo.fetch_pairs_page(
+            report_id, cat_filter, metric_filter, args_base, limit + 1, offset, status_filter, after=after,
         )
+        has_more = len(rows) > limit
+        pairs = rows[:limit]
 
         all_parent_ids, all_enum_ids = self._collect_source_key_ids(pairs)
         metric_icons, parent_names = await self._batch_load_parents(all_parent_ids)
@@ -138,21 +153,26 @@ class CorrelationService:
                 metrics_with_checkpoints=mws,
                 checkpoint_labels=merged_labels, checkpoint_ordering=merged_ordering,
             ).format_pair(p) for p in pairs],
-            "total": total, "has_more": offset + limit < total,
+            "total": total, "has_more": has_more,
+            "next_cursor": f"{pairs[-1]['abs_correlation']!r}:{pairs[-1]['pair_id']}" if has_more else None,
         }
 
+    @staticmethod
+    def _parse_cursor(cursor: str) -> tuple[float, int]:
+        try:
+            abs_corr, pair_id = cursor.split(":")
+            return float(abs_corr), int(pair_id)
+        except ValueError:
+            raise InvalidOperationError("Invalid cursor") from None
+
     async def pair_chart(self, pair_id: int, privacy_mode: bool) -> dict:
         row = await self.repo.get_pair_with_report(pair_id)
         if not row or row["user_id"] != self.user_id:
             return {"dates": [], "values_a": [], "values_b": []}
 
-        priv_a = await self.repo.get_metric_privacy(row["metric_a_id"]) if row["metric_a_id"] else False
-        priv_b = await self.repo.get_metric_privacy(row["metric_b_id"]) if row["metric_b_id"] else False
-        blocked_a, blocked_b = is_blocked(priv_a, privacy_mode), is_blocked(priv_b, privacy_mode)
+        blocked_a, blocked_b = is_blocked(row["private_a"], privacy_mode), is_blocked(row["private_b"], privacy_mode)
 
-        recon = SourceReconstructor(self.repo)
-        data_a = await recon.reconstruct(row["source_key_a"], row["type_a"], row["period_start"], row["period_end"], self.user_id)
-        data_b = await recon.reconstruct(row["source_key_b"], row["type_b"], row["period_start"], row["period_end"], self.user_id)
+        data_a, data_b = await self._load_pair_series(row)
 
         lag = row["lag_days"] or 0
         if lag > 0:
@@ -160,14 +180,10 @@ class CorrelationService:
         common = sorted(set(data_a) & set(data_b))
 
         type_a, type_b = row["type_a"], row["type_b"]
-        if type_a == MetricType.computed and row["metric_a_id"]:
-            rt = await self.repo.get_computed_result_type(row["metric_a_id"])
-            if rt:
-                type_a = rt
-        if type_b == MetricType.computed and row["metric_b_id"]:
-            rt = await self.repo.get_computed_result_type(row["metric_b_id"])
-            if rt:
-                type_b = rt
+        if type_a == MetricType.computed and row["result_type_a"]:
+            type_a = row["result_type_a"]
+        if type_b == MetricType.computed and row["result_type_b"]:
+            type_b = row["result_type_b"]
 
         original_dates_b = [str(date_type.fromisoformat(d) - timedelta(days=lag)) for d in common] if lag > 0 else None
 
@@ -178,8 +194,7 @@ class CorrelationService:
             pm_rows = await self.repo.get_metric_names_icons(list(parent_ids))
             parent_names = {r["id"]: r["name"] for r in pm_rows}
 
-        ma_name = await self.repo.get_metric_name(row["metric_a_id"]) if row["metric_a_id"] else None
-        mb_name = await self.repo.get_metric_name(row["metric_b_id"]) if row["metric_b_id"] else None
+        ma_name, mb_name = row["name_a"], row["name_b"]
         all_chart_mids = [mid for mid in (row["metric_a_id"], row["metric_b_id"]) if mid]
         all_chart_mids += list(parent_ids)
         chart_mws = await self.repo.get_metrics_with_multiple_checkpoints(all_chart_mids)
@@ -206,6 +221,21 @@ class CorrelationService:
             "original_dates_b": original_dates_b if not (blocked_a or blocked_b) else None,
         }
 
+    async def _load_pair_series(self, row) -> tuple[Mapping[str, float], Mapping[str, float]]:
+        """Both sides of a pair: series stored with the report, reconstructed only when missing."""
+        keys = [row["source_key_a"], row["source_key_b"]]
+        stored = await self.repo.load_report_series(row["report_id"], keys)
+        recon = SourceReconstructor(self.repo)
+        out: list[Mapping[str, float]] = []
+        for key, source_type in zip(keys, (row["type_a"], row["type_b"])):
+            if key in stored:
+                out.append(DaySeries.from_bytes(stored[key]))
+            else:
+                out.append(await recon.reconstruct(
+                    key, source_type, row["period_start"], row["period_end"], self.user_id,
+                ))
+        return out[0], out[1]
+
     # ── Pair statuses ────────────────────────────────────────────
 
     async def set_pair_status(
@@ -310,29 +340,3 @@ class CorrelationService:
                     icons[r["id"]] = r["icon"]
         return icons, names
 
-
-async def run_correlation_report(
-    report_id: int, user_id: int, start: str, end: str,
-    config: CorrelationConfig | None = None,
-) -> None:
-    """Top-level entry point for asyncio.create_task. Acquires connection and runs engine."""
-    from app.analytics.correlation_engine import CorrelationEngine
-
-    try:
-        async with _db_module.pool.acquire() as conn:
-            repo = CorrelationRepository(conn, user_id)
-            engine = CorrelationEngine(
-                repo, report_id,
-                date_type.fromisoformat(start),
-                date_type.fromisoformat(end),
-                config=config,
-            )
-            await engine.run()
-    except Exception:
-        logger.exception("Error computing correlation report %s", report_id)
-        try:
-            async with _db_module.pool.acquire() as conn:
-                repo = CorrelationRepository(conn, user_id)
-                await repo.mark_report_error(report_id)
-        except Exception:
-            logger.exception("Failed to update report status to error")
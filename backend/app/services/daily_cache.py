@@ -0,0 +1,75 @@
+"""In-process cache for daily summary data, validated by per-user version counters.
+
+Counters live in ``user_cache_versions`` so every API process sees the same
+invalidation; the snapshots themselves are per process.  ``config`` covers
+metric definitions, checkpoints, intervals, enum options and layout;
+``entries`` covers entries, values and notes.  A config bump also retires
+cached day data because day snapshots are keyed by both counters.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date as date_type
+
+CONFIG_CACHE_SIZE = 256
+DAY_CACHE_SIZE = 1024
+
+
+@dataclass(frozen=True)
+class CacheVersions:
+    """Версии конфигурации и записей пользователя."""
+
+    config: int = 0
+    entries: int = 0
+
+
+class DailyCache:
+    """LRU-снимки конфигурации (по пользователю) и данных дня (по пользователю и дате).
+
+    Снимки только читаются: сервис собирает из них новые объекты ответа.
+    """
+
+    def __init__(self, config_size: int = CONFIG_CACHE_SIZE, day_size: int = DAY_CACHE_SIZE) -> None:
+        self.config_size = config_size
+        self.day_size = day_size
+        self._config: OrderedDict[int, tuple[int, dict]] = OrderedDict()
+        self._days: OrderedDict[tuple[int, date_type], tuple[CacheVersions, dict]] = OrderedDict()
+
+    def get_config(self, user_id: int, versions: CacheVersions) -> dict | None:
+        """Return the config snapshot if it was built at the current config version."""
+        cached = self._config.get(user_id)
+        if cached is None or cached[0] != versions.config:
+            return None
+        self._config.move_to_end(user_id)
+        return cached[1]
+
+    def put_config(self, user_id: int, versions: CacheVersions, snapshot: dict) -> None:
+        self._config[user_id] = (versions.config, snapshot)
+        self._config.move_to_end(user_id)
+        if len(self._config) > self.config_size:
+            self._config.popitem(last=False)
+
+    def get_day(self, user_id: int, d: date_type, versions: CacheVersions) -> dict | None:
+        """Return day data if both counters match the ones it was built at."""
+        key = (user_id, d)
+        cached = self._days.get(key)
+        if cached is None or cached[0] != versions:
+            return None
+        self._days.move_to_end(key)
+        return cached[1]
+
+    def put_day(self, user_id: int, d: date_type, versions: CacheVersions, data: dict) -> None:
+        key = (user_id, d)
+        self._days[key] = (versions, data)
+        self._days.move_to_end(key)
+        if len(self._days) > self.day_size:
+            self._days.popitem(last=False)
+
+    def clear(self) -> None:
+        self._config.clear()
+        self._days.clear()
+
+
+daily_cache = DailyCache()
@@ -9,6 +9,7 @@ from app.domain.privacy import mask_name, mask_icon, is_blocked
 from app.domain.formatters import format_display_value
 from app.analytics.value_converter import ValueConverter
 from app.repositories.daily_repository import DailyRepository
+from app.services.daily_cache import CacheVersions, daily_cache
 from app.services.daily_helpers import (
     evaluate_visibility, compute_formulas, build_auto_metrics,
     calculate_progress, split_by_checkpoints,
@@ -43,10 +44,24 @@ class DailyService:
         return {"date": date_str, "metrics": result, "checkpoints": checkpoints, "intervals": intervals, "auto_metrics": auto_metrics, "progress": progress}
 
     async def _load_daily_data(self, d: date_type, qt: QueryTimer) -> dict:
+        """Config snapshot + day data, each reused while the user's cache versions are unchanged."""
+        versions = CacheVersions(*await self.repo.get_cache_versions())
+        qt.mark("versions")
+        user_id = self.repo.user_id
+        config = daily_cache.get_config(user_id, versions)
+        if config is None:
+            config = await self._load_config(qt)
+            daily_cache.put_config(user_id, versions, config)
+        day = daily_cache.get_day(user_id, d, versions)
+        if day is None:
+            day = await self._load_day(config, d, qt)
+            daily_cache.put_day(user_id, d, versions, day)
+        return {**config, **day}
+
+    async def _load_config(self, qt: QueryTimer) -> dict:
+        """Metric definitions, bindings, enum options and layout — independent of the date."""
         metrics = await self.repo.get_enabled_metrics_with_config()
         qt.mark("metrics")
-        entries = await self.repo.get_entries_for_date(d)
-        qt.mark("entries")
         metric_ids = [m["id"] for m in metrics]
 
         # Load checkpoint bindings
@@ -56,12 +71,6 @@ class DailyService:
         for r in enabled_cp_rows:
             enabled_checkpoints[r["metric_id"]].append(r)
 
-        disabled_cp_rows = await self.repo.get_disabled_checkpoints_with_entries(metric_ids, d)
-        qt.mark("disabled_checkpoints")
-        disabled_checkpoints: dict[int, list] = defaultdict(list)
-        for r in disabled_cp_rows:
-            disabled_checkpoints[r["metric_id"]].append(r)
-
         # Load interval bindings
         enabled_iv_rows = await self.repo.get_enabled_intervals(metric_ids)
         qt.mark("intervals")
@@ -69,29 +78,12 @@ class DailyService:
         for r in enabled_iv_rows:
             enabled_intervals[r["metric_id"]].append(r)
 
-        disabled_iv_rows = await self.repo.get_disabled_intervals_with_entries(metric_ids, d)
-        qt.mark("disabled_intervals")
-        disabled_intervals: dict[int, list] = defaultdict(list)
-        for r in disabled_iv_rows:
-            disabled_intervals[r["metric_id"]].append(r)
-
-        entries_by_metric: dict[int, list] = defaultdict(list)
-        for e in entries:
-            entries_by_metric[e["metric_id"]].append(e)
-
         metric_type_map: dict[int, str] = {}
         for m in metrics:
             metric_type_map[m["id"]] = (m.get("value_type") or MetricType.number) if m["type"] == MetricType.integration else m["type"]
 
-        entry_ids_by_type: dict[str, list[int]] = defaultdict(list)
-        for e in entries:
-            entry_ids_by_type[metric_type_map.get(e["metric_id"], MetricType.bool)].append(e["id"])
-
-        values_map, scale_ctx = await self.repo.batch_load_values(entry_ids_by_type)
         enum_ids = [m["id"] for m in metrics if m["type"] == MetricType.enum]
         enum_opts = await self.repo.get_enum_options_for_metrics(enum_ids)
-        text_ids = [m["id"] for m in metrics if m["type"] == MetricType.text]
-        notes_count, notes_by = await self.repo.get_notes_for_date(text_ids, d)
 
         # Load all user checkpoints and active intervals for layout
         all_user_checkpoints = await self.repo.get_all_user_checkpoints()
@@ -99,20 +91,71 @@ class DailyService:
 
         # Load daily layout (block ordering)
         daily_layout = await self.repo.get_daily_layout()
+        qt.mark("layout")
 
         return {
             "metrics": metrics, "metrics_by_id": {m["id"]: m for m in metrics},
-            "enabled_checkpoints": enabled_checkpoints, "disabled_checkpoints": disabled_checkpoints,
-            "enabled_intervals": enabled_intervals, "disabled_intervals": disabled_intervals,
-            "entries_by_metric": entries_by_metric,
-            "values_map": values_map, "scale_context_map": scale_ctx,
+            "metric_type_map": metric_type_map,
+            "enabled_checkpoints": enabled_checkpoints, "enabled_intervals": enabled_intervals,
             "enum_options_by_metric": enum_opts,
-            "notes_count_map": notes_count, "notes_by_metric": notes_by,
             "all_user_checkpoints": all_user_checkpoints,
             "active_intervals": active_intervals,
             "daily_layout": daily_layout,
         }
 
+    async def _load_day(self, config: dict, d: date_type, qt: QueryTimer) -> dict:
+        """Entries, values and notes of one date for the metrics in ``config``.
+
+        Entries arrive together with their values; the disabled-binding lookups
+        run only when some entry points at a checkpoint/interval that is not an
+        enabled binding of its metric.
+        """
+        metrics = config["metrics"]
+        metric_ids = [m["id"] for m in metrics]
+        entries, values_map, scale_ctx = await self.repo.get_entries_with_values(d, config["metric_type_map"])
+        qt.mark("entries")
+
+        metrics_by_id = config["metrics_by_id"]
+        enabled_cp = {(mid, r["id"]) for mid, rows in config["enabled_checkpoints"].items() for r in rows}
+        enabled_iv = {(mid, r["id"]) for mid, rows in config["enabled_intervals"].items() for r in rows}
+        need_cp = any(
+            e["checkpoint_id"] is not None and e["metric_id"] in metrics_by_id
+            and (e["metric_id"], e["checkpoint_id"]) not in enabled_cp
+            for e in entries
+        )
+        need_iv = any(
+            e["interval_id"] is not None and e["metric_id"] in metrics_by_id
+            and (e["metric_id"], e["interval_id"]) not in enabled_iv
+            for e in entries
+        )
+
+        disabled_checkpoints: dict[int, list] = defaultdict(list)
+        if need_cp:
+            for r in await self.repo.get_disabled_checkpoints_with_entries(metric_ids, d):
+                disabled_checkpoints[r["metric_id"]].append(r)
+            qt.mark("disabled_checkpoints")
+
+        disabled_intervals: dict[int, list] = defaultdict(list)
+        if need_iv:
+            for r in await self.repo.get_disabled_intervals_with_entries(metric_ids, d):
+                disabled_intervals[r["metric_id"]].append(r)
+            qt.mark("disabled_intervals")
+
+        entries_by_metric: dict[int, list] = defaultdict(list)
+        for e in entries:
+            entries_by_metric[e["metric_id"]].append(e)
+
+        text_ids = [m["id"] for m in metrics if m["type"] == MetricType.text]
+        notes_count, notes_by = await self.repo.get_notes_for_date(text_ids, d)
+        qt.mark("notes")
+
+        return {
+            "disabled_checkpoints": disabled_checkpoints, "disabled_intervals": disabled_intervals,
+            "entries_by_metric": entries_by_metric,
+            "values_map": values_map, "scale_context_map": scale_ctx,
+            "notes_count_map": notes_count, "notes_by_metric": notes_by,
+        }
+
     def _build_metric_responses(self, data: dict, d: date_type, privacy_mode: bool) -> list[dict]:
         result: list[dict] = []
         for m in data["metrics"]:
@@ -111,6 +111,7 @@ class EntriesService:
                 time_start=ts_start, time_end=ts_end,
             )
             await self.repo.insert_value(entry_id, value, mt, entry_date=d, metric_id=metric_id)
+            await self.repo.bump_cache_versions(entries=True)
 
         row = await self.repo.get_with_binding(entry_id)
         return await _entry_to_out(self.repo, row, mt)
@@ -120,6 +121,7 @@ class EntriesService:
         raw_mt = await self.repo.get_metric_type(row["metric_id"]) or MetricType.bool
         mt = await self.repo.resolve_storage_type(row["metric_id"], raw_mt)
         await self.repo.update_value(entry_id, value, mt, entry_date=row["date"], metric_id=row["metric_id"])
+        await self.repo.bump_cache_versions(entries=True)
         return await _entry_to_out(self.repo, row, mt)
 
     async def update_time(self, entry_id: int, time_str: str, date_str: str | None = None) -> EntryOut:
@@ -134,6 +136,7 @@ class EntriesService:
         new_time = datetime(d.year, d.month, d.day, hour, minute, tzinfo=timezone.utc)
 
         await self.repo.update_recorded_at(entry_id, new_time)
+        await self.repo.bump_cache_versions(entries=True)
         updated_row = await self.repo.get_with_binding(entry_id)
         raw_mt = await self.repo.get_metric_type(row["metric_id"]) or MetricType.bool
         mt = await self.repo.resolve_storage_type(row["metric_id"], raw_mt)
@@ -159,6 +162,7 @@ class EntriesService:
             "UPDATE entries SET time_start = $1, time_end = $2 WHERE id = $3 AND user_id = $4",
             ts_start, ts_end, entry_id, self.repo.user_id,
         )
+        await self.repo.bump_cache_versions(entries=True)
         updated_row = await self.repo.get_with_binding(entry_id)
         raw_mt = await self.repo.get_metric_type(metric_id) or MetricType.bool
         mt = await self.repo.resolve_storage_type(metric_id, raw_mt)
@@ -166,6 +170,7 @@ class EntriesService:
 
     async def delete(self, entry_id: int) -> None:
         await self.repo.delete(entry_id)
+        await self.repo.bump_cache_versions(entries=True)
 
     async def get_date_range(self) -> dict:
         return await self.repo.get_date_range()
@@ -4,30 +4,87 @@ import csv
 import json
 import zipfile
 from collections import defaultdict
-from io import StringIO, BytesIO
+from collections.abc import AsyncIterator, Iterable
+from io import RawIOBase, StringIO, TextIOWrapper
 
 from app.domain.enums import MetricType
-from app.repositories.entry_repository import EntryRepository
+from app.repositories.entry_repository import joined_value
 from app.repositories.export_repository import ExportRepository
 
+EXPORT_CHUNK_ROWS = 1000
+
+
+class _ZipSink(RawIOBase):
+    """Write-only, non-seekable buffer that ZipFile streams into; drained after every chunk."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _rows(items: Iterable) -> AsyncIterator:
+    for item in items:
+        yield item
+
 
 class ExportService:
     def __init__(self, repo: ExportRepository, conn) -> None:
         self.repo = repo
         self.conn = conn
 
-    async def export_zip(self) -> BytesIO:
-        """Generate ZIP archive with all user data."""
-        zip_buffer = BytesIO()
+    async def stream_zip(self) -> AsyncIterator[bytes]:
+        """Yield the ZIP archive with all user data in compressed chunks.
 
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        CSV rows are written into the archive as they are read, so memory stays
+        bounded by EXPORT_CHUNK_ROWS rather than the account history. Needs an
+        open transaction on the connection (entries are read through a cursor).
+        """
+        sink = _ZipSink()
+        with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as zip_file:
             metrics = await self._export_metrics(zip_file)
-            await self._export_entries(zip_file, metrics)
-            await self._export_aw_data(zip_file)
-            await self._export_notes(zip_file)
-
-        zip_buffer.seek(0)
-        return zip_buffer
+            yield sink.drain()
+            for part in (self._export_entries(zip_file, metrics), self._export_aw_data(zip_file),
+                         self._export_notes(zip_file)):
+                async for _ in part:
+                    yield sink.drain()
+        yield sink.drain()
+
+    @staticmethod
+    async def _write_csv(
+        zip_file: zipfile.ZipFile, name: str, header: list[str], rows: AsyncIterator[list],
+        *, skip_empty: bool = False,
+    ) -> AsyncIterator[None]:
+        """Write a CSV member row by row, pausing every EXPORT_CHUNK_ROWS rows so the caller can drain.
+
+        With ``skip_empty`` the member is left out when there are no rows.
+        """
+        first = await anext(rows, None)
+        if first is None and skip_empty:
+            return
+        with zip_file.open(name, 'w') as raw, TextIOWrapper(raw, encoding='utf-8', newline='') as text:
+            writer = csv.writer(text)
+            writer.writerow(header)
+            if first is None:
+                return
+            writer.writerow(first)
+            n = 1
+            async for row in rows:
+                writer.writerow(row)
+                n += 1
+                if n % EXPORT_CHUNK_ROWS == 0:
+                    text.flush()
+                    yield
 
     async def _export_metrics(self, zip_file: zipfile.ZipFile) -> list:
         metrics = await self.repo.get_metrics_for_export()
@@ -122,7 +179,7 @@ class ExportService:
         zip_file.writestr('metrics.csv', metrics_csv.getvalue())
         return metrics
 
-    async def _export_entries(self, zip_file: zipfile.ZipFile, metrics: list) -> None:
+    async def _export_entries(self, zip_file: zipfile.ZipFile, metrics: list) -> AsyncIterator[None]:
         slug_lookup = {m["id"]: m["slug"] for m in metrics}
         type_lookup = {
             m["id"]: (m.get("value_type") or MetricType.number) if m["type"] == MetricType.integration else m["type"]
@@ -130,72 +187,64 @@ class ExportService:
         }
         enum_id_to_label = await self.repo.get_all_enum_options_by_id([m["id"] for m in metrics])
 
-        entries_csv = StringIO()
-        writer = csv.writer(entries_csv)
-        writer.writerow([
+        async def rows() -> AsyncIterator[list]:
+            async for e in self.repo.iter_entries_for_export(EXPORT_CHUNK_ROWS):
+                slug = slug_lookup.get(e["metric_id"])
+                if not slug:
+                    continue
+                mt = type_lookup.get(e["metric_id"], MetricType.bool)
+                if mt in (MetricType.computed, MetricType.text):
+                    continue
+                value = joined_value(e, mt)
+                if mt == MetricType.enum and isinstance(value, list):
+                    id_map = enum_id_to_label.get(e["metric_id"], {})
+                    value = [id_map.get(oid, str(oid)) for oid in value]
+                time_start = e.get("time_start")
+                time_end = e.get("time_end")
+                yield [
+                    str(e["date"]), slug, json.dumps(value),
+                    e["checkpoint_id"] if e.get("checkpoint_id") is not None else '',
+                    e.get("checkpoint_label") or '',
+                    e["interval_id"] if e.get("interval_id") is not None else '',
+                    e.get("interval_start_label") or '',
+                    e.get("interval_end_label") or '',
+                    1 if e.get("is_free_checkpoint") else '',
+                    str(e["recorded_at"]) if e.get("is_free_checkpoint") else '',
+                    1 if e.get("is_free_interval") else '',
+                    f"{time_start.hour:02d}:{time_start.minute:02d}" if time_start else '',
+                    f"{time_end.hour:02d}:{time_end.minute:02d}" if time_end else '',
+                ]
+
+        header = [
             'date', 'metric_slug', 'value',
             'checkpoint_id', 'checkpoint_label',
             'interval_id', 'interval_start_label', 'interval_end_label',
             'is_free_checkpoint', 'recorded_at',
             'is_free_interval', 'time_start', 'time_end',
-        ])
-
-        entry_repo = EntryRepository(self.conn, self.repo.user_id)
-        entries = await self.repo.get_entries_for_export()
-        for e in entries:
-            slug = slug_lookup.get(e["metric_id"])
-            if not slug:
-                continue
-            mt = type_lookup.get(e["metric_id"], MetricType.bool)
-            if mt in (MetricType.computed, MetricType.text):
-                continue
-            value = await entry_repo.get_entry_value(e["id"], mt)
-            if mt == MetricType.enum and isinstance(value, list):
-                id_map = enum_id_to_label.get(e["metric_id"], {})
-                value = [id_map.get(oid, str(oid)) for oid in value]
-            time_start = e.get("time_start")
-            time_end = e.get("time_end")
-            writer.writerow([
-                str(e["date"]), slug, json.dumps(value),
-                e["checkpoint_id"] if e.get("checkpoint_id") is not None else '',
-                e.get("checkpoint_label") or '',
-                e["interval_id"] if e.get("interval_id") is not None else '',
-                e.get("interval_start_label") or '',
-                e.get("interval_end_label") or '',
-                1 if e.get("is_free_checkpoint") else '',
-                str(e["recorded_at"]) if e.get("is_free_checkpoint") else '',
-                1 if e.get("is_free_interval") else '',
-                f"{time_start.hour:02d}:{time_start.minute:02d}" if time_start else '',
-                f"{time_end.hour:02d}:{time_end.minute:02d}" if time_end else '',
-            ])
-
-        zip_file.writestr('entries.csv', entries_csv.getvalue())
+        ]
+        async for _ in self._write_csv(zip_file, 'entries.csv', header, rows()):
+            yield
 
-    async def _export_aw_data(self, zip_file: zipfile.ZipFile) -> None:
+    async def _export_aw_data(self, zip_file: zipfile.ZipFile) -> AsyncIterator[None]:
         aw_daily_rows = await self.repo.get_aw_daily()
         if aw_daily_rows:
-            buf = StringIO()
-            writer = csv.writer(buf)
-            writer.writerow(['date', 'total_seconds', 'active_seconds'])
-            for r in aw_daily_rows:
-                writer.writerow([str(r["date"]), r["total_seconds"], r["active_seconds"]])
-            zip_file.writestr('aw_daily.csv', buf.getvalue())
-
-        aw_app_rows = await self.repo.get_aw_apps()
-        if aw_app_rows:
-            buf = StringIO()
-            writer = csv.writer(buf)
-            writer.writerow(['date', 'app_name', 'source', 'duration_seconds'])
-            for r in aw_app_rows:
-                writer.writerow([str(r["date"]), r["app_name"], r["source"], r["duration_seconds"]])
-            zip_file.writestr('aw_apps.csv', buf.getvalue())
-
-    async def _export_notes(self, zip_file: zipfile.ZipFile) -> None:
-        notes_rows = await self.repo.get_notes_for_export()
-        if notes_rows:
-            buf = StringIO()
-            writer = csv.writer(buf)
-            writer.writerow(['date', 'metric_slug', 'text', 'created_at'])
-            for r in notes_rows:
-                writer.writerow([str(r["date"]), r["metric_slug"], r["text"], str(r["created_at"])])
-            zip_file.writestr('notes.csv', buf.getvalue())
+            rows = _rows([str(r["date"]), r["total_seconds"], r["active_seconds"]] for r in aw_daily_rows)
+            async for _ in self._write_csv(zip_file, 'aw_daily.csv', ['date', 'total_seconds', 'active_seconds'], rows):
+                yield
+
+        async def app_rows() -> AsyncIterator[list]:
+            async for r in self.repo.iter_aw_apps(EXPORT_CHUNK_ROWS):
+                yield [str(r["date"]), r["app_name"], r["source"], r["duration_seconds"]]
+
+        header = ['date', 'app_name', 'source', 'duration_seconds']
+        async for _ in self._write_csv(zip_file, 'aw_apps.csv', header, app_rows(), skip_empty=True):
+            yield
+
+    async def _export_notes(self, zip_file: zipfile.ZipFile) -> AsyncIterator[None]:
+        async def rows() -> AsyncIterator[list]:
+            async for r in self.repo.iter_notes_for_export(EXPORT_CHUNK_ROWS):
+                yield [str(r["date"]), r["metric_slug"], r["text"], str(r["created_at"])]
+
+        header = ['date', 'metric_slug', 'text', 'created_at']
+        async for _ in self._write_csv(zip_file, 'notes.csv', header, rows(), skip_empty=True):
+            yield
@@ -2,12 +2,22 @@
 
 import csv
 import json
-from datetime import date as date_type, time as time_type
-from io import StringIO
+from datetime import date as date_type, datetime, time as time_type
+from io import StringIO, TextIOWrapper
 
 from app.domain.enums import MetricType
 from app.repositories.entry_repository import EntryRepository
 
+IMPORT_BATCH_SIZE = 5000
+
+# Stage and entry/value columns are INTEGER; a wider value would abort the whole COPY.
+_INT32_MIN, _INT32_MAX = -2**31, 2**31 - 1
+
+
+def _check_int32(value: int | None, field: str) -> None:
+    if value is not None and not _INT32_MIN <= value <= _INT32_MAX:
+        raise ValueError(f"{field} {value} is out of range")
+
 
 class EntryImporter:
     """Handles importing entries and auxiliary data (AW, notes) from ZIP."""
@@ -20,94 +30,125 @@ class EntryImporter:
     async def import_entries(
         self, zip_file, slug_to_id: dict, slug_to_type: dict,
     ) -> tuple[int, int, list[str]]:
-        imported = 0
+        """Bulk-import entries.csv: parse rows as a stream, COPY them into a stage
+        table in batches, then resolve duplicates and insert entries and values
+        with a few set-based statements — all in one transaction.
+        """
         skipped = 0
-        errors: list[str] = []
+        errors: list[tuple[int, str]] = []
 
         all_metric_ids = list(slug_to_id.values())
         checkpoint_lookup = await self.repo.get_checkpoint_lookup(all_metric_ids)
         global_label_lookup = await self.repo.get_global_checkpoint_label_lookup()
+        enum_ids = [mid for slug, mid in slug_to_id.items() if slug_to_type.get(slug) == MetricType.enum]
+        enum_labels = await self.repo.get_enum_option_label_lookup(enum_ids)
+
+        async with self.repo.transaction():
+            await self.repo.create_entry_stage()
+            batch: list[tuple] = []
+            with zip_file.open('entries.csv') as raw:
+                reader = csv.DictReader(TextIOWrapper(raw, encoding='utf-8', newline=''))
+                for row_num, row in enumerate(reader, start=2):
+                    try:
+                        record = await self._stage_record(
+                            row_num, row, slug_to_id, slug_to_type,
+                            checkpoint_lookup, global_label_lookup, enum_labels)
+                    except Exception as e:
+                        errors.append((row_num, str(e)))
+                        skipped += 1
+                        continue
+                    if record is None:
+                        skipped += 1
+                        continue
+                    batch.append(record)
+                    if len(batch) >= IMPORT_BATCH_SIZE:
+                        await self.repo.stage_entries(batch)
+                        batch = []
+            await self.repo.stage_entries(batch)
+            imported, duplicates, stage_errors = await self.repo.apply_entry_stage()
+
+        skipped += duplicates + len(stage_errors)
+        errors.extend(stage_errors)
+        errors.sort()
+        return imported, skipped, [f"Row {n}: {msg}" for n, msg in errors]
+
+    async def _stage_record(
+        self, row_num: int, row: dict, slug_to_id: dict, slug_to_type: dict,
+        checkpoint_lookup: dict, global_label_lookup: dict, enum_labels: dict,
+    ) -> tuple | None:
+        """Parse one CSV row into a stage record; None means skip, an exception is a row error.
+
+        Every shape the entries CHECK constraints or the INTEGER columns would
+        reject is raised here: a single bad row must not abort the bulk insert.
+        """
+        slug = row.get('metric_slug', '')
+        metric_id = slug_to_id.get(slug)
+        if not metric_id or slug_to_type.get(slug) in (MetricType.computed, MetricType.text):
+            return None
 
-        text = zip_file.read('entries.csv').decode('utf-8')
-        reader = csv.DictReader(StringIO(text))
-
-        for row_num, row in enumerate(reader, start=2):
-            try:
-                slug = row.get('metric_slug', '')
-                metric_id = slug_to_id.get(slug)
-                if not metric_id or slug_to_type.get(slug) in (MetricType.computed, MetricType.text):
-                    skipped += 1
-                    continue
+        d = date_type.fromisoformat(row['date'])
+        checkpoint_id, interval_id = self._resolve_entry_binding(
+            row, metric_id, checkpoint_lookup, global_label_lookup)
+
+        # Backward compat: old format with slot_sort_order
+        if checkpoint_id is None and interval_id is None:
+            csv_so = row.get('slot_sort_order', '')
+            if csv_so not in ('', None):
+                try:
+                    so = int(csv_so)
+                    label = row.get('slot_label', '') or row.get('checkpoint_label', '') or f'Checkpoint {so}'
+                    # Create checkpoint as deleted (not in metric's checkpoint_labels = was deleted)
+                    new_cp_id = await self.repo.find_or_create_checkpoint(label, deleted=True)
+                    checkpoint_lookup[metric_id][so] = new_cp_id
+                    global_label_lookup[label] = new_cp_id
+                    checkpoint_id = new_cp_id
+                except (ValueError, TypeError):
+                    pass
+
+        _check_int32(checkpoint_id, "checkpoint_id")
+        _check_int32(interval_id, "interval_id")
+
+        is_free_cp = row.get('is_free_checkpoint', '') == '1'
+        is_free_iv = row.get('is_free_interval', '') == '1'
+        if is_free_cp and is_free_iv:
+            raise ValueError("entry cannot be both a free checkpoint and a free interval")
+        recorded_at = None
+        time_start = time_end = None
+        if is_free_cp:
+            if checkpoint_id is not None or interval_id is not None:
+                raise ValueError("free checkpoint entry cannot have checkpoint_id or interval_id")
+            if row.get('recorded_at'):
+                recorded_at = datetime.fromisoformat(row['recorded_at'])
+        if is_free_iv:
+            checkpoint_id = interval_id = None
+            time_start = self._parse_time_field(row.get('time_start', ''))
+            time_end = self._parse_time_field(row.get('time_end', ''))
+            if time_start is None or time_end is None:
+                raise ValueError("free interval entry requires time_start and time_end")
+            if time_end <= time_start:
+                raise ValueError("time_end must be after time_start")
+
+        mt = slug_to_type.get(slug, MetricType.bool)
+        value = self._coerce_value(json.loads(row.get('value', 'false')), mt, enum_labels.get(metric_id, {}))
+        if value is None:
+            return None
 
-                d = date_type.fromisoformat(row['date'])
-                checkpoint_id, interval_id = self._resolve_entry_binding(
-                    row, metric_id, checkpoint_lookup, global_label_lookup)
-
-                # Backward compat: old format with slot_sort_order
-                if checkpoint_id is None and interval_id is None:
-                    csv_so = row.get('slot_sort_order', '')
-                    if csv_so not in ('', None):
-                        try:
-                            so = int(csv_so)
-                            label = row.get('slot_label', '') or row.get('checkpoint_label', '') or f'Checkpoint {so}'
-                            # Create checkpoint as deleted (not in metric's checkpoint_labels = was deleted)
-                            new_cp_id = await self.repo.find_or_create_checkpoint(label, deleted=True)
-                            checkpoint_lookup[metric_id][so] = new_cp_id
-                            global_label_lookup[label] = new_cp_id
-                            checkpoint_id = new_cp_id
-                        except (ValueError, TypeError):
-                            pass
-
-                # Handle new checkpoint_id from CSV that isn't in lookup
-                if checkpoint_id is None and row.get('checkpoint_id', '') not in ('', None):
-                    try:
-                        raw_cp_id = int(row['checkpoint_id'])
-                        label = row.get('checkpoint_label', '') or f'Checkpoint {raw_cp_id}'
-                        new_cp_id = await self.repo.find_or_create_checkpoint(label)
-                        checkpoint_id = new_cp_id
-                    except (ValueError, TypeError):
-                        pass
-
-                is_free_cp = row.get('is_free_checkpoint', '') == '1'
-                recorded_at_csv = row.get('recorded_at', '') or None
-
-                is_free_iv = row.get('is_free_interval', '') == '1'
-                time_start = self._parse_time_field(row.get('time_start', ''))
-                time_end = self._parse_time_field(row.get('time_end', ''))
-
-                if await self.repo.check_entry_duplicate(
-                    metric_id, d, checkpoint_id, interval_id,
-                    is_free_checkpoint=is_free_cp,
-                    is_free_interval=is_free_iv,
-                    time_start=time_start,
-                    time_end=time_end,
-                ):
-                    skipped += 1
-                    continue
-
-                mt = slug_to_type.get(slug, MetricType.bool)
-                value = json.loads(row.get('value', 'false'))
-                value = await self._coerce_value(value, mt, metric_id)
-                if value is None:
-                    skipped += 1
-                    continue
-
-                async with self.repo.transaction():
-                    entry_id = await self.repo.create_entry(
-                        metric_id, d, checkpoint_id, interval_id,
-                        is_free_checkpoint=is_free_cp,
-                        recorded_at=recorded_at_csv,
-                        is_free_interval=is_free_iv,
-                        time_start=time_start,
-                        time_end=time_end,
-                    )
-                    await self.entry_repo.insert_value(entry_id, value, mt, entry_date=d, metric_id=metric_id)
-                imported += 1
-            except Exception as e:
-                errors.append(f"Row {row_num}: {str(e)}")
-                skipped += 1
-
-        return imported, skipped, errors
+        # Integration and other types are stored as bool, like EntryRepository.insert_value
+        v_bool = v_int = v_time = v_enum = None
+        if mt == MetricType.enum:
+            v_enum = value
+        elif mt == MetricType.time:
+            v_time = self.entry_repo._parse_time(value, d)
+        elif mt in (MetricType.number, MetricType.duration, MetricType.scale):
+            _check_int32(value, "value")
+            v_int = value
+        else:
+            mt, v_bool = MetricType.bool, value
+        return (
+            row_num, metric_id, d, checkpoint_id, interval_id,
+            is_free_cp, recorded_at, is_free_iv, time_start, time_end,
+            MetricType(mt).value, v_bool, v_int, v_time, v_enum,
+        )
 
     async def import_aw_data(self, zip_file) -> None:
         if 'aw_daily.csv' in zip_file.namelist():
@@ -192,13 +233,12 @@ class EntryImporter:
         except (ValueError, TypeError, IndexError):
             return None
 
-    async def _coerce_value(self, value, mt: str, metric_id: int):
+    @staticmethod
+    def _coerce_value(value, mt: str, label_to_id: dict[str, int]):
         if mt == MetricType.enum:
             if not isinstance(value, list):
                 return None
-            label_to_id = await self.repo.get_enum_option_labels(metric_id)
-            ids = [label_to_id[lbl] for lbl in value if lbl in label_to_id]
-            return ids  # [] is valid — means "no options selected"
+            return [label_to_id[lbl] for lbl in value if lbl in label_to_id]  # [] is valid — means "no options selected"
         if mt == MetricType.time:
             return value if isinstance(value, str) else None
         if mt in (MetricType.number, MetricType.duration, MetricType.scale):
@@ -47,6 +47,8 @@ class ImportService:
             raise
         except Exception as e:
             raise InvalidOperationError(f"Import failed: {str(e)}")
+        finally:
+            await self.repo.bump_cache_versions(config=True)
 
         return {
             "metrics": {"imported": mi, "updated": mu, "errors": me[:10] if me else []},
@@ -98,11 +98,18 @@ class IntegrationService:
 
     async def disconnect(self, provider: str) -> None:
         result = await self.repo.disconnect_provider(provider)
+        await self.repo.bump_cache_versions(config=True)
         if result == "DELETE 0":
             raise EntityNotFoundError("Integration", 0)
 
     async def fetch_data(self, provider: str, date: str | None, metric_id: int | None) -> dict:
         target_date = date_type.fromisoformat(date) if date else date_type.today()
+        try:
+            return await self._fetch_data(provider, target_date, metric_id)
+        finally:
+            await self.repo.bump_cache_versions(entries=True)
+
+    async def _fetch_data(self, provider: str, target_date: date_type, metric_id: int | None) -> dict:
 
         if provider == "todoist":
             try:
@@ -151,6 +158,7 @@ class IntegrationService:
             afk_events=[e.model_dump() for e in body.afk_events],
             web_events=[e.model_dump() for e in body.web_events] if body.web_events else None,
         )
+        await self.repo.bump_cache_versions(entries=True)
         return {
             "date": body.date,
             "total_seconds": result["total_seconds"],
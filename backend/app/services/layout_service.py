@@ -161,6 +161,7 @@ class LayoutService:
                     {"block_type": r["block_type"], "block_id": r["block_id"], "sort_order": i * 10}
                     for i, r in enumerate(layout_list)
                 ])
+                await self.repo.bump_cache_versions(config=True)
                 return await self.repo.get_layout()
             return layout
 
@@ -173,12 +174,15 @@ class LayoutService:
                 "VALUES ($1, $2, $3, $4) ON CONFLICT (user_id, block_type, block_id) DO NOTHING",
                 self.repo.user_id, bt, bid, max_order,
             )
+        if missing:
+            await self.repo.bump_cache_versions(config=True)
 
         return await self.repo.get_layout()
 
     async def save_block_order(self, items: list[dict]) -> None:
         """Save top-level block ordering."""
         await self.repo.save_layout(items)
+        await self.repo.bump_cache_versions(config=True)
 
     async def save_inner_order(self, block_type: str, block_id: int, items: list[dict]) -> None:
         """Save metric ordering within a block."""
@@ -188,3 +192,4 @@ class LayoutService:
             await self.repo.save_inner_interval(block_id, items)
         elif block_type in ("category", "metric"):
             await self.repo.save_inner_standalone(items)
+        await self.repo.bump_cache_versions(config=True)
@@ -56,6 +56,7 @@ class MetricsService:
 
     async def reorder(self, items: list[dict]) -> None:
         await self.repo.reorder(items)
+        await self.repo.bump_cache_versions(config=True)
 
     async def create(self, data: MetricDefinitionCreate, privacy_mode: bool) -> MetricDefinitionOut:
         self._validate_free_checkpoints(data)
@@ -78,6 +79,7 @@ class MetricsService:
         await self._create_metric_intervals(metric_id, data.interval_binding, data.interval_ids)
         await self._create_condition(metric_id, data)
         await self._update_layout_on_create(metric_id, cat_id, data)
+        await self.repo.bump_cache_versions(config=True)
         return await self.get_one(metric_id, privacy_mode)
 
     async def update(self, metric_id: int, data: MetricDefinitionUpdate, privacy_mode: bool) -> MetricDefinitionOut:
@@ -89,11 +91,13 @@ class MetricsService:
         await self._update_checkpoint_configs(metric_id, data)
         await self._update_interval_binding(metric_id, row, data)
         await self._update_condition(metric_id, data)
+        await self.repo.bump_cache_versions(config=True)
         return await self.get_one(metric_id, privacy_mode)
 
     async def delete(self, metric_id: int) -> None:
         await self._update_layout_on_delete(metric_id)
         await self.repo.delete_metric(metric_id)
+        await self.repo.bump_cache_versions(config=True)
 
     def conversion_service(self) -> MetricConversionService:
         return MetricConversionService(self.cfg_repo, self.conn)
@@ -105,7 +109,9 @@ class MetricsService:
     async def convert(self, metric_id: int, data) -> dict:
         async with self.repo.transaction():
             row = await self.repo.get_by_id_for_update(metric_id)
-            return await self.conversion_service().convert(metric_id, row["type"], data)
+            result = await self.conversion_service().convert(metric_id, row["type"], data)
+            await self.repo.bump_cache_versions(config=True)
+            return result
 
     # ── Markdown export ───────────────────────────────────────────
 
@@ -34,6 +34,7 @@ class NotesService:
 
         d = date_type.fromisoformat(date_str)
         row = await self.repo.create(metric_id, d, text)
+        await self.repo.bump_cache_versions(entries=True)
         return _row_to_out(row)
 
     async def update(self, note_id: int, text: str) -> NoteOut:
@@ -43,11 +44,13 @@ class NotesService:
         if not text:
             raise InvalidOperationError("Note text cannot be empty")
         updated = await self.repo.update_text(note_id, text)
+        await self.repo.bump_cache_versions(entries=True)
         return _row_to_out(updated)
 
     async def delete(self, note_id: int) -> None:
         await self.repo.get_by_id(note_id)
         await self.repo.delete(note_id)
+        await self.repo.bump_cache_versions(entries=True)
 
     async def list_by_period(
         self, metric_id: int, start: str, end: str,
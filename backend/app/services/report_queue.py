@@ -0,0 +1,149 @@
+"""Очередь корреляционных отчётов поверх таблицы correlation_reports."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from datetime import date as date_type
+
+import asyncpg
+
+from app import database as _db_module
+from app.correlation_config import CorrelationConfig, JobsConfig, correlation_config
+from app.domain.exceptions import ReportCancelledError
+from app.repositories.correlation_repository import CorrelationRepository
+from app.repositories.report_queue_repository import ReportQueueRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ReportQueue:
+    """Забирает отчёты в статусе queued из БД и считает их в фоне.
+
+    The queue itself is the correlation_reports table: a report is created
+    as queued and any API process claims it with FOR UPDATE SKIP LOCKED,
+    within the global and per-user caps from [jobs]. Running reports are
+    heartbeated; ones whose heartbeat went stale (the process died) are put
+    back into the queue on the next dispatch pass. Every claim and requeue
+    bumps the report's attempt, and a run writes only under its own attempt,
+    so a slow run whose report was requeued cannot clobber the next one.
+    """
+
+    def __init__(self, jobs: JobsConfig | None = None) -> None:
+        self._jobs = jobs
+        # Keyed by (report_id, attempt): a requeued report may be claimed again here
+        # while its previous, fenced-off run is still winding down.
+        self._tasks: dict[tuple[int, int], asyncio.Task[None]] = {}
+        self._dispatch_task: asyncio.Task[None] | None = None
+        self._ticker_task: asyncio.Task[None] | None = None
+        self._pending = False
+        self._polling = False
+
+    @property
+    def jobs(self) -> JobsConfig:
+        return self._jobs or correlation_config.jobs
+
+    def kick(self) -> None:
+        """Schedule a dispatch pass; coalesces with a pass already in flight."""
+        if self._ticker_task is None or self._ticker_task.done():
+            self._ticker_task = asyncio.create_task(self._ticker())
+        if self._dispatch_task is not None and not self._dispatch_task.done():
+            self._pending = True
+            return
+        self._dispatch_task = asyncio.create_task(self._dispatch())
+
+    def start(self) -> None:
+        """App startup: keep polling the table so orphans and other processes' queued work get picked up."""
+        self._polling = True
+        self.kick()
+
+    async def stop(self) -> None:
+        """Cancel the ticker and local jobs; their rows go stale and are requeued on next start."""
+        self._polling = False
+        tasks = [t for t in (self._ticker_task, self._dispatch_task, *self._tasks.values()) if t is not None]
+        for t in tasks:
+            t.cancel()
+        for t in tasks:
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await t
+        self._tasks.clear()
+        self._ticker_task = self._dispatch_task = None
+
+    async def _dispatch(self) -> None:
+        while True:
+            self._pending = False
+            try:
+                await self._claim_and_start()
+            except Exception:
+                logger.exception("Correlation report dispatch failed")
+                return
+            if not self._pending:
+                return
+
+    async def _claim_and_start(self) -> None:
+        jobs = self.jobs
+        async with _db_module.pool.acquire() as conn:
+            queue = ReportQueueRepository(conn)
+            requeued = await queue.requeue_stale(jobs.stale_after_seconds)
+            if requeued:
+                logger.warning("Requeued %d orphaned correlation reports", requeued)
+            rows = await queue.claim_reports(jobs.max_concurrent, jobs.max_per_user)
+        for r in rows:
+            self._tasks[(r["id"], r["attempt"])] = asyncio.create_task(self._run(r))
+
+    async def _run(self, row: asyncpg.Record) -> None:
+        try:
+            await run_correlation_report(
+                row["id"], row["user_id"], row["period_start"], row["period_end"], attempt=row["attempt"],
+            )
+        finally:
+            self._tasks.pop((row["id"], row["attempt"]), None)
+        self.kick()
+
+    async def _ticker(self) -> None:
+        """Heartbeat local jobs and poll for queued work (other processes, freed slots, orphans).
+
+        Without start() (e.g. an app run without lifespan) it exits once no local job is left.
+        """
+        while self._tasks or self._polling:
+            await asyncio.sleep(self.jobs.heartbeat_seconds)
+            try:
+                if self._tasks:
+                    async with _db_module.pool.acquire() as conn:
+                        await ReportQueueRepository(conn).heartbeat(list(self._tasks))
+            except Exception:
+                logger.exception("Correlation report heartbeat failed")
+            self.kick()
+
+
+report_queue = ReportQueue()
+
+
+async def run_correlation_report(
+    report_id: int, user_id: int, start: date_type, end: date_type,
+    config: CorrelationConfig | None = None, attempt: int = 0,
+) -> None:
+    """Run one claimed report (``attempt`` from the claim). Acquires connection and runs engine."""
+    from app.analytics.correlation_engine import CorrelationEngine
+
+    try:
+        async with _db_module.pool.acquire() as conn:
+            repo = CorrelationRepository(conn, user_id)
+            engine = CorrelationEngine(repo, report_id, start, end, config=config, attempt=attempt)
+            await engine.run()
+    except ReportCancelledError:
+        logger.info("Correlation report %s (attempt %s) superseded or requeued, stopping", report_id, attempt)
+        try:
+            async with _db_module.pool.acquire() as conn:
+                await CorrelationRepository(conn, user_id).delete_cancelled_report(report_id, attempt)
+        except Exception:
+            logger.exception("Failed to delete cancelled report")
+    except Exception:
+        logger.exception("Error computing correlation report %s", report_id)
+        try:
+            async with _db_module.pool.acquire() as conn:
+                repo = CorrelationRepository(conn, user_id)
+                await repo.mark_report_error(report_id, attempt)
+        except Exception:
+            logger.exception("Failed to update report status to error")
@@ -32,6 +32,10 @@ class QueryTimer:
     def mark(self, name: str) -> None:
         self._marks.append((name, time.perf_counter()))
 
+    @property
+    def last_mark(self) -> str | None:
+        return self._marks[-1][0] if self._marks else None
+
     def log(self) -> None:
         total = (time.perf_counter() - self._t0) * 1000
         parts = []
@@ -16,6 +16,7 @@ from httpx import ASGITransport, AsyncClient
 
 import app.database as db_module
 from app.database import _init_db_schema
+from app.services.daily_cache import daily_cache
 
 # Connection params for the existing PostgreSQL container
 _PG_USER = "la_user"
@@ -139,6 +140,7 @@ _CLEANUP_TABLES = [
 @pytest_asyncio.fixture(autouse=True)
 async def cleanup(db_pool: asyncpg.Pool, request: pytest.FixtureRequest):
     yield
+    daily_cache.clear()
     if "unit" in request.node.nodeid:
         return
     import asyncio
@@ -148,7 +150,7 @@ async def cleanup(db_pool: asyncpg.Pool, request: pytest.FixtureRequest):
             async with db_pool.acquire() as conn:
                 cnt = await conn.fetchval(
                     "SELECT count(*) FROM correlation_reports"
-                    " WHERE status = 'running'"
+                    " WHERE status IN ('queued', 'running', 'cancelling')"
                 )
             if not cnt:
                 break
@@ -8,11 +8,18 @@ Endpoints under test:
 from __future__ import annotations
 
 import asyncio
+from unittest.mock import patch
 
 import pytest
 
 from httpx import AsyncClient
 
+from app.analytics.correlation_engine import CorrelationPairResult
+from app.repositories.analytics_repository import AnalyticsRepository
+from app.repositories.correlation_repository import CorrelationRepository
+from app.repositories.report_queue_repository import ReportQueueRepository
+from app.services.report_queue import report_queue
+
 from tests.conftest import auth_headers, register_user, create_metric, create_entry, create_checkpoint
 
 
@@ -94,16 +101,44 @@ async def _create_metrics_with_entries(
 
 class TestCreateCorrelationReport:
 
-    async def test_create_returns_report_id_and_running(
+    async def test_create_returns_report_id_and_queued(
         self, client: AsyncClient, user_a: dict,
     ) -> None:
         body = await _start_report(client, user_a["token"])
         assert "report_id" in body
         assert isinstance(body["report_id"], int)
-        assert body["status"] == "running"
+        assert body["status"] == "queued"
         # Wait for background task to finish before cleanup
         await _wait_for_report_done(client, user_a["token"])
 
+    async def test_running_report_has_progress(
+        self, client: AsyncClient, user_a: dict,
+    ) -> None:
+        # Hold the dispatcher back so the report cannot finish before it is read.
+        with patch.object(report_queue, "kick"):
+            await _start_report(client, user_a["token"])
+            resp = await client.get(
+                "/api/analytics/correlation-report",
+                headers=auth_headers(user_a["token"]),
+            )
+        running = resp.json()["running"]
+        assert running is not None
+        assert running["status"] in ("queued", "running")
+        assert 0 <= running["progress"] <= 1
+        assert "phase" in running
+        report_queue.kick()
+        await _wait_for_report_done(client, user_a["token"])
+
+    async def test_new_report_supersedes_previous(
+        self, client: AsyncClient, user_a: dict,
+    ) -> None:
+        await _create_metrics_with_entries(client, user_a["token"])
+        await _start_report(client, user_a["token"])
+        second = await _start_report(client, user_a["token"])
+        data = await _wait_for_report_done(client, user_a["token"])
+        assert data["running"] is None
+        assert data["report"]["id"] == second["report_id"]
+
     async def test_list_includes_running_report(
         self, client: AsyncClient, user_a: dict,
     ) -> None:
@@ -754,6 +789,44 @@ class TestCorrelationPairsPagination:
             ids_page2 = {p["pair_id"] for p in data2["pairs"]}
             assert ids_page1.isdisjoint(ids_page2)
 
+    async def test_cursor_pages_match_offset_pages(
+        self, client: AsyncClient, user_a: dict,
+    ) -> None:
+        """Walking next_cursor without totals yields the same order as offset paging."""
+        await _create_metrics_with_entries(client, user_a["token"])
+        report_id = (await _start_report(client, user_a["token"]))["report_id"]
+        await _wait_for_report_done(client, user_a["token"])
+        url = f"/api/analytics/correlation-report/{report_id}/pairs"
+
+        resp = await client.get(url, params={"limit": 500}, headers=auth_headers(user_a["token"]))
+        expected = [p["pair_id"] for p in resp.json()["pairs"]]
+
+        walked: list[int] = []
+        params: dict = {"limit": 3}
+        while True:
+            resp = await client.get(url, params=params, headers=auth_headers(user_a["token"]))
+            assert resp.status_code == 200
+            data = resp.json()
+            walked.extend(p["pair_id"] for p in data["pairs"])
+            if not data["has_more"]:
+                assert data["next_cursor"] is None
+                break
+            params = {"limit": 3, "cursor": data["next_cursor"], "include_total": "false"}
+            assert data["total"] is None or data["total"] == len(expected)
+        assert walked == expected
+
+    async def test_invalid_cursor_rejected(
+        self, client: AsyncClient, user_a: dict,
+    ) -> None:
+        report_id = (await _start_report(client, user_a["token"]))["report_id"]
+        await _wait_for_report_done(client, user_a["token"])
+        resp = await client.get(
+            f"/api/analytics/correlation-report/{report_id}/pairs",
+            params={"cursor": "garbage"},
+            headers=auth_headers(user_a["token"]),
+        )
+        assert resp.status_code == 400
+
 
 # ---------------------------------------------------------------------------
 # Pair chart: auto sources (lines 1386-1464)
@@ -2235,7 +2308,7 @@ class TestStreakSources:
     def _enable_streaks(self, monkeypatch):  # type: ignore[no-untyped-def]
         from app.correlation_config import AutoSourcesConfig, CorrelationConfig
         cfg = CorrelationConfig(auto_sources=AutoSourcesConfig(streak=True))
-        monkeypatch.setattr("app.routers.analytics.correlation_config", cfg)
+        monkeypatch.setattr("app.analytics.correlation_engine.correlation_config", cfg)
 
     async def test_streak_labels_present_in_report(
         self, client: AsyncClient, user_a: dict,
@@ -2464,6 +2537,27 @@ class TestPairStatuses:
         assert "archived" in counts
         assert counts["favorite"] >= 1
 
+    async def test_counts_follow_status_changes(self, client: AsyncClient, user_a: dict) -> None:
+        report_id, pair = await self._setup_report_with_pairs(client, user_a["token"])
+        key = {"source_key_a": pair["source_key_a"], "source_key_b": pair["source_key_b"],
+               "lag_days": pair["lag_days"]}
+
+        async def counts() -> tuple[int, int]:
+            resp = await client.get("/api/analytics/correlation-report", headers=auth_headers(user_a["token"]))
+            c = resp.json()["report"]["counts"]
+            return c["favorite"], c["archived"]
+
+        base = await counts()
+        await client.put("/api/analytics/correlation-pair-status", json={**key, "status": "favorite"},
+                         headers=auth_headers(user_a["token"]))
+        assert await counts() == (base[0] + 1, base[1])
+        await client.put("/api/analytics/correlation-pair-status", json={**key, "status": "archived"},
+                         headers=auth_headers(user_a["token"]))
+        assert await counts() == (base[0], base[1] + 1)
+        await client.delete("/api/analytics/correlation-pair-status", params=key,
+                            headers=auth_headers(user_a["token"]))
+        assert await counts() == base
+
     async def test_data_isolation(self, client: AsyncClient, user_a: dict, user_b: dict) -> None:
         report_id, pair = await self._setup_report_with_pairs(client, user_a["token"])
         ska, skb, lag = pair["source_key_a"], pair["source_key_b"], pair["lag_days"]
@@ -2487,3 +2581,102 @@ class TestPairStatuses:
             )
             # user_b has no favorites
             assert resp.json()["total"] == 0
+
+
+# ---------------------------------------------------------------------------
+# Queue: slots held by cancelling runs, attempt fencing
+# ---------------------------------------------------------------------------
+
+def _pair(report_id: int) -> CorrelationPairResult:
+    return CorrelationPairResult(
+        report_id=report_id,
+        metric_a_id=None, metric_b_id=None,
+        checkpoint_a_id=None, checkpoint_b_id=None,
+        interval_a_id=None, interval_b_id=None,
+        source_key_a="metric:1", source_key_b="metric:2",
+        type_a="number", type_b="bool",
+        correlation=0.5, data_points=30, lag_days=0,
+        p_value=0.01, quality_issue=None, adjusted_p_value=None,
+    )
+
+
+async def _insert_report(conn, user_id: int, status: str, attempt: int = 0, stale: bool = False) -> int:
+    return await conn.fetchval(
+        """INSERT INTO correlation_reports (user_id, status, period_start, period_end, attempt, heartbeat_at)
+           VALUES ($1, $2, '2026-01-01', '2026-01-31', $3,
+                   CASE WHEN $4 THEN now() - interval '1 hour' ELSE now() END)
+           RETURNING id""",
+        user_id, status, attempt, stale,
+    )
+
+
+class TestReportQueueFencing:
+
+    async def test_cancelling_run_keeps_its_slot(
+        self, client: AsyncClient, user_a: dict, db_pool,
+    ) -> None:
+        async with db_pool.acquire() as conn:
+            running_id = await _insert_report(conn, user_a["user_id"], "running", attempt=1)
+            await AnalyticsRepository(conn, user_a["user_id"]).cancel_active_reports()
+            assert await conn.fetchval(
+                "SELECT status FROM correlation_reports WHERE id = $1", running_id,
+            ) == "cancelling"
+            queued_id = await _insert_report(conn, user_a["user_id"], "queued")
+            queue = ReportQueueRepository(conn)
+            assert await queue.claim_reports(max_concurrent=1, max_per_user=5) == []
+            assert await queue.claim_reports(max_concurrent=5, max_per_user=1) == []
+
+            await CorrelationRepository(conn, user_a["user_id"]).delete_cancelled_report(running_id, 1)
+            claimed = await queue.claim_reports(max_concurrent=1, max_per_user=1)
+            assert [(r["id"], r["attempt"]) for r in claimed] == [(queued_id, 1)]
+            assert await CorrelationRepository(conn, user_a["user_id"]).finalize_report(queued_id, 1) is True
+
+    async def test_requeue_fences_previous_attempt(
+        self, client: AsyncClient, user_a: dict, db_pool,
+    ) -> None:
+        async with db_pool.acquire() as conn:
+            report_id = await _insert_report(conn, user_a["user_id"], "running", attempt=1, stale=True)
+            repo = CorrelationRepository(conn, user_a["user_id"])
+            assert await repo.insert_pairs(report_id, 1, [_pair(report_id)]) is True
+            assert await repo.save_report_state(report_id, 1, b"state") is True
+
+            assert await ReportQueueRepository(conn).requeue_stale(60) == 1
+            row = await conn.fetchrow("SELECT status, attempt FROM correlation_reports WHERE id = $1", report_id)
+            assert (row["status"], row["attempt"]) == ("queued", 2)
+            assert await conn.fetchval(
+                "SELECT COUNT(*) FROM correlation_pairs WHERE report_id = $1", report_id,
+            ) == 0
+
+            # The old run is still alive: none of its writes land.
+            assert await repo.insert_pairs(report_id, 1, [_pair(report_id)]) is False
+            assert await repo.insert_report_series(report_id, 1, [("metric:1", b"x")]) is False
+            assert await repo.save_report_state(report_id, 1, b"state") is False
+            assert await repo.update_report_progress(report_id, 1, "pairs", 0.5) is None
+            assert await repo.finalize_report(report_id, 1) is False
+            await repo.delete_cancelled_report(report_id, 1)
+            row = await conn.fetchrow(
+                "SELECT status, phase, attempt FROM correlation_reports WHERE id = $1", report_id,
+            )
+            assert (row["status"], row["phase"], row["attempt"]) == ("queued", None, 2)
+            assert await conn.fetchval(
+                "SELECT COUNT(*) FROM correlation_pairs WHERE report_id = $1", report_id,
+            ) == 0
+            assert await conn.fetchval(
+                "SELECT COUNT(*) FROM correlation_report_state WHERE report_id = $1", report_id,
+            ) == 0
+
+            claimed = await ReportQueueRepository(conn).claim_reports(max_concurrent=1, max_per_user=1)
+            assert [(r["id"], r["attempt"]) for r in claimed] == [(report_id, 3)]
+            assert await repo.insert_pairs(report_id, 3, [_pair(report_id)]) is True
+            assert await repo.save_report_state(report_id, 3, b"state") is True
+            assert await repo.finalize_report(report_id, 3) is True
+
+    async def test_stale_cancelling_report_released(
+        self, client: AsyncClient, user_a: dict, db_pool,
+    ) -> None:
+        async with db_pool.acquire() as conn:
+            report_id = await _insert_report(conn, user_a["user_id"], "cancelling", attempt=1, stale=True)
+            assert await ReportQueueRepository(conn).requeue_stale(60) == 0
+            assert await conn.fetchval(
+                "SELECT status FROM correlation_reports WHERE id = $1", report_id,
+            ) == "cancelled"
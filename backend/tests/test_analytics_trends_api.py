@@ -1047,6 +1047,26 @@ class TestStreaks:
         entry = next(s for s in streaks if s["metric_id"] == mid)
         assert entry["current_streak"] == 5
 
+    async def test_streaks_across_metrics(
+        self, client: AsyncClient, user_a: dict,
+    ) -> None:
+        """Each metric counts back to its own latest false day; skipped days don't break it."""
+        token = user_a["token"]
+        broken = await create_metric(client, token, name="Broken", metric_type="bool")
+        gappy = await create_metric(client, token, name="Gappy", metric_type="bool")
+        ended = await create_metric(client, token, name="Ended", metric_type="bool")
+        for day, value in (("2026-01-01", True), ("2026-01-02", False), ("2026-01-03", True), ("2026-01-04", True)):
+            await create_entry(client, token, broken["id"], day, value)
+        for day in ("2026-01-01", "2026-01-05", "2026-01-09"):
+            await create_entry(client, token, gappy["id"], day, True)
+        await create_entry(client, token, ended["id"], "2026-01-01", True)
+        await create_entry(client, token, ended["id"], "2026-01-02", False)
+
+        resp = await client.get("/api/analytics/streaks", headers=auth_headers(token))
+        assert resp.status_code == 200
+        by_id = {s["metric_id"]: s["current_streak"] for s in resp.json()["streaks"]}
+        assert by_id == {broken["id"]: 2, gappy["id"]: 3}
+
 
 # ---------------------------------------------------------------------------
 # Streaks: empty
@@ -0,0 +1,338 @@
+"""DB tests for IntegrationsRepository.recompute_aw_integration_metrics.
+
+Every case is checked against the per-metric algorithm that
+compute_integration_metrics ran before the set-based statement (kept below
+as _legacy_compute): the legacy run happens inside a rolled-back
+transaction on the same data, then the stored entries and values of both
+runs are compared.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta, timezone
+
+import asyncpg
+from httpx import AsyncClient
+
+from app.integrations.activitywatch.service import compute_integration_metrics
+from app.repositories.entry_repository import EntryRepository
+from app.repositories.integrations_repository import IntegrationsRepository
+
+DAY = date(2026, 3, 10)
+MSK = timezone(timedelta(hours=3))
+
+# alias -> (metric_key, value_type)
+_METRICS = {
+    "active": ("active_screen_time", "number"),
+    "total": ("total_screen_time", "number"),
+    "first": ("first_activity", "time"),
+    "last": ("last_activity", "time"),
+    "afk": ("afk_time", "number"),
+    "longest": ("longest_session", "duration"),
+    "switches": ("context_switches", "number"),
+    "breaks": ("break_count", "number"),
+    "apps": ("unique_apps", "number"),
+    "work": ("category_time", "number"),
+    "idle_category": ("category_time", "number"),
+    "vscode": ("app_time", "duration"),
+    "zoom": ("app_time", "number"),
+}
+
+
+# ---------------------------------------------------------------------------
+# Legacy per-metric algorithm (reference)
+# ---------------------------------------------------------------------------
+
+async def _legacy_compute(conn: asyncpg.Connection, user_id: int, for_date: date) -> None:
+    """compute_integration_metrics as it was before the single statement."""
+    repo = IntegrationsRepository(conn, user_id)
+    entry_repo = EntryRepository(conn, user_id)
+    rows = await conn.fetch(
+        """SELECT md.id AS metric_id, ic.metric_key, ic.value_type,
+                  icc.activitywatch_category_id, iac.app_name AS config_app_name
+           FROM metric_definitions md
+           JOIN integration_config ic ON ic.metric_id = md.id
+           LEFT JOIN integration_category_config icc ON icc.metric_id = md.id
+           LEFT JOIN integration_app_config iac ON iac.metric_id = md.id
+           WHERE md.user_id = $1 AND ic.provider = 'activitywatch' AND md.enabled = TRUE""",
+        user_id,
+    )
+    summary = await conn.fetchrow(
+        """SELECT total_seconds, active_seconds, first_activity_time, last_activity_time,
+                  afk_seconds, longest_session_seconds, context_switches, break_count
+           FROM activitywatch_daily_summary WHERE user_id = $1 AND date = $2""",
+        user_id, for_date,
+    )
+    for r in rows:
+        metric_id, key, value_type = r["metric_id"], r["metric_key"], r["value_type"]
+        if key == "active_screen_time":
+            value = (summary["active_seconds"] // 60) if summary else 0
+        elif key == "total_screen_time":
+            value = (summary["total_seconds"] // 60) if summary else 0
+        elif key in ("first_activity", "last_activity"):
+            ts = summary[f"{key}_time"] if summary else None
+            if not ts:
+                continue
+            value = f"{ts.hour:02d}:{ts.minute:02d}"
+        elif key == "afk_time":
+            value = (summary["afk_seconds"] // 60) if summary else 0
+        elif key == "longest_session":
+            value = (summary["longest_session_seconds"] // 60) if summary else 0
+        elif key == "context_switches":
+            value = summary["context_switches"] if summary else 0
+        elif key == "break_count":
+            value = summary["break_count"] if summary else 0
+        elif key == "unique_apps":
+            value = await conn.fetchval(
+                """SELECT COUNT(DISTINCT app_name) FROM activitywatch_app_usage
+                   WHERE user_id = $1 AND date = $2 AND source = 'window'""",
+                user_id, for_date,
+            ) or 0
+        elif key == "category_time":
+            secs = 0
+            if r["activitywatch_category_id"]:
+                secs = await conn.fetchval(
+                    """SELECT COALESCE(SUM(au.duration_seconds), 0)
+                       FROM activitywatch_app_usage au
+                       JOIN activitywatch_app_category_map acm
+                           ON acm.app_name = au.app_name AND acm.user_id = au.user_id
+                       WHERE au.user_id = $1 AND au.date = $2 AND acm.activitywatch_category_id = $3
+                             AND au.source = 'window'""",
+                    user_id, for_date, r["activitywatch_category_id"],
+                ) or 0
+            value = secs // 60
+        elif key == "app_time":
+            secs = 0
+            if r["config_app_name"]:
+                secs = await conn.fetchval(
+                    """SELECT COALESCE(duration_seconds, 0) FROM activitywatch_app_usage
+                       WHERE user_id = $1 AND date = $2 AND app_name = $3 AND source = 'window'""",
+                    user_id, for_date, r["config_app_name"],
+                ) or 0
+            value = secs // 60
+        else:
+            continue
+
+        existing = await repo.get_entry_by_metric_date(metric_id, for_date)
+        if existing:
+            await entry_repo.update_value(existing["id"], value, value_type, entry_date=for_date, metric_id=metric_id)
+        else:
+            entry_id = await repo.create_entry(metric_id, for_date)
+            await entry_repo.insert_value(entry_id, value, value_type, entry_date=for_date, metric_id=metric_id)
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+async def _snapshot(conn: asyncpg.Connection, user_id: int) -> list[tuple]:
+    """(metric_id, date, number, duration, time) of every entry of the user; entry ids left out."""
+    rows = await conn.fetch(
+        """SELECT e.metric_id, e.date, vn.value AS number, vd.value AS duration, vt.value AS time
+           FROM entries e
+           LEFT JOIN values_number vn ON vn.entry_id = e.id
+           LEFT JOIN values_duration vd ON vd.entry_id = e.id
+           LEFT JOIN values_time vt ON vt.entry_id = e.id
+           WHERE e.user_id = $1
+           ORDER BY e.metric_id, e.date""",
+        user_id,
+    )
+    return [tuple(r) for r in rows]
+
+
+async def _legacy_snapshot(conn: asyncpg.Connection, user_id: int, for_date: date) -> list[tuple]:
+    """State the legacy algorithm would leave; the run itself is rolled back."""
+    tr = conn.transaction()
+    await tr.start()
+    try:
+        await _legacy_compute(conn, user_id, for_date)
+        return await _snapshot(conn, user_id)
+    finally:
+        await tr.rollback()
+
+
+async def _recompute(conn: asyncpg.Connection, user_id: int, for_date: date) -> list[tuple]:
+    await compute_integration_metrics(IntegrationsRepository(conn, user_id), for_date)
+    return await _snapshot(conn, user_id)
+
+
+async def _seed(conn: asyncpg.Connection, user_id: int) -> dict[str, int]:
+    """AW metrics, categories and app mapping; returns alias -> metric_id."""
+    work = await conn.fetchval(
+        "INSERT INTO activitywatch_categories (user_id, name) VALUES ($1, 'Work') RETURNING id", user_id,
+    )
+    fun = await conn.fetchval(
+        "INSERT INTO activitywatch_categories (user_id, name) VALUES ($1, 'Fun') RETURNING id", user_id,
+    )
+    idle = await conn.fetchval(
+        "INSERT INTO activitywatch_categories (user_id, name) VALUES ($1, 'Idle') RETURNING id", user_id,
+    )
+    await conn.executemany(
+        """INSERT INTO activitywatch_app_category_map (user_id, app_name, activitywatch_category_id)
+           VALUES ($1, $2, $3)""",
+        [(user_id, "VSCode", work), (user_id, "Terminal", work),
+         (user_id, "github.com", work), (user_id, "Firefox", fun)],
+    )
+
+    ids: dict[str, int] = {}
+    for i, (alias, (key, value_type)) in enumerate(_METRICS.items()):
+        ids[alias] = await conn.fetchval(
+            """INSERT INTO metric_definitions (user_id, slug, name, type, sort_order)
+               VALUES ($1, $2, $2, 'integration', $3) RETURNING id""",
+            user_id, f"aw_{alias}", i,
+        )
+        await conn.execute(
+            """INSERT INTO integration_config (metric_id, provider, metric_key, value_type)
+               VALUES ($1, 'activitywatch', $2, $3)""",
+            ids[alias], key, value_type,
+        )
+    await conn.executemany(
+        "INSERT INTO integration_category_config (metric_id, activitywatch_category_id) VALUES ($1, $2)",
+        [(ids["work"], work), (ids["idle_category"], idle)],
+    )
+    await conn.executemany(
+        "INSERT INTO integration_app_config (metric_id, app_name) VALUES ($1, $2)",
+        [(ids["vscode"], "VSCode"), (ids["zoom"], "Zoom")],
+    )
+
+    # Neither a disabled AW metric nor another provider's metric is touched.
+    ids["disabled"] = await conn.fetchval(
+        """INSERT INTO metric_definitions (user_id, slug, name, type, enabled)
+           VALUES ($1, 'aw_disabled', 'aw_disabled', 'integration', FALSE) RETURNING id""",
+        user_id,
+    )
+    ids["todoist"] = await conn.fetchval(
+        """INSERT INTO metric_definitions (user_id, slug, name, type)
+           VALUES ($1, 'todoist_done', 'todoist_done', 'integration') RETURNING id""",
+        user_id,
+    )
+    await conn.executemany(
+        """INSERT INTO integration_config (metric_id, provider, metric_key, value_type)
+           VALUES ($1, $2, $3, 'number')""",
+        [(ids["disabled"], "activitywatch", "active_screen_time"),
+         (ids["todoist"], "todoist", "completed_tasks_count")],
+    )
+    return ids
+
+
+async def _seed_usage(conn: asyncpg.Connection, user_id: int, for_date: date, vscode_seconds: int = 3725) -> None:
+    await conn.executemany(
+        """INSERT INTO activitywatch_app_usage (user_id, date, app_name, source, duration_seconds)
+           VALUES ($1, $2, $3, $4, $5)
+           ON CONFLICT (user_id, date, app_name, source) DO UPDATE SET duration_seconds = EXCLUDED.duration_seconds""",
+        [
+            (user_id, for_date, "VSCode", "window", vscode_seconds),
+            (user_id, for_date, "Firefox", "window", 1859),
+            (user_id, for_date, "Terminal", "window", 59),
+            (user_id, for_date, "github.com", "web", 600),
+            (user_id, for_date - timedelta(days=1), "VSCode", "window", 9999),
+        ],
+    )
+
+
+async def _seed_summary(conn: asyncpg.Connection, user_id: int, for_date: date, first_activity: datetime) -> None:
+    await conn.execute(
+        """INSERT INTO activitywatch_daily_summary
+               (user_id, date, total_seconds, active_seconds, first_activity_time, last_activity_time,
+                afk_seconds, longest_session_seconds, context_switches, break_count)
+           VALUES ($1, $2, 30000, 25000, $3, $4, 1234, 5399, 42, 3)
+           ON CONFLICT (user_id, date) DO UPDATE SET first_activity_time = EXCLUDED.first_activity_time""",
+        user_id, for_date, first_activity,
+        datetime(for_date.year, for_date.month, for_date.day, 22, 45, 30, tzinfo=timezone.utc),
+    )
+
+
+def _by_metric(snapshot: list[tuple]) -> dict[int, tuple]:
+    return {row[0]: row[2:] for row in snapshot}
+
+
+# ---------------------------------------------------------------------------
+# Tests
+# ---------------------------------------------------------------------------
+
+class TestRecomputeAwIntegrationMetrics:
+
+    async def test_day_with_summary_matches_legacy(
+        self, client: AsyncClient, user_a: dict, db_pool: asyncpg.Pool,
+    ) -> None:
+        user_id = user_a["user_id"]
+        async with db_pool.acquire() as conn:
+            ids = await _seed(conn, user_id)
+            await _seed_usage(conn, user_id, DAY)
+            # 09:07:59 MSK is 06:07 UTC: the stored time is the UTC minute on that date.
+            await _seed_summary(conn, user_id, DAY, datetime(2026, 3, 10, 9, 7, 59, 900000, tzinfo=MSK))
+
+            expected = await _legacy_snapshot(conn, user_id, DAY)
+            written = await IntegrationsRepository(conn, user_id).recompute_aw_integration_metrics(DAY)
+            actual = await _snapshot(conn, user_id)
+
+        assert actual == expected
+        assert written == len(_METRICS)
+        values = _by_metric(actual)
+        assert values[ids["active"]] == (416, None, None)
+        assert values[ids["longest"]] == (None, 89, None)
+        assert values[ids["first"]] == (None, None, datetime(2026, 3, 10, 6, 7, tzinfo=timezone.utc))
+        assert values[ids["last"]] == (None, None, datetime(2026, 3, 10, 22, 45, tzinfo=timezone.utc))
+        assert values[ids["apps"]] == (3, None, None)
+        assert values[ids["work"]] == (63, None, None)  # VSCode + Terminal windows, not github.com
+        assert values[ids["idle_category"]] == (0, None, None)
+        assert values[ids["vscode"]] == (None, 62, None)
+        assert values[ids["zoom"]] == (0, None, None)
+        assert ids["disabled"] not in values
+        assert ids["todoist"] not in values
+
+    async def test_day_without_summary_matches_legacy(
+        self, client: AsyncClient, user_a: dict, db_pool: asyncpg.Pool,
+    ) -> None:
+        user_id = user_a["user_id"]
+        async with db_pool.acquire() as conn:
+            ids = await _seed(conn, user_id)
+            await _seed_usage(conn, user_id, DAY)
+
+            expected = await _legacy_snapshot(conn, user_id, DAY)
+            written = await IntegrationsRepository(conn, user_id).recompute_aw_integration_metrics(DAY)
+            actual = await _snapshot(conn, user_id)
+
+        assert actual == expected
+        values = _by_metric(actual)
+        assert ids["first"] not in values
+        assert ids["last"] not in values
+        assert written == len(_METRICS) - 2
+        for alias in ("active", "total", "afk", "switches", "breaks"):
+            assert values[ids[alias]] == (0, None, None)
+        assert values[ids["longest"]] == (None, 0, None)
+        assert values[ids["work"]] == (63, None, None)
+
+    async def test_second_run_updates_in_place(
+        self, client: AsyncClient, user_a: dict, db_pool: asyncpg.Pool,
+    ) -> None:
+        user_id = user_a["user_id"]
+        async with db_pool.acquire() as conn:
+            ids = await _seed(conn, user_id)
+            await _seed_usage(conn, user_id, DAY)
+            await _seed_summary(conn, user_id, DAY, datetime(2026, 3, 10, 6, 7, tzinfo=timezone.utc))
+            await _recompute(conn, user_id, DAY)
+            entry_ids = dict(await conn.fetch(
+                "SELECT metric_id, id FROM entries WHERE user_id = $1", user_id,
+            ))
+
+            await _seed_usage(conn, user_id, DAY, vscode_seconds=7300)
+            await _seed_summary(conn, user_id, DAY, datetime(2026, 3, 10, 5, 30, tzinfo=timezone.utc))
+            expected = await _legacy_snapshot(conn, user_id, DAY)
+            actual = await _recompute(conn, user_id, DAY)
+
+            assert dict(await conn.fetch(
+                "SELECT metric_id, id FROM entries WHERE user_id = $1", user_id,
+            )) == entry_ids
+            value_rows = await conn.fetchval(
+                """SELECT (SELECT COUNT(*) FROM values_number WHERE entry_id = ANY($1))
+                        + (SELECT COUNT(*) FROM values_duration WHERE entry_id = ANY($1))
+                        + (SELECT COUNT(*) FROM values_time WHERE entry_id = ANY($1))""",
+                list(entry_ids.values()),
+            )
+
+        assert actual == expected
+        assert value_rows == len(entry_ids) == len(_METRICS)
+        values = _by_metric(actual)
+        assert values[ids["vscode"]] == (None, 121, None)
+        assert values[ids["work"]] == (122, None, None)
+        assert values[ids["first"]] == (None, None, datetime(2026, 3, 10, 5, 30, tzinfo=timezone.utc))
@@ -1,10 +1,13 @@
 """Unit tests for pure functions in activitywatch/service.py (no DB)."""
 
+import random
 from datetime import date, datetime, timezone
+from unittest.mock import MagicMock, call
 
 import pytest
 
 from app.integrations.activitywatch.service import (
+    compute_integration_metrics,
     _build_active_intervals,
     _compute_afk_time,
     _compute_app_durations,
@@ -14,7 +17,10 @@ from app.integrations.activitywatch.service import (
     _compute_time_boundaries,
     _intersect_duration,
     _parse_ts,
+    _scan_afk_events,
+    _scan_window_events,
 )
+from app.repositories.integrations_repository import IntegrationsRepository
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -153,6 +159,13 @@ class TestIntersectDuration:
         intervals = [(100.0, 200.0), (300.0, 400.0)]
         assert _intersect_duration(0.0, 500.0, intervals) == pytest.approx(200)
 
+    def test_boundaries_and_gaps(self) -> None:
+        intervals = [(100.0, 200.0), (300.0, 400.0)]
+        assert _intersect_duration(200.0, 300.0, intervals) == pytest.approx(0)
+        assert _intersect_duration(150.0, 350.0, intervals) == pytest.approx(100)
+        assert _intersect_duration(450.0, 500.0, intervals) == pytest.approx(0)
+        assert _intersect_duration(150.0, 120.0, intervals) == pytest.approx(0)
+
 
 # =========================================================================
 # _parse_ts
@@ -284,3 +297,51 @@ class TestComputeAfkTime:
         first = datetime.fromtimestamp(ts, tz=timezone.utc)
         last = datetime.fromtimestamp(ts + 1000, tz=timezone.utc)
         assert _compute_afk_time(intervals, first, last) == 600
+
+
+# =========================================================================
+# Sweep vs. per-event interval scan
+# =========================================================================
+def _scan_overlap(start: float, end: float, intervals: list[tuple[float, float]]) -> float:
+    """Reference: walk the interval list for one event."""
+    return sum(max(0.0, min(end, e) - max(start, s)) for s, e in intervals if s < end and e > start)
+
+
+class TestSweepMatchesScan:
+    """Randomised day with AFK toggling: sweep results equal the per-event scan."""
+
+    def test_random_day(self) -> None:
+        rng = random.Random(7)
+        afk, t = [], 0.0
+        while t < 20_000:
+            dur = rng.uniform(5, 400)
+            afk.append(_afk_event(t, dur, status=rng.choice(["afk", "not-afk", "not-afk"])))
+            t += dur + rng.choice([0.0, rng.uniform(0, 30)])
+        apps = ["Firefox", "VSCode", "Terminal"]
+        window = [_window_event(rng.uniform(0, 20_000), rng.uniform(0, 300), rng.choice(apps))
+                  for _ in range(400)]
+
+        intervals, breaks = _scan_afk_events(afk)
+        durations, switches = _scan_window_events(window, intervals)
+
+        expected: dict[str, float] = {}
+        for e in window:
+            start = _parse_ts(e["timestamp"])
+            overlap = _scan_overlap(start, start + e["duration"], intervals)
+            expected[e["data"]["app"]] = expected.get(e["data"]["app"], 0.0) + overlap
+        assert durations == {k: int(round(v, 6)) for k, v in expected.items()}
+
+        active_apps = [
+            e["data"]["app"] for e in sorted(window, key=lambda e: _parse_ts(e["timestamp"]))
+            if _scan_overlap(_parse_ts(e["timestamp"]), _parse_ts(e["timestamp"]) + e["duration"], intervals) > 0
+        ]
+        assert switches == sum(a != b for a, b in zip(active_apps, active_apps[1:]))
+        assert breaks == sum(1 for e in afk if e["data"]["status"] == "afk" and e["duration"] >= 300)
+
+
+class TestComputeIntegrationMetrics:
+    async def test_delegates_to_single_statement(self):
+        repo = MagicMock(spec=IntegrationsRepository)
+        await compute_integration_metrics(repo, date(2026, 1, 10))
+        repo.recompute_aw_integration_metrics.assert_awaited_once_with(date(2026, 1, 10))
+        assert repo.method_calls == [call.recompute_aw_integration_metrics(date(2026, 1, 10))]
@@ -6,9 +6,14 @@ separately in test_quality_issue_unit.py.
 """
 from __future__ import annotations
 
+import random
 import unittest
+from datetime import date, timedelta
 
-from app.analytics.correlation_math import CorrelationCalculator
+from app.analytics.correlation_math import (
+    CorrelationCalculator, FisherExact, build_contingency_table, fisher_exact_p_from_table,
+)
+from app.analytics.time_series import DaySeries
 
 
 class TestPearsonPerfectPositive(unittest.TestCase):
@@ -404,6 +409,50 @@ class TestFisherExactEmptyData(unittest.TestCase):
         self.assertEqual(calc.fisher_exact_p(), 1.0)
 
 
+class TestFisherExactEngine(unittest.TestCase):
+    """FisherExact: таблица log(k!) + кэш по (a, b, c, d)."""
+
+    def test_reference_value(self) -> None:
+        # scipy.stats.fisher_exact([[8, 2], [1, 5]]) → 0.03496
+        self.assertAlmostEqual(FisherExact().p_value(8, 2, 1, 5), 0.034965, places=5)
+
+    def test_table_grows_and_memoizes(self) -> None:
+        fisher = FisherExact(max_n=4)
+        p = fisher.p_value(30, 5, 4, 25)
+        self.assertGreaterEqual(len(fisher._log_fact), 65)
+        self.assertEqual(fisher.p_value(30, 5, 4, 25), p)
+        self.assertEqual(len(fisher._memo), 1)
+
+    def test_matches_standalone(self) -> None:
+        fisher = FisherExact()
+        for table in [(0, 0, 0, 0), (3, 0, 0, 3), (1, 9, 11, 3), (12, 5, 7, 9)]:
+            self.assertEqual(fisher.p_value(*table), fisher_exact_p_from_table(*table))
+
+
+class TestBitsetContingency(unittest.TestCase):
+    """DaySeries: таблица через popcount совпадает с обходом по датам, в т.ч. со сдвигом."""
+
+    def test_matches_dict_path(self) -> None:
+        rng = random.Random(5)
+        base = date(2026, 1, 1)
+
+        def series() -> dict[str, float]:
+            return {
+                str(base + timedelta(days=i)): float(rng.random() < 0.4)
+                for i in range(120) if rng.random() < 0.8
+            }
+
+        for _ in range(20):
+            a, b = series(), series()
+            sa, sb = DaySeries.from_dict(a), DaySeries.from_dict(b)
+            self.assertEqual(build_contingency_table(sa, sb), build_contingency_table(a, b))
+            shifted = sa.shift(3)
+            self.assertEqual(
+                build_contingency_table(shifted, sb),
+                build_contingency_table(shifted.to_dict(), b),
+            )
+
+
 # ---------------------------------------------------------------------------
 # Интеграционные тесты: совместное использование методов
 # ---------------------------------------------------------------------------
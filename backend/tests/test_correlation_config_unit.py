@@ -268,3 +268,119 @@ class TestConfigImmutable(unittest.TestCase):
         cfg = CorrelationConfig()
         with self.assertRaises(AttributeError):
             cfg.quality_filters.wide_ci = False  # type: ignore[misc]
+
+
+class TestEngineConfig(unittest.TestCase):
+    """[engine] table selects the pair evaluation mode."""
+
+    def test_default_mode_is_matrix(self) -> None:
+        cfg = load_config(env="prod", path=Path("/nonexistent/path.toml"))
+        self.assertEqual(cfg.engine.mode, "matrix")
+
+    def test_local_overrides_mode(self) -> None:
+        toml_content = b"""
+[prod.engine]
+mode = "matrix"
+
+[local.engine]
+mode = "pairwise"
+"""
+        with tempfile.NamedTemporaryFile(suffix=".toml", delete=False) as f:
+            f.write(toml_content)
+            f.flush()
+            cfg_prod = load_config(env="prod", path=Path(f.name))
+            cfg_local = load_config(env="local", path=Path(f.name))
+
+        self.assertEqual(cfg_prod.engine.mode, "matrix")
+        self.assertEqual(cfg_local.engine.mode, "pairwise")
+
+    def test_unknown_mode_falls_back_to_default(self) -> None:
+        toml_content = b"""
+[prod.engine]
+mode = "gpu"
+"""
+        with tempfile.NamedTemporaryFile(suffix=".toml", delete=False) as f:
+            f.write(toml_content)
+            f.flush()
+            cfg = load_config(env="prod", path=Path(f.name))
+
+        self.assertEqual(cfg.engine.mode, "matrix")
+
+    def test_default_lags(self) -> None:
+        cfg = load_config(env="prod", path=Path("/nonexistent/path.toml"))
+        self.assertEqual(cfg.engine.lags, (1,))
+
+    def test_lags_parsed_sorted_positive(self) -> None:
+        toml_content = b"""
+[prod.engine]
+lags = [7, 1, 0, 3, 3, -2]
+"""
+        with tempfile.NamedTemporaryFile(suffix=".toml", delete=False) as f:
+            f.write(toml_content)
+            f.flush()
+            cfg = load_config(env="prod", path=Path(f.name))
+
+        self.assertEqual(cfg.engine.lags, (1, 3, 7))
+
+    def test_incremental_settings(self) -> None:
+        toml_content = b"""
+[prod.engine]
+incremental = false
+incremental_max_changed_fraction = 0.5
+incremental_max_chain = 5
+"""
+        with tempfile.NamedTemporaryFile(suffix=".toml", delete=False) as f:
+            f.write(toml_content)
+            f.flush()
+            cfg = load_config(env="prod", path=Path(f.name))
+
+        self.assertFalse(cfg.engine.incremental)
+        self.assertEqual(cfg.engine.incremental_max_changed_fraction, 0.5)
+        self.assertEqual(cfg.engine.incremental_max_chain, 5)
+
+    def test_series_budget(self) -> None:
+        self.assertEqual(load_config(env="prod", path=Path("/nonexistent.toml")).engine.series_budget_bytes, 8_000_000)
+        with tempfile.NamedTemporaryFile(suffix=".toml", delete=False) as f:
+            f.write(b"[prod.engine]\nseries_budget_bytes = 0\n")
+            f.flush()
+            cfg = load_config(env="prod", path=Path(f.name))
+
+        self.assertEqual(cfg.engine.series_budget_bytes, 0)
+
+    def test_state_budget(self) -> None:
+        self.assertEqual(load_config(env="prod", path=Path("/nonexistent.toml")).engine.state_budget_bytes, 32_000_000)
+        with tempfile.NamedTemporaryFile(suffix=".toml", delete=False) as f:
+            f.write(b"[prod.engine]\nstate_budget_bytes = 1000\n")
+            f.flush()
+            cfg = load_config(env="prod", path=Path(f.name))
+
+        self.assertEqual(cfg.engine.state_budget_bytes, 1000)
+
+
+class TestJobsConfig(unittest.TestCase):
+    """[jobs] table sets report queue limits."""
+
+    def test_defaults(self) -> None:
+        cfg = load_config(env="prod", path=Path("/nonexistent/path.toml"))
+        self.assertEqual(cfg.jobs.max_concurrent, 2)
+        self.assertEqual(cfg.jobs.max_per_user, 1)
+
+    def test_local_overrides_and_caps_clamped(self) -> None:
+        toml_content = b"""
+[prod.jobs]
+max_concurrent = 4
+max_per_user = 2
+
+[local.jobs]
+max_per_user = 0
+heartbeat_seconds = 5
+"""
+        with tempfile.NamedTemporaryFile(suffix=".toml", delete=False) as f:
+            f.write(toml_content)
+            f.flush()
+            cfg_prod = load_config(env="prod", path=Path(f.name))
+            cfg_local = load_config(env="local", path=Path(f.name))
+
+        self.assertEqual((cfg_prod.jobs.max_concurrent, cfg_prod.jobs.max_per_user), (4, 2))
+        self.assertEqual((cfg_local.jobs.max_concurrent, cfg_local.jobs.max_per_user), (4, 1))
+        self.assertEqual(cfg_local.jobs.heartbeat_seconds, 5)
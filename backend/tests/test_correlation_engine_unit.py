@@ -1,13 +1,16 @@
 """Unit tests for CorrelationEngine internal logic (no DB)."""
 from __future__ import annotations
 
+import contextlib
 import unittest
 from collections import defaultdict
+from dataclasses import fields, replace
 from datetime import date
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 from app.analytics.correlation_engine import CorrelationEngine, CorrelationPairResult
-from app.repositories.correlation_repository import CorrelationRepository
+from app.analytics.time_series import DaySeries
+from app.repositories.correlation_repository import PAIR_COLUMNS, CorrelationRepository
 from app.source_key import AutoSourceType, SourceKey
 
 
@@ -383,3 +386,111 @@ class TestBHCorrection(unittest.TestCase):
         for pr in result:
             assert pr.adjusted_p_value is not None
             assert pr.adjusted_p_value <= 1.0
+
+
+# ─── insert_pairs (COPY) ───────────────────────────────────────
+
+
+class TestInsertPairsCopy(unittest.IsolatedAsyncioTestCase):
+    def test_columns_follow_result_fields(self) -> None:
+        assert PAIR_COLUMNS == tuple(f.name for f in fields(CorrelationPairResult))
+
+    @staticmethod
+    def _conn(claim_held: bool = True) -> MagicMock:
+        conn = MagicMock()
+        conn.copy_records_to_table = AsyncMock()
+        conn.fetchval = AsyncMock(return_value=1 if claim_held else None)
+        conn.transaction = MagicMock(side_effect=lambda: contextlib.nullcontext())
+        return conn
+
+    async def test_single_copy_call(self) -> None:
+        conn = self._conn()
+        repo = CorrelationRepository(conn, 1)
+        assert await repo.insert_pairs(1, 3, [_make_pair(0.01), _make_pair(0.02)]) is True
+        assert conn.fetchval.await_args.args[1:] == (1, 3)
+        conn.copy_records_to_table.assert_awaited_once()
+        kwargs = conn.copy_records_to_table.await_args.kwargs
+        assert kwargs["columns"] == PAIR_COLUMNS
+        assert len(kwargs["records"]) == 2
+        assert kwargs["records"][0][-3] == 0.01
+
+    async def test_lost_claim_writes_nothing(self) -> None:
+        conn = self._conn(claim_held=False)
+        assert await CorrelationRepository(conn, 1).insert_pairs(1, 3, [_make_pair(0.01)]) is False
+        conn.copy_records_to_table.assert_not_awaited()
+
+    async def test_empty_is_noop(self) -> None:
+        conn = self._conn()
+        await CorrelationRepository(conn, 1).insert_pairs(1, 3, [])
+        conn.copy_records_to_table.assert_not_awaited()
+
+    async def test_state_write_needs_claim(self) -> None:
+        conn = self._conn(claim_held=False)
+        conn.execute = AsyncMock()
+        assert await CorrelationRepository(conn, 1).save_report_state(1, 3, b"state") is False
+        conn.execute.assert_not_awaited()
+        conn = self._conn()
+        conn.execute = AsyncMock()
+        assert await CorrelationRepository(conn, 1).save_report_state(1, 3, b"state") is True
+        assert conn.fetchval.await_args.args[1:] == (1, 3)
+        assert conn.execute.await_args.args[1:] == (1, b"state")
+
+
+# ─── _save_series ──────────────────────────────────────────────
+
+
+class TestSaveSeries(unittest.IsolatedAsyncioTestCase):
+    """Sources of the strongest pairs are stored first, within the byte budget."""
+
+    def _engine(self, budget: int) -> CorrelationEngine:
+        sources = [(SourceKey(metric_id=i), "number") for i in (1, 2, 3)]
+        data = {i: DaySeries.from_dict({f"2025-01-{d:02d}": float(d * (i + 1)) for d in range(1, 29)}) for i in range(3)}
+        engine = _make_engine(sources=sources, source_data=data)
+        engine._config = replace(engine._config, engine=replace(engine._config.engine, series_budget_bytes=budget))
+        engine._repo.insert_report_series = AsyncMock(return_value=True)
+        return engine
+
+    @staticmethod
+    def _pairs() -> list[CorrelationPairResult]:
+        weak = replace(_make_pair(0.01), source_key_a="metric:1", source_key_b="metric:2", correlation=0.2)
+        strong = replace(_make_pair(0.01), source_key_a="metric:3", source_key_b="metric:1", correlation=-0.9)
+        return [weak, strong]
+
+    async def test_all_within_budget(self) -> None:
+        engine = self._engine(1_000_000)
+        await engine._save_series(self._pairs())
+        report_id, attempt, series = engine._repo.insert_report_series.await_args.args
+        assert (report_id, attempt) == (1, 0)
+        assert [key for key, _ in series] == ["metric:3", "metric:1", "metric:2"]
+        assert DaySeries.from_bytes(series[0][1]) == engine._source_data[2]
+
+    async def test_budget_keeps_strongest(self) -> None:
+        size = len(DaySeries.from_dict(self._engine(0)._source_data[2]).to_bytes())
+        engine = self._engine(size + 10)
+        await engine._save_series(self._pairs())
+        _, _, series = engine._repo.insert_report_series.await_args.args
+        assert [key for key, _ in series] == ["metric:3"]
+
+    async def test_zero_budget_skips(self) -> None:
+        engine = self._engine(0)
+        await engine._save_series(self._pairs())
+        engine._repo.insert_report_series.assert_not_awaited()
+
+
+# ─── rolling averages ──────────────────────────────────────────
+
+
+class TestFillRollingAvg(unittest.TestCase):
+    """One call fills every window of the parent metric."""
+
+    def test_all_windows_filled(self) -> None:
+        parent = {f"2025-01-{d:02d}": float(d) for d in range(1, 11)}
+        sources = [(SourceKey(metric_id=5), "number")] + [
+            (SourceKey(auto_type=AutoSourceType.ROLLING_AVG, auto_parent_metric_id=5, auto_option_id=w), "number")
+            for w in (3, 7)
+        ]
+        engine = _make_engine(sources=sources, source_data={0: parent}, aggregate_indices={5: 0})
+        engine._fill_rolling_avg(1, sources[1][0], [])
+        assert engine._source_data[1]["2025-01-03"] == 2.0
+        assert len(engine._source_data[1]) == 8
+        assert engine._source_data[2] == {f"2025-01-{d:02d}": d - 3.0 for d in range(7, 11)}
@@ -0,0 +1,343 @@
+"""Unit tests for the batched matrix Pearson kernel — parity with PearsonMethod."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from dataclasses import fields, replace
+import unittest
+from datetime import date, timedelta
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+
+from app.analytics.compute_pool import shutdown_compute_executor, split_pair_rows
+from app.analytics.correlation_engine import CorrelationEngine, PairComputeJob, compute_pairs
+from app.analytics.correlation_math import PearsonMethod, build_contingency_table
+from app.analytics.correlation_matrix import MatrixPearson, MatrixState, SourceMatrix
+from app.analytics.time_series import TimeSeriesTransform
+from app.correlation_config import CorrelationConfig, EngineConfig
+from app.domain.exceptions import ReportCancelledError
+from app.repositories.correlation_repository import CorrelationRepository
+from app.source_key import AutoSourceType, SourceKey
+
+_START = date(2025, 1, 1)
+
+
+def _series(rng: random.Random, days: int, *, density: float, kind: str) -> dict[str, float]:
+    result: dict[str, float] = {}
+    for i in range(days):
+        if rng.random() > density:
+            continue
+        d = str(_START + timedelta(days=i))
+        if kind == "binary":
+            result[d] = 1.0 if rng.random() < 0.4 else 0.0
+        elif kind == "int":
+            result[d] = float(rng.randint(0, 10))
+        else:
+            result[d] = rng.gauss(1400.0, 45.0)
+    return result
+
+
+def _random_series(seed: int, count: int = 12, days: int = 90) -> list[dict[str, float]]:
+    rng = random.Random(seed)
+    kinds = ["binary", "int", "float"]
+    return [
+        _series(rng, days, density=rng.choice([0.3, 0.7, 1.0]), kind=kinds[i % 3])
+        for i in range(count)
+    ]
+
+
+class TestMatrixPearsonParity(unittest.TestCase):
+    """r, n, p-value and CI match PearsonMethod exactly for every ordered pair."""
+
+    def _assert_parity(self, series: list[dict[str, float]], lag: int) -> None:
+        kernel = MatrixPearson(SourceMatrix.from_series(series))
+        moments = kernel.moments(lag=lag)
+        method = PearsonMethod()
+        for a in range(len(series)):
+            for b in range(len(series)):
+                if a == b:
+                    continue
+                data_b = TimeSeriesTransform.shift_dates(series[b], lag) if lag else series[b]
+                expected = method.compute(series[a], data_b)
+                actual = MatrixPearson.result(moments, a, b)
+                self.assertEqual(actual, expected, f"pair ({a}, {b}) lag={lag}")
+
+    def test_same_day(self) -> None:
+        self._assert_parity(_random_series(seed=1), lag=0)
+
+    def test_next_day(self) -> None:
+        self._assert_parity(_random_series(seed=2), lag=1)
+
+    def test_constant_over_overlap_gives_zero(self) -> None:
+        a = {str(_START + timedelta(days=i)): 3.5 for i in range(10)}
+        b = {str(_START + timedelta(days=i)): float(i) for i in range(10)}
+        moments = MatrixPearson(SourceMatrix.from_series([a, b])).moments()
+        self.assertEqual(MatrixPearson.result(moments, 0, 1), PearsonMethod().compute(a, b))
+        self.assertEqual(MatrixPearson.result(moments, 0, 1).r, 0.0)
+
+    def test_fewer_than_three_common_days(self) -> None:
+        a = {"2025-01-01": 1.0, "2025-01-02": 2.0}
+        b = {"2025-01-01": 5.0, "2025-01-02": 7.0, "2025-01-05": 1.0}
+        moments = MatrixPearson(SourceMatrix.from_series([a, b])).moments()
+        result = MatrixPearson.result(moments, 0, 1)
+        self.assertIsNone(result.r)
+        self.assertEqual(result.n, 2)
+
+    def test_empty_sources(self) -> None:
+        moments = MatrixPearson(SourceMatrix.from_series([{}, {}])).moments(lag=1)
+        self.assertIsNone(MatrixPearson.result(moments, 0, 1).r)
+
+
+class TestMatrixContingency(unittest.TestCase):
+    """2×2 tables from bitset products match build_contingency_table."""
+
+    def test_binary_tables(self) -> None:
+        rng = random.Random(7)
+        series = [_series(rng, 60, density=0.8, kind="binary") for _ in range(5)]
+        for lag in (0, 1):
+            moments = MatrixPearson(SourceMatrix.from_series(series)).moments(lag=lag)
+            for a in range(5):
+                for b in range(5):
+                    if a == b:
+                        continue
+                    data_b = TimeSeriesTransform.shift_dates(series[b], lag) if lag else series[b]
+                    self.assertEqual(
+                        MatrixPearson.contingency(moments, a, b),
+                        build_contingency_table(series[a], data_b),
+                    )
+
+
+class _EngineFactory:
+    """Engine with synthetic sources: plain metrics plus one rolling-average auto source."""
+
+    def _engine(
+        self, mode: str, series: list[dict[str, float]], lags: tuple[int, ...] = (1,),
+    ) -> CorrelationEngine:
+        repo = MagicMock(spec=CorrelationRepository)
+        repo.conn = MagicMock()
+        repo.user_id = 1
+        config = CorrelationConfig(engine=EngineConfig(mode=mode, lags=lags))
+        engine = CorrelationEngine(repo, 1, _START, _START + timedelta(days=89), config=config)
+        types = ["bool", "number", "scale"]
+        engine._sources = [(SourceKey(metric_id=i + 1), types[i % 3]) for i in range(len(series))]
+        engine._sources.append(
+            (SourceKey(auto_type=AutoSourceType.ROLLING_AVG, auto_parent_metric_id=2, auto_option_id=7), "number"),
+        )
+        engine._source_data = dict(enumerate(series))
+        engine._source_data[len(series)] = TimeSeriesTransform.rolling_avg(series[1], 7)
+        engine._precompute_quality_flags()
+        return engine
+
+
+class TestEngineMatrixMode(_EngineFactory, unittest.TestCase):
+    """Matrix mode yields exactly the same pair list as the pairwise loop."""
+
+    def test_parity_with_pairwise(self) -> None:
+        series = _random_series(seed=3, count=9)
+        pairwise = self._engine("pairwise", series)._evaluate_all_pairs()
+        matrix = self._engine("matrix", series)._evaluate_all_pairs()
+        self.assertGreater(len(pairwise), 0)
+        self.assertEqual(matrix, pairwise)
+        self.assertEqual(
+            CorrelationEngine._apply_bh_correction(matrix),
+            CorrelationEngine._apply_bh_correction(pairwise),
+        )
+
+    def test_parity_with_pairwise_multiple_lags(self) -> None:
+        series = _random_series(seed=4, count=6)
+        lags = (1, 2, 7)
+        pairwise = self._engine("pairwise", series, lags)._evaluate_all_pairs()
+        matrix = self._engine("matrix", series, lags)._evaluate_all_pairs()
+        self.assertEqual(matrix, pairwise)
+        self.assertEqual({p.lag_days for p in pairwise}, {0, 1, 2, 7})
+
+    def test_each_source_shifted_once_per_lag(self) -> None:
+        series = _random_series(seed=5, count=6)
+        engine = self._engine("pairwise", series, (1, 3))
+        with patch.object(
+            TimeSeriesTransform, "shift_dates", wraps=TimeSeriesTransform.shift_dates,
+        ) as shift:
+            engine._evaluate_all_pairs()
+        calls = [(id(c.args[0]), c.args[1]) for c in shift.call_args_list]
+        self.assertEqual(len(calls), len(set(calls)))
+
+    def test_packed_sources_match_dicts(self) -> None:
+        series = _random_series(seed=6, count=6)
+        plain = self._engine("pairwise", series)._evaluate_all_pairs()
+        for mode in ("pairwise", "matrix"):
+            engine = self._engine(mode, series)
+            engine._pack_source_data()
+            self.assertEqual(engine._evaluate_all_pairs(), plain, mode)
+
+
+def _slide(series: list[dict[str, float]], days: int, seed: int) -> list[dict[str, float]]:
+    """Drop the first `days` days, append `days` new ones and edit one old value per source."""
+    rng = random.Random(seed)
+    cutoff = str(_START + timedelta(days=days))
+    last = max(date.fromisoformat(d) for s in series for d in s)
+    result = []
+    for s in series:
+        kept = {d: v for d, v in s.items() if d >= cutoff}
+        for i in range(1, days + 1):
+            kept[str(last + timedelta(days=i))] = float(rng.randint(0, 1))
+        if kept:
+            d = rng.choice(sorted(kept))
+            kept[d] = kept[d] + 1.0
+        result.append(kept)
+    return result
+
+
+class TestIncrementalSums(unittest.TestCase):
+    """Delta-updated sums match a full recomputation."""
+
+    def _assert_sums_close(self, actual, expected) -> None:
+        for f in fields(expected):
+            np.testing.assert_allclose(getattr(actual, f.name), getattr(expected, f.name), atol=1e-6)
+
+    def test_sliding_window(self) -> None:
+        old_series = _random_series(seed=8, count=8)
+        new_series = _slide(old_series, days=3, seed=9)
+        old = SourceMatrix.from_series(old_series)
+        new = SourceMatrix.from_series(new_series, shift=old.shift)
+        for lag in (0, 1, 7):
+            previous = MatrixPearson(old).sums(lag)
+            updated = MatrixPearson(new).updated_sums(old, previous, lag)
+            self._assert_sums_close(updated, MatrixPearson(new).sums(lag))
+
+    def test_unchanged_returns_previous(self) -> None:
+        series = _random_series(seed=10, count=4)
+        m = SourceMatrix.from_series(series)
+        previous = MatrixPearson(m).sums(1)
+        again = SourceMatrix.from_series(series, shift=m.shift)
+        self.assertIs(MatrixPearson(again).updated_sums(m, previous, 1), previous)
+
+    def test_state_round_trip(self) -> None:
+        m = SourceMatrix.from_series(_random_series(seed=11, count=4))
+        kernel = MatrixPearson(m)
+        state = MatrixState(("a", "b", "c", "d"), (1,), m, {0: kernel.sums(0), 1: kernel.sums(1)}, chain=2)
+        loaded = MatrixState.from_bytes(state.to_bytes())
+        self.assertEqual(loaded.source_keys, state.source_keys)
+        self.assertEqual((loaded.lags, loaded.chain), ((1,), 2))
+        np.testing.assert_array_equal(loaded.matrix.values, m.values)
+        np.testing.assert_array_equal(loaded.matrix.shift, m.shift)
+        for lag in (0, 1):
+            self._assert_sums_close(loaded.sums[lag], state.sums[lag])
+
+
+class TestEngineIncremental(_EngineFactory, unittest.TestCase):
+    """The engine reuses the previous report's state and matches a full run."""
+
+    def test_incremental_matches_full(self) -> None:
+        old_series = _random_series(seed=12, count=8)
+        new_series = _slide(old_series, days=2, seed=13)
+        previous = self._engine("matrix", old_series)
+        previous._evaluate_all_pairs()
+
+        full = self._engine("matrix", new_series)._evaluate_all_pairs()
+        engine = self._engine("matrix", new_series)
+        engine._prev_state = MatrixState.from_bytes(previous._state.to_bytes())
+        incremental = engine._evaluate_all_pairs()
+
+        self.assertEqual(engine._state.chain, 1)
+        self.assertEqual(len(incremental), len(full))
+        for inc, ref in zip(incremental, full):
+            self.assertEqual(inc.data_points, ref.data_points)
+            self.assertAlmostEqual(inc.correlation, ref.correlation, delta=0.0011)
+
+    def test_changed_sources_fall_back_to_full(self) -> None:
+        series = _random_series(seed=14, count=6)
+        previous = self._engine("matrix", series[:5])
+        previous._evaluate_all_pairs()
+        engine = self._engine("matrix", series)
+        engine._prev_state = previous._state
+        engine._evaluate_all_pairs()
+        self.assertEqual(engine._state.chain, 0)
+
+
+class TestSaveState(_EngineFactory, unittest.IsolatedAsyncioTestCase):
+    """The state is stored for the next report only within engine.state_budget_bytes."""
+
+    def _evaluated(self, budget: int) -> CorrelationEngine:
+        engine = self._engine("matrix", _random_series(seed=15, count=5), lags=(1, 2))
+        engine._config = replace(engine._config, engine=replace(engine._config.engine, state_budget_bytes=budget))
+        engine._evaluate_all_pairs()
+        return engine
+
+    def test_nbytes_counts_values_and_all_lags(self) -> None:
+        state = self._evaluated(0)._state
+        m = state.matrix
+        per_lag = sum(getattr(state.sums[0], f.name).nbytes for f in fields(state.sums[0]))
+        self.assertEqual(set(state.sums), {0, 1, 2})
+        self.assertEqual(state.nbytes, m.values.nbytes + m.mask.size + m.binary.size + m.shift.nbytes + 3 * per_lag)
+
+    async def test_within_budget_saved(self) -> None:
+        engine = self._evaluated(10_000_000)
+        engine._repo.save_report_state.return_value = True
+        await engine._save_state()
+        report_id, attempt, payload = engine._repo.save_report_state.await_args.args
+        self.assertEqual((report_id, attempt), (1, 0))
+        loaded = MatrixState.from_bytes(payload)
+        self.assertEqual((loaded.source_keys, loaded.lags), (engine._state.source_keys, (1, 2)))
+
+    async def test_lost_claim_raises(self) -> None:
+        engine = self._evaluated(10_000_000)
+        engine._repo.save_report_state.return_value = False
+        with self.assertRaises(ReportCancelledError):
+            await engine._save_state()
+
+    async def test_over_budget_skipped(self) -> None:
+        engine = self._evaluated(self._evaluated(0)._state.nbytes - 1)
+        await engine._save_state()
+        engine._repo.save_report_state.assert_not_awaited()
+
+
+class TestComputeOffload(_EngineFactory, unittest.TestCase):
+    """Chunked compute (inline or in worker processes) matches a single pass."""
+
+    def test_split_pair_rows_covers_all_rows(self) -> None:
+        for n, chunks in ((1, 4), (7, 3), (100, 4), (5, 10)):
+            ranges = split_pair_rows(n, chunks)
+            self.assertEqual(ranges[0][0], 0)
+            self.assertEqual(ranges[-1][1], n)
+            for (_, end), (start, _) in zip(ranges, ranges[1:]):
+                self.assertEqual(end, start)
+        self.assertEqual(split_pair_rows(0, 4), [])
+
+    def test_split_pair_rows_balanced(self) -> None:
+        n = 200
+        counts = [sum(n - 1 - i for i in range(lo, hi)) for lo, hi in split_pair_rows(n, 4)]
+        self.assertLess(max(counts) - min(counts), n)
+
+    def test_chunks_concatenate_to_serial(self) -> None:
+        series = _random_series(seed=15, count=8)
+        for mode in ("pairwise", "matrix"):
+            engine = self._engine(mode, series)
+            serial = engine._evaluate_all_pairs()
+            chunked, states = [], []
+            for rows in split_pair_rows(len(engine._sources), 3):
+                job = PairComputeJob(
+                    report_id=1, config=engine._config, sources=engine._sources,
+                    source_data=engine._source_data, single_select_metric_ids=set(),
+                    prev_state=None, rows=rows,
+                )
+                chunk, state = compute_pairs(job)
+                chunked.extend(chunk)
+                states.append(state)
+            self.assertEqual(chunked, serial, mode)
+            # Only the first chunk sends the matrix state back.
+            self.assertEqual([s is not None for s in states], [mode == "matrix", False, False], mode)
+
+    def test_process_pool(self) -> None:
+        series = _random_series(seed=16, count=6)
+        inline = self._engine("matrix", series)
+        expected = inline._evaluate_all_pairs()
+        engine = self._engine("matrix", series)
+        engine._config = replace(engine._config, engine=replace(engine._config.engine, workers=2))
+        try:
+            pairs = asyncio.run(engine._compute_pairs())
+        finally:
+            shutdown_compute_executor()
+        self.assertEqual(pairs, expected)
+        self.assertIsNotNone(engine._state)
@@ -0,0 +1,113 @@
+"""Unit tests for the daily summary cache — version-checked snapshots (no DB)."""
+
+from __future__ import annotations
+
+from datetime import date, datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.repositories.daily_repository import DailyRepository
+from app.services.daily_cache import CacheVersions, DailyCache, daily_cache
+from app.services.daily_service import DailyService
+
+DAY = date(2026, 3, 1)
+METRIC = {
+    "id": 1, "slug": "walk", "name": "Walk", "description": None, "icon": "", "category_id": None,
+    "type": "bool", "scale_min": None, "scale_max": None, "scale_step": None, "scale_labels": None,
+    "private": False, "hide_in_cards": False, "is_checkpoint": False, "interval_binding": "all_day",
+    "formula": None, "result_type": None, "provider": None, "metric_key": None, "value_type": None,
+    "multi_select": None, "condition_metric_id": None,
+}
+ENTRY = {"id": 10, "metric_id": 1, "date": DAY, "recorded_at": datetime(2026, 3, 1, 9, 0),
+         "checkpoint_id": None, "interval_id": None, "v_bool": True}
+
+
+class TestDailyCache:
+    """Snapshots are served only while their versions match."""
+
+    def test_config_version(self) -> None:
+        cache = DailyCache()
+        cache.put_config(1, CacheVersions(3, 0), {"x": 1})
+        assert cache.get_config(1, CacheVersions(3, 9)) == {"x": 1}
+        assert cache.get_config(1, CacheVersions(4, 0)) is None
+        assert cache.get_config(2, CacheVersions(3, 0)) is None
+
+    def test_day_needs_both_versions(self) -> None:
+        cache = DailyCache()
+        cache.put_day(1, DAY, CacheVersions(1, 1), {"x": 1})
+        assert cache.get_day(1, DAY, CacheVersions(1, 1)) == {"x": 1}
+        assert cache.get_day(1, DAY, CacheVersions(1, 2)) is None
+        assert cache.get_day(1, DAY, CacheVersions(2, 1)) is None
+        assert cache.get_day(1, date(2026, 3, 2), CacheVersions(1, 1)) is None
+
+    def test_lru_eviction(self) -> None:
+        cache = DailyCache(config_size=2, day_size=2)
+        v = CacheVersions()
+        for uid in (1, 2):
+            cache.put_config(uid, v, {})
+        cache.get_config(1, v)
+        cache.put_config(3, v, {})
+        assert cache.get_config(2, v) is None
+        assert cache.get_config(1, v) == {}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_cache():
+    daily_cache.clear()
+    yield
+    daily_cache.clear()
+
+
+def _service(versions: list[tuple[int, int]]) -> tuple[DailyService, MagicMock]:
+    async def fetch(query: str, *args: object) -> list:
+        if "FROM metric_definitions" in query:
+            return [METRIC]
+        if "FROM entries e" in query:
+            return [ENTRY]
+        return []
+
+    conn = MagicMock()
+    conn.fetch = AsyncMock(side_effect=fetch)
+    conn.fetchrow = AsyncMock(side_effect=[
+        {"config_version": c, "entries_version": e} for c, e in versions
+    ])
+    return DailyService(DailyRepository(conn, 1)), conn
+
+
+class TestDailySummaryCache:
+    """A repeated request costs one version query; bumps reload only what changed."""
+
+    async def test_hit_is_one_query(self) -> None:
+        service, conn = _service([(0, 0), (0, 0)])
+        first = await service.get_daily_summary(str(DAY), privacy_mode=False)
+        loads = conn.fetch.await_count
+        second = await service.get_daily_summary(str(DAY), privacy_mode=False)
+        assert second == first
+        assert conn.fetch.await_count == loads
+        assert conn.fetchrow.await_count == 2
+
+    async def test_entries_bump_keeps_config(self) -> None:
+        service, conn = _service([(0, 0), (0, 1)])
+        await service.get_daily_summary(str(DAY), privacy_mode=False)
+        conn.fetch.reset_mock()
+        await service.get_daily_summary(str(DAY), privacy_mode=False)
+        queries = [c.args[0] for c in conn.fetch.await_args_list]
+        assert any("FROM entries e" in q for q in queries)
+        assert not any("FROM metric_definitions" in q for q in queries)
+        assert not any("daily_layout" in q for q in queries)
+
+    async def test_config_bump_reloads_all(self) -> None:
+        service, conn = _service([(0, 0), (1, 0)])
+        await service.get_daily_summary(str(DAY), privacy_mode=False)
+        loads = conn.fetch.await_count
+        conn.fetch.reset_mock()
+        await service.get_daily_summary(str(DAY), privacy_mode=False)
+        assert conn.fetch.await_count == loads
+
+    async def test_missing_row_is_version_zero(self) -> None:
+        service, conn = _service([])
+        conn.fetchrow = AsyncMock(return_value=None)
+        result = await service.get_daily_summary(str(DAY), privacy_mode=False)
+        assert daily_cache.get_config(1, CacheVersions()) is not None
+        assert result["date"] == str(DAY)
@@ -0,0 +1,94 @@
+"""Unit tests for the daily loader's round-trips — joined values, skipped lookups (no DB)."""
+
+from __future__ import annotations
+
+from datetime import date, datetime, time
+from unittest.mock import AsyncMock, MagicMock
+
+from app.repositories.daily_repository import DailyRepository
+from app.services.daily_service import DailyService
+from app.timing import QueryTimer
+
+DAY = date(2026, 3, 1)
+_NO_VALUES = {"v_bool": None, "v_number": None, "v_time": None, "v_scale": None, "v_scale_min": None,
+              "v_scale_max": None, "v_scale_step": None, "v_duration": None, "v_enum": None}
+
+
+def _entry(eid: int, metric_id: int, cp: int | None = None, iv: int | None = None, **values: object) -> dict:
+    return {"id": eid, "metric_id": metric_id, "date": DAY, "recorded_at": datetime(2026, 3, 1, 9, 0),
+            "checkpoint_id": cp, "interval_id": iv, **_NO_VALUES, **values}
+
+
+def _repo(rows: list[dict]) -> tuple[DailyRepository, MagicMock]:
+    async def fetch(query: str, *args: object) -> list:
+        if "FROM entries e" in query:
+            return rows
+        if "mc.enabled = FALSE" in query:
+            return [{"id": 7, "metric_id": 1, "label": "Вечер", "sort_order": 2}]
+        if "mi.enabled = FALSE" in query:
+            return []
+        if "FROM notes" in query:
+            return [{"id": 1, "metric_id": 6, "text": "a", "created_at": "t1"},
+                    {"id": 2, "metric_id": 6, "text": "b", "created_at": "t2"}]
+        raise AssertionError(f"unexpected query: {query}")
+
+    conn = MagicMock()
+    conn.fetch = AsyncMock(side_effect=fetch)
+    return DailyRepository(conn, 1), conn
+
+
+class TestEntriesWithValues:
+    """Values come from the column of the metric's storage type."""
+
+    async def test_value_columns(self) -> None:
+        rows = [
+            _entry(1, 1, v_bool=True),
+            _entry(2, 2, v_number=3.5, v_bool=False),
+            _entry(3, 3, v_time=time(7, 5)),
+            _entry(4, 4, v_scale=4, v_scale_min=1, v_scale_max=5, v_scale_step=1),
+            _entry(5, 5, v_enum=[10, 11]),
+            _entry(6, 9),
+        ]
+        repo, conn = _repo(rows)
+        types = {1: "bool", 2: "number", 3: "time", 4: "scale", 5: "enum", 9: "duration"}
+        entries, values, scale = await repo.get_entries_with_values(DAY, types)
+        assert entries == rows
+        assert values == {1: True, 2: 3.5, 3: "07:05", 4: 4, 5: [10, 11]}
+        assert scale == {4: {"scale_min": 1, "scale_max": 5, "scale_step": 1}}
+        assert conn.fetch.await_count == 1
+
+    async def test_unknown_metric_defaults_to_bool(self) -> None:
+        repo, _ = _repo([_entry(1, 42, v_bool=False)])
+        _, values, _ = await repo.get_entries_with_values(DAY, {})
+        assert values == {1: False}
+
+    async def test_notes_single_query(self) -> None:
+        repo, conn = _repo([])
+        counts, notes = await repo.get_notes_for_date([6], DAY)
+        assert counts == {6: 2}
+        assert [n["text"] for n in notes[6]] == ["a", "b"]
+        assert conn.fetch.await_count == 1
+
+
+def _config(enabled_cp: dict[int, list]) -> dict:
+    metrics = [{"id": 1, "type": "bool"}]
+    return {"metrics": metrics, "metrics_by_id": {1: metrics[0]}, "metric_type_map": {1: "bool"},
+            "enabled_checkpoints": enabled_cp, "enabled_intervals": {}}
+
+
+class TestLoadDay:
+    """Disabled-binding lookups run only for entries outside the enabled bindings."""
+
+    async def test_enabled_bindings_skip_lookups(self) -> None:
+        repo, conn = _repo([_entry(1, 1, cp=5, v_bool=True)])
+        day = await DailyService(repo)._load_day(_config({1: [{"id": 5}]}), DAY, QueryTimer("t"))
+        assert conn.fetch.await_count == 1
+        assert day["values_map"] == {1: True}
+        assert day["disabled_checkpoints"] == {}
+
+    async def test_disabled_binding_loaded(self) -> None:
+        repo, conn = _repo([_entry(1, 1, cp=7, v_bool=True)])
+        day = await DailyService(repo)._load_day(_config({1: [{"id": 5}]}), DAY, QueryTimer("t"))
+        assert conn.fetch.await_count == 2
+        assert [r["id"] for r in day["disabled_checkpoints"][1]] == [7]
+        assert day["disabled_intervals"] == {}
@@ -4,9 +4,11 @@ from __future__ import annotations
 
 import math
 import random
+from statistics import stdev
 
 import pytest
 
+from app import distribution
 from app.distribution import (
     DistributionResult,
     compute_distribution,
@@ -143,6 +145,32 @@ class TestComputeKDE:
         assert xs == []
         assert ys == []
 
+    def test_matches_direct_sum(self) -> None:
+        """Broadcast result equals the per-point Gaussian sum."""
+        values = [1.0, 2.0, 2.5, 4.0, 7.0]
+        xs, ys = compute_kde(values, n_points=7)
+        h = 0.9 * min(stdev(values), (4.0 - 2.0) / 1.34) * 5 ** -0.2
+        for x, y in zip(xs, ys):
+            direct = sum(math.exp(-0.5 * ((x - v) / h) ** 2) for v in values) / (5 * h * math.sqrt(2 * math.pi))
+            assert y == pytest.approx(direct, abs=1e-5)
+
+    def test_binned_close_to_exact(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        random.seed(7)
+        values = [random.gauss(10, 3) for _ in range(3000)]
+        _, exact = compute_kde(values)
+        monkeypatch.setattr(distribution, "KDE_EXACT_MAX_N", 100)
+        distribution._kde_cache.clear()
+        _, binned = compute_kde(values)
+        assert max(abs(a - b) for a, b in zip(exact, binned)) < 1e-3 * max(exact)
+
+    def test_cached_by_content(self) -> None:
+        values = [float(x % 13) for x in range(200)]
+        first = compute_kde(values)
+        first[1].append(-1.0)
+        assert compute_kde(list(reversed(values))) == compute_kde(values)
+        assert compute_kde(values)[1][-1] != -1.0
+        assert compute_kde(values + [20.0]) != compute_kde(values)
+
 
 class TestComputeStats:
     def test_basic(self) -> None:
@@ -2070,6 +2070,73 @@ class TestImportErrors:
         assert body["metrics"]["imported"] == 0
         assert any("Missing slug" in e for e in body["metrics"]["errors"])
 
+    async def test_import_duplicate_rows_and_unknown_checkpoint(
+        self, client: AsyncClient, user_a: dict,
+    ) -> None:
+        """Repeated rows in one file import once; a foreign checkpoint_id is a row error."""
+        row = _metric_row("dup_walk", "Dup Walk")
+        metrics_csv = f"{METRICS_HEADER}\n{row}\n"
+        entries_csv = (
+            f"{ENTRIES_HEADER}\n"
+            "2026-03-01,dup_walk,true,,\n"
+            "2026-03-01,dup_walk,false,,\n"
+            "2026-03-02,dup_walk,true,999999,Nowhere\n"
+        )
+        resp = await client.post(
+            "/api/export/import",
+            files={"file": ("data.zip", build_zip(metrics_csv, entries_csv), "application/zip")},
+            headers=auth_headers(user_a["token"]),
+        )
+        assert resp.status_code == 200
+        entries = resp.json()["entries"]
+        assert entries["imported"] == 1
+        assert entries["skipped"] == 2
+        assert entries["errors"] == ["Row 4: checkpoint 999999 not found"]
+
+        resp = await client.get("/api/entries?date=2026-03-01", headers=auth_headers(user_a["token"]))
+        assert [e["value"] for e in resp.json()] == [True]
+
+    async def test_import_constraint_violating_rows_are_row_errors(
+        self, client: AsyncClient, user_a: dict,
+    ) -> None:
+        """Rows the DB would reject are reported per row; the valid rows around them still import."""
+        rows = "\n".join([
+            _metric_row("cv_walk", "CV Walk"),
+            _metric_row("cv_steps", "CV Steps", metric_type="number"),
+        ])
+        metrics_csv = f"{METRICS_HEADER}\n{rows}\n"
+        entries_csv = (
+            "date,metric_slug,value,checkpoint_id,checkpoint_label,"
+            "is_free_checkpoint,is_free_interval,time_start,time_end\n"
+            "2026-03-01,cv_walk,true,,,,,,\n"
+            "2026-03-02,cv_walk,true,,,1,1,09:00,10:00\n"
+            "2026-03-01,cv_steps,2147483648,,,,,,\n"
+            "2026-03-02,cv_steps,-2147483649,,,,,,\n"
+            "2026-03-03,cv_walk,true,99999999999,Nowhere,,,,\n"
+            "2026-03-03,cv_steps,2147483647,,,,,,\n"
+        )
+        resp = await client.post(
+            "/api/export/import",
+            files={"file": ("data.zip", build_zip(metrics_csv, entries_csv), "application/zip")},
+            headers=auth_headers(user_a["token"]),
+        )
+        assert resp.status_code == 200, resp.text
+        entries = resp.json()["entries"]
+        assert entries["imported"] == 2
+        assert entries["skipped"] == 4
+        assert entries["errors"] == [
+            "Row 3: entry cannot be both a free checkpoint and a free interval",
+            "Row 4: value 2147483648 is out of range",
+            "Row 5: value -2147483649 is out of range",
+            "Row 6: checkpoint_id 99999999999 is out of range",
+        ]
+
+        headers = auth_headers(user_a["token"])
+        resp = await client.get("/api/entries?date=2026-03-01", headers=headers)
+        assert [e["value"] for e in resp.json()] == [True]
+        resp = await client.get("/api/entries?date=2026-03-03", headers=headers)
+        assert [e["value"] for e in resp.json()] == [2147483647]
+
 
 # ---------------------------------------------------------------------------
 # Import legacy checkpoint_labels as plain strings (lines 384, 391-392)
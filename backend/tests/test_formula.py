@@ -1,11 +1,17 @@
 """Unit tests for app.formula module."""
 
+import math
+import random
+
+import numpy as np
 import pytest
 
 from app.formula import (
     _format_result,
+    compile_formula,
     convert_metric_value,
     evaluate_formula,
+    evaluate_formula_series,
     get_referenced_metric_ids,
     validate_formula,
 )
@@ -446,3 +452,77 @@ class TestFormatResult:
 
     def test_unknown_type_returns_float(self) -> None:
         assert _format_result(3.14159, "unknown") == pytest.approx(3.1416)
+
+
+def _m(mid: int) -> dict:
+    return {"type": "metric", "id": mid}
+
+
+def _op(value: str) -> dict:
+    return {"type": "op", "value": value}
+
+
+def _num(value: float) -> dict:
+    return {"type": "number", "value": value}
+
+
+def _as_number(formatted: object) -> float | None:
+    """Formatted result back to a number, as ValueFetcher parsed it before series evaluation."""
+    if formatted is None:
+        return None
+    if isinstance(formatted, bool):
+        return 1.0 if formatted else 0.0
+    if isinstance(formatted, str) and ":" in formatted:
+        h, m = map(int, formatted.split(":"))
+        return float(h * 60 + m)
+    if isinstance(formatted, str):
+        h, m = formatted.replace("м", "").split("ч")
+        return float(int(h) * 60 + int(m))
+    return float(formatted)
+
+
+class TestCompiledFormula:
+    def test_cached_by_tokens(self) -> None:
+        tokens = [_m(1), _op("+"), _num(2)]
+        assert compile_formula(tokens) is compile_formula([dict(t) for t in tokens])
+        assert compile_formula(tokens) is not compile_formula([_m(1), _op("-"), _num(2)])
+
+    def test_invalid_structure_is_none(self) -> None:
+        tokens = [_m(1), _op("+")]
+        assert compile_formula(tokens)({1: 1.0}) is None
+        assert evaluate_formula_series(tokens, {1: np.array([1.0])}, 1, "float") == [None]
+
+    def test_trailing_tokens_ignored(self) -> None:
+        tokens = [_m(1), {"type": "rparen"}, _op("+"), _m(2)]
+        assert evaluate_formula(tokens, {1: 2.0}, "float") == 2.0
+
+
+class TestEvaluateFormulaSeries:
+    """Array evaluation equals evaluate_formula applied day by day."""
+
+    FORMULAS = [
+        [_m(1), _op("/"), _m(2)],
+        [_m(1), _op("+"), _m(2), _op("*"), _num(3)],
+        [{"type": "lparen"}, _m(1), _op("-"), _m(2), {"type": "rparen"}, _op(">"), _num(0)],
+        [_m(1), _op("<"), _m(3)],
+        [_num(10), _op("/"), {"type": "lparen"}, _m(1), _op("-"), _m(1), {"type": "rparen"}],
+        [_num(5)],
+    ]
+
+    @pytest.mark.parametrize("result_type", ["float", "int", "bool", "time", "duration"])
+    @pytest.mark.parametrize("formula_idx", range(len(FORMULAS)))
+    def test_matches_per_day(self, formula_idx: int, result_type: str) -> None:
+        tokens = self.FORMULAS[formula_idx]
+        rng = random.Random(formula_idx)
+        n = 60
+        days = [
+            {mid: (None if rng.random() < 0.2 else float(rng.choice([0, 0, rng.randint(-900, 2000)])))
+             for mid in (1, 2)}
+            for _ in range(n)
+        ]
+        columns = {
+            mid: np.array([math.nan if d[mid] is None else d[mid] for d in days])
+            for mid in (1, 2)
+        }
+        expected = [_as_number(evaluate_formula(tokens, d, result_type)) for d in days]
+        assert evaluate_formula_series(tokens, columns, n, result_type) == expected
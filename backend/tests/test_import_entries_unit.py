@@ -0,0 +1,130 @@
+"""Unit tests for the bulk entry import — CSV parsing into stage records (no DB)."""
+
+from __future__ import annotations
+
+import contextlib
+import csv
+import io
+import zipfile
+from datetime import date, datetime, time, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.repositories.import_repository import ENTRY_STAGE_COLUMNS
+from app.services import import_entries_service
+from app.services.import_entries_service import EntryImporter
+
+HEADER = ["date", "metric_slug", "value", "checkpoint_id", "checkpoint_label", "interval_id",
+          "is_free_checkpoint", "recorded_at", "is_free_interval", "time_start", "time_end"]
+SLUG_TO_ID = {"walk": 1, "steps": 2, "wake": 3, "mood": 4, "calc": 5, "color": 6}
+SLUG_TO_TYPE = {"walk": "bool", "steps": "number", "wake": "time", "mood": "scale",
+                "calc": "computed", "color": "enum"}
+
+
+def _zip(rows: list[dict]) -> zipfile.ZipFile:
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=HEADER)
+    writer.writeheader()
+    for r in rows:
+        writer.writerow(r)
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, "w") as zf:
+        zf.writestr("entries.csv", buf.getvalue())
+    return zipfile.ZipFile(data)
+
+
+def _importer(stage_result: tuple = (0, 0, [])) -> tuple[EntryImporter, MagicMock, list[tuple]]:
+    staged: list[tuple] = []
+    repo = MagicMock()
+    repo.user_id = 1
+    repo.transaction = MagicMock(side_effect=lambda: contextlib.nullcontext())
+    repo.get_checkpoint_lookup = AsyncMock(return_value={})
+    repo.get_global_checkpoint_label_lookup = AsyncMock(return_value={})
+    repo.get_enum_option_label_lookup = AsyncMock(return_value={6: {"red": 60, "blue": 61}})
+    repo.create_entry_stage = AsyncMock()
+    repo.stage_entries = AsyncMock(side_effect=lambda batch: staged.extend(batch))
+    repo.apply_entry_stage = AsyncMock(return_value=stage_result)
+    return EntryImporter(repo, MagicMock()), repo, staged
+
+
+class TestStageRecords:
+    """Rows become typed stage records; skips and parse errors stay per row."""
+
+    async def test_typed_records(self) -> None:
+        importer, _, staged = _importer((4, 0, []))
+        zf = _zip([
+            {"date": "2026-01-01", "metric_slug": "walk", "value": "true", "checkpoint_id": "7"},
+            {"date": "2026-01-01", "metric_slug": "steps", "value": "1200"},
+            {"date": "2026-01-01", "metric_slug": "wake", "value": '"07:30"'},
+            {"date": "2026-01-01", "metric_slug": "color", "value": '["red", "nope"]'},
+        ])
+        imported, skipped, errors = await importer.import_entries(zf, SLUG_TO_ID, SLUG_TO_TYPE)
+        assert (imported, skipped, errors) == (4, 0, [])
+        recs = [dict(zip(ENTRY_STAGE_COLUMNS, r)) for r in staged]
+        assert recs[0]["checkpoint_id"] == 7 and recs[0]["value_type"] == "bool" and recs[0]["v_bool"] is True
+        assert recs[1]["value_type"] == "number" and recs[1]["v_int"] == 1200
+        assert recs[2]["v_time"] == datetime(2026, 1, 1, 7, 30, tzinfo=timezone.utc)
+        assert recs[3]["v_enum"] == [60]
+        assert [r["row_num"] for r in recs] == [2, 3, 4, 5]
+
+    async def test_free_bindings(self) -> None:
+        importer, _, staged = _importer()
+        zf = _zip([
+            {"date": "2026-01-02", "metric_slug": "walk", "value": "true",
+             "is_free_checkpoint": "1", "recorded_at": "2026-01-02 09:15:00+00:00"},
+            {"date": "2026-01-02", "metric_slug": "steps", "value": "5",
+             "is_free_interval": "1", "time_start": "09:00", "time_end": "10:00"},
+        ])
+        await importer.import_entries(zf, SLUG_TO_ID, SLUG_TO_TYPE)
+        cp, iv = (dict(zip(ENTRY_STAGE_COLUMNS, r)) for r in staged)
+        assert cp["is_free_checkpoint"] and cp["recorded_at"] == datetime(2026, 1, 2, 9, 15, tzinfo=timezone.utc)
+        assert iv["is_free_interval"] and (iv["time_start"], iv["time_end"]) == (time(9), time(10))
+        assert iv["date"] == date(2026, 1, 2)
+
+    async def test_skips_and_errors(self) -> None:
+        importer, _, staged = _importer((1, 2, [(3, "checkpoint 9 not found")]))
+        zf = _zip([
+            {"date": "2026-01-01", "metric_slug": "unknown", "value": "1"},
+            {"date": "2026-01-01", "metric_slug": "walk", "value": "true", "checkpoint_id": "9"},
+            {"date": "2026-01-01", "metric_slug": "calc", "value": "1"},
+            {"date": "bad", "metric_slug": "walk", "value": "true"},
+            {"date": "2026-01-01", "metric_slug": "steps", "value": '"abc"'},
+            {"date": "2026-01-01", "metric_slug": "steps", "value": "3",
+             "is_free_interval": "1", "time_start": "10:00", "time_end": "09:00"},
+        ])
+        imported, skipped, errors = await importer.import_entries(zf, SLUG_TO_ID, SLUG_TO_TYPE)
+        assert len(staged) == 1
+        assert imported == 1
+        # unknown, computed, invalid number + 2 parse errors + 2 duplicates + 1 stage error
+        assert skipped == 8
+        assert errors[0] == "Row 3: checkpoint 9 not found"
+        assert errors[1].startswith("Row 5: ")
+        assert errors[2] == "Row 7: time_end must be after time_start"
+
+    async def test_constraint_violations_are_row_errors(self) -> None:
+        importer, _, staged = _importer((1, 0, []))
+        zf = _zip([
+            {"date": "2026-01-01", "metric_slug": "walk", "value": "true", "is_free_checkpoint": "1",
+             "is_free_interval": "1", "time_start": "09:00", "time_end": "10:00"},
+            {"date": "2026-01-01", "metric_slug": "steps", "value": str(2**31)},
+            {"date": "2026-01-01", "metric_slug": "mood", "value": str(-2**31 - 1)},
+            {"date": "2026-01-01", "metric_slug": "walk", "value": "true", "interval_id": str(2**31)},
+            {"date": "2026-01-01", "metric_slug": "steps", "value": str(2**31 - 1)},
+        ])
+        imported, skipped, errors = await importer.import_entries(zf, SLUG_TO_ID, SLUG_TO_TYPE)
+        assert [dict(zip(ENTRY_STAGE_COLUMNS, r))["v_int"] for r in staged] == [2**31 - 1]
+        assert (imported, skipped) == (1, 4)
+        assert errors == [
+            "Row 2: entry cannot be both a free checkpoint and a free interval",
+            f"Row 3: value {2**31} is out of range",
+            f"Row 4: value {-2**31 - 1} is out of range",
+            f"Row 5: interval_id {2**31} is out of range",
+        ]
+
+    async def test_copies_in_batches(self) -> None:
+        importer, repo, staged = _importer()
+        zf = _zip([{"date": f"2026-01-{d:02d}", "metric_slug": "walk", "value": "true"} for d in range(1, 6)])
+        with patch.object(import_entries_service, "IMPORT_BATCH_SIZE", 2):
+            await importer.import_entries(zf, SLUG_TO_ID, SLUG_TO_TYPE)
+        assert [len(c.args[0]) for c in repo.stage_entries.await_args_list] == [2, 2, 1]
+        assert len(staged) == 5
+        repo.apply_entry_stage.assert_awaited_once()
@@ -0,0 +1,130 @@
+"""Unit tests for PrefetchedAnalyticsRepository — in-memory fan-out of bulk rows (no DB)."""
+
+from __future__ import annotations
+
+from datetime import date, time
+from unittest.mock import AsyncMock, MagicMock
+
+from app.analytics.value_fetcher import ValueFetcher
+from app.repositories.prefetched_analytics_repository import PrefetchedAnalyticsRepository
+
+START = date(2026, 1, 1)
+END = date(2026, 1, 31)
+
+
+def _entry(metric_id: int, day: int, value: object, *, cp: int | None = None,
+           iv: int | None = None, free: bool = False) -> dict:
+    return {
+        "metric_id": metric_id, "checkpoint_id": cp, "interval_id": iv,
+        "is_free_interval": free, "date": date(2026, 1, day), "value": value,
+    }
+
+
+BOOL_ROWS = [
+    _entry(1, 1, True, cp=10), _entry(1, 1, False, cp=11),
+    _entry(1, 2, False, cp=10), _entry(2, 2, True),
+]
+NUMBER_ROWS = [
+    _entry(3, 1, 5, iv=20), _entry(3, 1, 7, iv=21),
+    _entry(3, 3, 2, free=True), _entry(4, 4, 9),
+]
+ENUM_ROWS = [
+    {"metric_id": 5, "checkpoint_id": 10, "interval_id": None, "date": date(2026, 1, 1), "selected_option_ids": [100]},
+    {"metric_id": 5, "checkpoint_id": 11, "interval_id": None, "date": date(2026, 1, 1), "selected_option_ids": [101]},
+]
+NOTE_ROWS = [{"metric_id": 6, "date": date(2026, 1, 2), "cnt": 3}]
+FREE_TIME_ROWS = [
+    {"metric_id": 3, "date": date(2026, 1, 3), "time_start": time(23, 0), "time_end": time(1, 0)},
+]
+
+
+def _conn() -> MagicMock:
+    async def fetch(query: str, *args: object) -> list:
+        if "values_bool" in query:
+            return BOOL_ROWS
+        if "values_number" in query:
+            return NUMBER_ROWS
+        if "values_enum" in query:
+            return ENUM_ROWS
+        if "FROM notes" in query:
+            return NOTE_ROWS
+        if "time_start" in query:
+            return FREE_TIME_ROWS
+        if "scale_config" in query:
+            return []
+        raise AssertionError(f"unexpected query: {query}")
+
+    async def cursor(query: str, *args: object) -> MagicMock:
+        rows = list(await fetch(query, *args))
+
+        async def fetch_batch(n: int) -> list:
+            batch = rows[:n]
+            del rows[:n]
+            return batch
+
+        return MagicMock(fetch=AsyncMock(side_effect=fetch_batch))
+
+    conn = MagicMock()
+    conn.fetch = AsyncMock(side_effect=fetch)
+    conn.cursor = AsyncMock(side_effect=cursor)
+    conn.is_in_transaction = MagicMock(return_value=True)
+    return conn
+
+
+def _fetcher() -> tuple[ValueFetcher, MagicMock]:
+    conn = _conn()
+    return ValueFetcher(PrefetchedAnalyticsRepository(conn, 1, START, END)), conn
+
+
+class TestFanOut:
+    """Per-source results come from in-memory filtering of the bulk rows."""
+
+    async def test_checkpoint_split(self) -> None:
+        fetcher, _ = _fetcher()
+        agg = await fetcher.values_by_date_for_checkpoint(1, "bool", START, END, 1)
+        cp10 = await fetcher.values_by_date_for_checkpoint(1, "bool", START, END, 1, checkpoint_id=10)
+        cp11 = await fetcher.values_by_date_for_checkpoint(1, "bool", START, END, 1, checkpoint_id=11)
+        assert agg == {"2026-01-01": 1.0, "2026-01-02": 0.0}
+        assert cp10 == {"2026-01-01": 1.0, "2026-01-02": 0.0}
+        assert cp11 == {"2026-01-01": 0.0}
+
+    async def test_interval_and_free_split(self) -> None:
+        fetcher, _ = _fetcher()
+        iv21 = await fetcher.values_by_date_for_interval(3, "number", START, END, 1, interval_id=21)
+        free = await fetcher.values_list_by_date(3, "number", START, END, free_interval_only=True)
+        assert iv21 == {"2026-01-01": 7.0}
+        assert free == {"2026-01-03": [2.0]}
+
+    async def test_enum_options(self) -> None:
+        fetcher, _ = _fetcher()
+        opt = await fetcher.values_by_date_for_enum_option(5, 100, START, END, 1, checkpoint_id=11)
+        assert opt == {"2026-01-01": 0.0}
+
+    async def test_notes_and_free_times(self) -> None:
+        fetcher, _ = _fetcher()
+        assert await fetcher.fetch_note_counts(6, 1, START, END) == {"2026-01-02": 3.0}
+        assert await fetcher.time_ranges_by_date(3, START, END) == {"2026-01-03": [120.0]}
+
+    async def test_other_metric_empty(self) -> None:
+        fetcher, _ = _fetcher()
+        assert await fetcher.values_by_date_for_checkpoint(99, "bool", START, END, 1) == {}
+
+
+class TestQueryCount:
+    """Each table is loaded once per report window, other windows hit the DB."""
+
+    async def test_one_query_per_table(self) -> None:
+        fetcher, conn = _fetcher()
+        for cp in (None, 10, 11):
+            await fetcher.values_by_date_for_checkpoint(1, "bool", START, END, 1, checkpoint_id=cp)
+        await fetcher.values_by_date_for_checkpoint(2, "bool", START, END, 1)
+        await fetcher.values_by_date_for_interval(3, "number", START, END, 1, interval_id=20)
+        await fetcher.values_list_by_date(3, "number", START, END)
+        assert conn.cursor.await_count == 2
+
+    async def test_other_window_falls_through(self) -> None:
+        fetcher, conn = _fetcher()
+        await fetcher.values_by_date_for_checkpoint(1, "bool", START, date(2026, 1, 10), 1)
+        query, *args = conn.fetch.await_args.args
+        assert "e.metric_id = $1" in query
+        assert args[0] == 1
@@ -0,0 +1,135 @@
+"""Unit tests for the correlation report queue — dispatch and cancellation (no DB)."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.analytics.correlation_engine import CorrelationEngine
+from app.correlation_config import JobsConfig
+from app.domain.exceptions import ReportCancelledError
+from app.repositories.correlation_repository import CorrelationRepository
+from app.services import report_queue as rq
+
+
+def _engine(status: str | None, attempt: int = 2) -> tuple[CorrelationEngine, MagicMock]:
+    repo = MagicMock(spec=CorrelationRepository)
+    repo.conn = MagicMock()
+    repo.user_id = 1
+    repo.update_report_progress = AsyncMock(return_value=status)
+    return CorrelationEngine(repo, 7, date(2026, 1, 1), date(2026, 1, 31), attempt=attempt), repo
+
+
+class TestReportProgress:
+    """Engine stores the last QueryTimer mark and stops once the report is cancelled."""
+
+    async def test_records_last_mark(self) -> None:
+        engine, repo = _engine("running")
+        engine._qt.mark("load_metrics")
+        await engine._report_progress(0.05)
+        repo.update_report_progress.assert_awaited_once_with(7, 2, "load_metrics", 0.05)
+
+    async def test_cancelled_raises(self) -> None:
+        engine, _ = _engine("cancelled")
+        with pytest.raises(ReportCancelledError):
+            await engine._report_progress(0.5)
+
+    async def test_cancelling_raises(self) -> None:
+        engine, _ = _engine("cancelling")
+        with pytest.raises(ReportCancelledError):
+            await engine._report_progress(0.5)
+
+    async def test_deleted_or_requeued_raises(self) -> None:
+        engine, _ = _engine(None)
+        with pytest.raises(ReportCancelledError):
+            await engine._report_progress(0.5)
+
+    async def test_lost_claim_stops_before_finalize(self) -> None:
+        engine, repo = _engine("running")
+        repo.insert_pairs = AsyncMock(return_value=False)
+        with pytest.raises(ReportCancelledError):
+            await engine._insert_pairs([])
+        repo.insert_pairs.assert_awaited_once_with(7, 2, [])
+
+
+class TestRunReport:
+    """A stopped run only deletes its own cancelled row; failures are fenced by attempt."""
+
+    @staticmethod
+    def _pool() -> MagicMock:
+        pool = MagicMock()
+        pool.acquire = MagicMock(side_effect=lambda: contextlib.nullcontext(MagicMock()))
+        return pool
+
+    async def test_cancelled_run_deletes_own_attempt(self) -> None:
+        repo = MagicMock()
+        repo.delete_cancelled_report = AsyncMock()
+        engine = MagicMock(run=AsyncMock(side_effect=ReportCancelledError(5)))
+        with patch.object(rq._db_module, "pool", self._pool()), \
+                patch.object(rq, "CorrelationRepository", return_value=repo), \
+                patch("app.analytics.correlation_engine.CorrelationEngine", return_value=engine) as cls:
+            await rq.run_correlation_report(5, 2, date(2026, 1, 1), date(2026, 1, 31), attempt=3)
+        assert cls.call_args.kwargs["attempt"] == 3
+        repo.delete_cancelled_report.assert_awaited_once_with(5, 3)
+
+    async def test_error_marks_own_attempt(self) -> None:
+        repo = MagicMock()
+        repo.mark_report_error = AsyncMock()
+        engine = MagicMock(run=AsyncMock(side_effect=RuntimeError("boom")))
+        with patch.object(rq._db_module, "pool", self._pool()), \
+                patch.object(rq, "CorrelationRepository", return_value=repo), \
+                patch("app.analytics.correlation_engine.CorrelationEngine", return_value=engine):
+            await rq.run_correlation_report(5, 2, date(2026, 1, 1), date(2026, 1, 31), attempt=3)
+        repo.mark_report_error.assert_awaited_once_with(5, 3)
+
+
+class TestDispatch:
+    """Claimed rows become local tasks; a finished job triggers another pass."""
+
+    async def test_claims_with_caps_and_runs(self) -> None:
+        queue = rq.ReportQueue(JobsConfig(max_concurrent=3, max_per_user=1, heartbeat_seconds=60))
+        claimed = [{"id": 5, "user_id": 2, "period_start": date(2026, 1, 1), "period_end": date(2026, 1, 31),
+                    "attempt": 4}]
+        repo = MagicMock()
+        repo.requeue_stale = AsyncMock(return_value=0)
+        repo.claim_reports = AsyncMock(side_effect=[claimed, []])
+        run = AsyncMock()
+        pool = MagicMock()
+        pool.acquire = MagicMock(side_effect=lambda: contextlib.nullcontext(MagicMock()))
+        with patch.object(rq._db_module, "pool", pool), \
+                patch.object(rq, "ReportQueueRepository", return_value=repo), \
+                patch.object(rq, "run_correlation_report", run):
+            queue.kick()
+            for _ in range(10):
+                await asyncio.sleep(0)
+            await queue.stop()
+
+        repo.claim_reports.assert_any_await(3, 1)
+        run.assert_awaited_once_with(5, 2, date(2026, 1, 1), date(2026, 1, 31), attempt=4)
+        assert repo.claim_reports.await_count == 2
+
+    async def test_kick_coalesces(self) -> None:
+        queue = rq.ReportQueue(JobsConfig(heartbeat_seconds=60))
+        gate = asyncio.Event()
+        calls = 0
+
+        async def claim() -> None:
+            nonlocal calls
+            calls += 1
+            await gate.wait()
+
+        with patch.object(queue, "_claim_and_start", side_effect=claim):
+            queue.kick()
+            await asyncio.sleep(0)
+            queue.kick()
+            queue.kick()
+            gate.set()
+            for _ in range(5):
+                await asyncio.sleep(0)
+            await queue.stop()
+        assert calls == 2
+
@@ -0,0 +1,62 @@
+"""Unit tests for the materialized correlation report summary (no DB)."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, MagicMock
+
+from app.correlation_config import ThresholdsConfig
+from app.repositories.analytics_repository import AnalyticsRepository
+
+
+def _repo(summary_row: object = None, old_status: str | None = None) -> tuple[AnalyticsRepository, MagicMock]:
+    conn = MagicMock()
+    conn.fetchrow = AsyncMock(side_effect=[summary_row, {"total": 3}])
+    conn.fetchval = AsyncMock(return_value=old_status)
+    conn.execute = AsyncMock()
+    conn.transaction = MagicMock(return_value=MagicMock(__aenter__=AsyncMock(), __aexit__=AsyncMock(return_value=None)))
+    return AnalyticsRepository(conn, 1), conn
+
+
+class TestSummaryRead:
+    """Stored summary is read as is; a missing one is rebuilt by a single scan."""
+
+    async def test_stored_row_no_scan(self) -> None:
+        repo, conn = _repo(summary_row={"total": 5})
+        row = await repo.get_report_pair_counts(9, ThresholdsConfig(strong_correlation=0.8))
+        assert row == {"total": 5}
+        assert conn.fetchrow.await_count == 1
+        _, report_id, strong, moderate = conn.fetchrow.await_args.args
+        assert (report_id, strong, moderate) == (9, 0.8, 0.3)
+
+    async def test_missing_row_rebuilt(self) -> None:
+        repo, conn = _repo(summary_row=None)
+        row = await repo.get_report_pair_counts(9)
+        assert row == {"total": 3}
+        query = conn.fetchrow.await_args.args[0]
+        assert "INSERT INTO correlation_report_summary" in query
+
+
+class TestStatusCounters:
+    """Status changes shift favorite/archived counters by the right delta."""
+
+    async def test_new_favorite(self) -> None:
+        repo, conn = _repo(old_status=None)
+        await repo.set_pair_status("metric:1", "metric:2", 0, "favorite")
+        update = conn.execute.await_args_list[-1].args
+        assert "UPDATE correlation_report_summary" in update[0]
+        assert update[-2:] == (1, 0)
+
+    async def test_favorite_to_archived(self) -> None:
+        repo, conn = _repo(old_status="favorite")
+        await repo.set_pair_status("metric:1", "metric:2", 0, "archived")
+        assert conn.execute.await_args_list[-1].args[-2:] == (-1, 1)
+
+    async def test_same_status_skips_update(self) -> None:
+        repo, conn = _repo(old_status="archived")
+        await repo.set_pair_status("metric:1", "metric:2", 0, "archived")
+        assert conn.execute.await_count == 1
+
+    async def test_remove(self) -> None:
+        repo, conn = _repo(old_status="archived")
+        await repo.remove_pair_status("metric:1", "metric:2", 0)
+        assert conn.execute.await_args_list[-1].args[-2:] == (0, -1)
@@ -0,0 +1,74 @@
+"""Unit tests for BaseRepository cursor streaming and the streamed bool streak (no DB)."""
+
+from __future__ import annotations
+
+import contextlib
+from unittest.mock import AsyncMock, MagicMock
+
+from app.repositories.analytics_repository import AnalyticsRepository
+from app.repositories.base import BaseRepository
+from app.services.analytics_service import AnalyticsService
+
+
+def _conn(rows: list, *, in_transaction: bool) -> MagicMock:
+    async def cursor(query: str, *args: object) -> MagicMock:
+        pending = list(rows)
+
+        async def fetch_batch(n: int) -> list:
+            batch = pending[:n]
+            del pending[:n]
+            return batch
+
+        return MagicMock(fetch=AsyncMock(side_effect=fetch_batch))
+
+    conn = MagicMock()
+    conn.cursor = AsyncMock(side_effect=cursor)
+    conn.is_in_transaction = MagicMock(return_value=in_transaction)
+    conn.transaction = MagicMock(side_effect=lambda **kw: contextlib.nullcontext())
+    return conn
+
+
+class TestStream:
+    """Records arrive in cursor batches; a read-only transaction is opened only when needed."""
+
+    async def test_batches(self) -> None:
+        conn = _conn(list(range(7)), in_transaction=True)
+        repo = BaseRepository(conn, 1)
+        batches = [b async for b in repo._stream_batches("SELECT 1", 1, batch_size=3)]
+        assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+        conn.cursor.assert_awaited_once_with("SELECT 1", 1)
+        conn.transaction.assert_not_called()
+
+    async def test_records_and_own_transaction(self) -> None:
+        conn = _conn(list(range(5)), in_transaction=False)
+        repo = BaseRepository(conn, 1)
+        assert [r async for r in repo._stream("SELECT 1", batch_size=2)] == [0, 1, 2, 3, 4]
+        conn.transaction.assert_called_once_with(readonly=True)
+
+    async def test_empty(self) -> None:
+        repo = BaseRepository(_conn([], in_transaction=True), 1)
+        assert [r async for r in repo._stream("SELECT 1")] == []
+
+
+class TestBoolStreak:
+    """Current and longest streak come from one pass over days, newest first."""
+
+    async def _stats(self, days: list[bool | None]) -> dict:
+        conn = _conn([{"day_value": v} for v in days], in_transaction=True)
+        repo = AnalyticsRepository(conn, 1)
+        repo.get_entries_with_values = AsyncMock(return_value=[])
+        service = AnalyticsService(repo, conn)
+        qt = MagicMock()
+        return await service._numeric_stats({}, "bool", 1, None, None, 30, qt)
+
+    async def test_streaks(self) -> None:
+        stats = await self._stats([True, True, False, True, True, True, None, True])
+        assert (stats["current_streak"], stats["longest_streak"]) == (2, 3)
+
+    async def test_all_true(self) -> None:
+        stats = await self._stats([True] * 4)
+        assert (stats["current_streak"], stats["longest_streak"]) == (4, 4)
+
+    async def test_no_days(self) -> None:
+        stats = await self._stats([])
+        assert (stats["current_streak"], stats["longest_streak"]) == (0, 0)
@@ -1,8 +1,10 @@
-"""Unit tests for TimeSeriesTransform.checkpoint_agg and shift_dates."""
+"""Unit tests for TimeSeriesTransform.checkpoint_agg, shift_dates, rolling and DaySeries."""
 
 import unittest
+from datetime import date as date_type, timedelta
+from statistics import median, stdev
 
-from app.analytics.time_series import TimeSeriesTransform
+from app.analytics.time_series import DaySeries, TimeSeriesTransform, align
 
 checkpoint_agg = TimeSeriesTransform.checkpoint_agg
 shift_dates = TimeSeriesTransform.shift_dates
@@ -227,3 +229,123 @@ class TestShiftDatesValuesPreserved(unittest.TestCase):
 
 if __name__ == "__main__":
     unittest.main()
+
+
+# ── DaySeries ────────────────────────────────────────────────────────
+
+
+class TestDaySeriesMapping(unittest.TestCase):
+    """DaySeries reads like the ISO-keyed dict it was built from."""
+
+    def setUp(self) -> None:
+        self.raw = {"2025-01-03": 3.0, "2025-01-01": 1.0, "2025-01-06": 6.0}
+        self.ds = DaySeries.from_dict(self.raw)
+
+    def test_equal_to_dict(self) -> None:
+        self.assertEqual(self.ds, self.raw)
+        self.assertEqual(self.ds.to_dict(), self.raw)
+
+    def test_iterates_in_date_order(self) -> None:
+        self.assertEqual(list(self.ds), ["2025-01-01", "2025-01-03", "2025-01-06"])
+        self.assertEqual(self.ds.values(), [1.0, 3.0, 6.0])
+
+    def test_lookup_and_membership(self) -> None:
+        self.assertEqual(len(self.ds), 3)
+        self.assertEqual(self.ds["2025-01-03"], 3.0)
+        self.assertIn("2025-01-06", self.ds)
+        self.assertNotIn("2025-01-02", self.ds)
+        self.assertIsNone(self.ds.get("2025-01-02"))
+
+    def test_empty(self) -> None:
+        ds = DaySeries.from_dict({})
+        self.assertEqual(len(ds), 0)
+        self.assertEqual(ds, {})
+
+
+class TestDaySeriesShift(unittest.TestCase):
+    """shift() matches shift_dates on a dict and shares the buffers."""
+
+    def test_matches_dict_shift(self) -> None:
+        raw = {"2025-12-30": 1.0, "2025-12-31": 2.0, "2026-01-02": 4.0}
+        ds = DaySeries.from_dict(raw)
+        for days in (-3, 0, 1, 7):
+            self.assertEqual(ds.shift(days), shift_dates(raw, days))
+
+    def test_shift_dates_keeps_dayseries(self) -> None:
+        ds = DaySeries.from_dict({"2025-01-01": 1.0})
+        shifted = shift_dates(ds, 1)
+        self.assertIsInstance(shifted, DaySeries)
+        self.assertIs(shifted.data, ds.data)
+
+
+class TestDaySeriesBytes(unittest.TestCase):
+    """to_bytes()/from_bytes() round-trip keeps days, gaps and values."""
+
+    def test_round_trip(self) -> None:
+        ds = DaySeries.from_dict({"2025-12-30": 1.5, "2026-01-02": -4.0, "2026-01-03": 0.0})
+        restored = DaySeries.from_bytes(ds.to_bytes())
+        self.assertEqual(restored, ds)
+        self.assertEqual(restored.start, ds.start)
+        self.assertNotIn("2025-12-31", restored)
+
+    def test_empty(self) -> None:
+        self.assertEqual(DaySeries.from_bytes(DaySeries.from_dict({}).to_bytes()), {})
+
+
+class TestRolling(unittest.TestCase):
+    """Sliding-window stats equal a direct per-day computation over full windows."""
+
+    DATA = {
+        "2025-01-01": 1.0, "2025-01-02": 4.0, "2025-01-03": 2.0, "2025-01-04": 8.0,
+        "2025-01-06": 5.0, "2025-01-07": 3.0, "2025-01-08": 9.0, "2025-01-09": 6.0,
+    }
+
+    def _direct(self, window: int, fn) -> dict[str, float]:
+        out = {}
+        for d in sorted(self.DATA):
+            day = date_type.fromisoformat(d)
+            vals = [self.DATA.get(str(day - timedelta(days=k))) for k in range(window)]
+            if None not in vals:
+                out[d] = fn(vals)
+        return out
+
+    def test_rolling_avg(self) -> None:
+        self.assertEqual(TimeSeriesTransform.rolling_avg(self.DATA, 3), {
+            "2025-01-03": 7 / 3, "2025-01-04": 14 / 3, "2025-01-08": 17 / 3, "2025-01-09": 6.0,
+        })
+
+    def test_many_windows_one_call(self) -> None:
+        result = TimeSeriesTransform.rolling(self.DATA, (1, 2, 3, 4, 30))
+        for w in (1, 2, 3, 4):
+            expected = self._direct(w, lambda v: sum(v) / len(v))
+            self.assertEqual(result[w].keys(), expected.keys())
+            for d, v in expected.items():
+                self.assertAlmostEqual(result[w][d], v, places=12)
+        self.assertEqual(result[30], {})
+
+    def test_std_and_median(self) -> None:
+        std = TimeSeriesTransform.rolling(self.DATA, (3,), stat="std")[3]
+        med = TimeSeriesTransform.rolling(self.DATA, (3,), stat="median")[3]
+        for d, v in self._direct(3, stdev).items():
+            self.assertAlmostEqual(std[d], v, places=12)
+        self.assertEqual(med, self._direct(3, median))
+        self.assertEqual(TimeSeriesTransform.rolling(self.DATA, (1,), stat="std"), {1: {}})
+
+    def test_empty(self) -> None:
+        self.assertEqual(TimeSeriesTransform.rolling({}, (3, 7)), {3: {}, 7: {}})
+
+
+class TestAlign(unittest.TestCase):
+    """align() gives common-day values in date order for dicts and DaySeries alike."""
+
+    def test_dayseries_matches_dict(self) -> None:
+        a = {"2025-01-01": 1.0, "2025-01-02": 2.0, "2025-01-04": 4.0, "2025-01-05": 5.0}
+        b = {"2025-01-02": 20.0, "2025-01-03": 30.0, "2025-01-05": 50.0, "2025-01-09": 90.0}
+        expected = ([2.0, 5.0], [20.0, 50.0])
+        self.assertEqual(align(a, b), expected)
+        self.assertEqual(align(DaySeries.from_dict(a), DaySeries.from_dict(b)), expected)
+
+    def test_disjoint(self) -> None:
+        a = DaySeries.from_dict({"2025-01-01": 1.0})
+        b = DaySeries.from_dict({"2025-02-01": 1.0})
+        self.assertEqual(align(a, b), ([], []))
@@ -0,0 +1,113 @@
+"""Unit tests for AnalyticsService.trends_batch — shared bulk loads per window (no DB)."""
+
+from __future__ import annotations
+
+import json
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+from app.repositories.analytics_repository import AnalyticsRepository
+from app.services.analytics_service import AnalyticsService
+
+
+def _metric(mid: int, mtype: str, **extra: object) -> dict:
+    return {"id": mid, "name": f"m{mid}", "type": mtype, "private": False,
+            "formula": None, "result_type": None, "ic_value_type": None, **extra}
+
+
+def _entry(metric_id: int, day: int, value: object, cp: int | None = None) -> dict:
+    return {"metric_id": metric_id, "checkpoint_id": cp, "interval_id": None,
+            "is_free_interval": False, "date": date(2026, 1, day), "value": value}
+
+
+SUM_FORMULA = json.dumps([
+    {"type": "metric", "id": 3}, {"type": "op", "value": "+"}, {"type": "metric", "id": 4},
+])
+METRICS = {
+    1: _metric(1, "bool"),
+    3: _metric(3, "number"),
+    4: _metric(4, "number"),
+    5: _metric(5, "enum"),
+    6: _metric(6, "text"),
+    7: _metric(7, "computed", formula=SUM_FORMULA, result_type="float"),
+    8: _metric(8, "computed", formula=SUM_FORMULA, result_type="int"),
+    9: _metric(9, "number", private=True),
+}
+BOOL_ROWS = [_entry(1, 1, True, cp=10), _entry(1, 2, False, cp=11)]
+NUMBER_ROWS = [_entry(3, 1, 5), _entry(3, 1, 7), _entry(4, 1, 1), _entry(4, 2, 2)]
+ENUM_ROWS = [{"metric_id": 5, "checkpoint_id": None, "interval_id": None,
+              "date": date(2026, 1, 3), "selected_option_ids": [100]}]
+OPTION_ROWS = [{"metric_id": 5, "id": 100, "label": "a", "sort_order": 0},
+               {"metric_id": 5, "id": 101, "label": "b", "sort_order": 1}]
+NOTE_ROWS = [{"metric_id": 6, "date": date(2026, 1, 5), "cnt": 1},
+             {"metric_id": 6, "date": date(2026, 1, 2), "cnt": 2}]
+
+
+def _service() -> tuple[AnalyticsService, MagicMock]:
+    async def fetch(query: str, *args: object) -> list:
+        if "computed_config" in query:
+            return [METRICS[mid] for mid in args[0] if mid in METRICS]
+        if "values_bool" in query:
+            return BOOL_ROWS
+        if "values_number" in query:
+            return NUMBER_ROWS
+        if "values_enum" in query:
+            return ENUM_ROWS
+        if "enum_options" in query:
+            return OPTION_ROWS
+        if "FROM notes" in query:
+            return NOTE_ROWS
+        if "metric_checkpoints" in query:
+            return [{"metric_id": 1}]
+        if "scale_config" in query:
+            return []
+        if "SELECT id, type FROM metric_definitions" in query:
+            return [{"id": m["id"], "type": m["type"]} for m in METRICS.values()]
+        raise AssertionError(f"unexpected query: {query}")
+
+    async def cursor(query: str, *args: object) -> MagicMock:
+        rows = list(await fetch(query, *args))
+
+        async def fetch_batch(n: int) -> list:
+            batch = rows[:n]
+            del rows[:n]
+            return batch
+
+        return MagicMock(fetch=AsyncMock(side_effect=fetch_batch))
+
+    conn = MagicMock()
+    conn.fetch = AsyncMock(side_effect=fetch)
+    conn.cursor = AsyncMock(side_effect=cursor)
+    conn.is_in_transaction = MagicMock(return_value=True)
+    return AnalyticsService(AnalyticsRepository(conn, 1), conn), conn
+
+
+class TestTrendsBatch:
+    """Every table is read once for the whole batch; per-metric output keeps the single-metric shape."""
+
+    async def test_one_query_per_table(self) -> None:
+        service, conn = _service()
+        results = await service.trends_batch(list(METRICS), "2026-01-01", "2026-01-31", privacy_mode=True)
+        assert len(results) == len(METRICS)
+        # configs, bool, number, enum values, enum options, notes, checkpoints, metric types
+        assert conn.fetch.await_count + conn.cursor.await_count == 8
+
+    async def test_results(self) -> None:
+        service, _ = _service()
+        results = await service.trends_batch([1, 5, 6, 7, 8, 9, 42], "2026-01-01", "2026-01-31", privacy_mode=True)
+        by_id = {r.get("metric_id"): r for r in results}
+        assert by_id[1]["metric_name"] == "m1 (хоть раз)"
+        assert by_id[1]["points"] == [{"date": "2026-01-01", "value": 1.0}, {"date": "2026-01-02", "value": 0.0}]
+        assert by_id[5]["options"] == [{"id": 100, "label": "a"}, {"id": 101, "label": "b"}]
+        assert by_id[5]["option_series"] == {"a": [{"date": "2026-01-03", "value": 1.0}], "b": [{"date": "2026-01-03", "value": 0.0}]}
+        assert [p["date"] for p in by_id[6]["points"]] == ["2026-01-02", "2026-01-05"]
+        assert by_id[7]["points"] == [{"date": "2026-01-01", "value": 7.0}]
+        assert by_id[8]["points"] == by_id[7]["points"]
+        assert by_id[9]["blocked"] is True
+        assert results[-1] == {"error": "Metric not found"}
+
+    async def test_empty(self) -> None:
+        service, conn = _service()
+        assert await service.trends_batch([], "2026-01-01", "2026-01-31", privacy_mode=False) == []
+        conn.fetch.assert_not_awaited()
+        conn.cursor.assert_not_awaited()
@@ -0,0 +1,70 @@
+"""Unit tests for ValueFetcher's per-repository series cache (no DB)."""
+
+from __future__ import annotations
+
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+from app.analytics.value_fetcher import ValueFetcher
+from app.repositories.analytics_repository import AnalyticsRepository
+
+START = date(2026, 1, 1)
+END = date(2026, 1, 31)
+ROWS = [{"date": date(2026, 1, 1), "value": 4}, {"date": date(2026, 1, 2), "value": 2}]
+
+
+def _repo() -> tuple[AnalyticsRepository, MagicMock]:
+    async def fetch(query: str, *args: object) -> list:
+        if "SELECT id, type FROM metric_definitions" in query:
+            return [{"id": 1, "type": "number"}, {"id": 2, "type": "number"}]
+        return ROWS
+
+    conn = MagicMock()
+    conn.fetch = AsyncMock(side_effect=fetch)
+    return AnalyticsRepository(conn, 1), conn
+
+
+class TestSeriesCache:
+    """Whole-metric series are built once per repository and key."""
+
+    async def test_shared_across_fetchers(self) -> None:
+        repo, conn = _repo()
+        first = await ValueFetcher(repo).values_by_date_for_checkpoint(1, "number", START, END, 1)
+        second = await ValueFetcher(repo).values_by_date_for_checkpoint(1, "number", START, END, 1)
+        assert first == second == {"2026-01-01": 4.0, "2026-01-02": 2.0}
+        assert conn.fetch.await_count == 1
+
+    async def test_copies_are_independent(self) -> None:
+        repo, _ = _repo()
+        fetcher = ValueFetcher(repo)
+        series = await fetcher.raw_values_by_date(1, "number", START, END, 1)
+        series["2026-01-01"] = -1.0
+        assert (await fetcher.raw_values_by_date(1, "number", START, END, 1))["2026-01-01"] == 4.0
+
+    async def test_keyed_by_normalization_and_window(self) -> None:
+        repo, conn = _repo()
+        fetcher = ValueFetcher(repo)
+        await fetcher.values_by_date_for_checkpoint(1, "number", START, END, 1)
+        await fetcher.raw_values_by_date(1, "number", START, END, 1)
+        await fetcher.raw_values_by_date(1, "number", START, date(2026, 1, 10), 1)
+        assert conn.fetch.await_count == 3
+
+    async def test_checkpoint_filter_not_cached(self) -> None:
+        repo, conn = _repo()
+        fetcher = ValueFetcher(repo)
+        for _ in range(2):
+            await fetcher.values_by_date_for_checkpoint(1, "number", START, END, 1, checkpoint_id=5)
+        assert conn.fetch.await_count == 2
+        assert repo.series_cache == {}
+
+    async def test_computed_inputs_reuse_series(self) -> None:
+        repo, conn = _repo()
+        fetcher = ValueFetcher(repo)
+        plus = [{"type": "metric", "id": 1}, {"type": "op", "value": "+"}, {"type": "metric", "id": 2}]
+        times = [{"type": "metric", "id": 1}, {"type": "op", "value": "*"}, {"type": "metric", "id": 2}]
+        assert await fetcher.values_by_date_for_computed(plus, "float", [1, 2], START, END, 1) == {
+            "2026-01-01": 8.0, "2026-01-02": 4.0,
+        }
+        await fetcher.values_by_date_for_computed(times, "float", [1, 2], START, END, 1)
+        # two type lookups + one entries query per referenced metric
+        assert conn.fetch.await_count == 4
@@ -214,10 +214,12 @@ const api = {
     getCorrelationReport() {
         return this.request('GET', '/api/analytics/correlation-report');
     },
-    getCorrelationPairs(reportId, { category = 'all', offset = 0, limit = 50, metric_ids = null, status = null } = {}) {
+    getCorrelationPairs(reportId, { category = 'all', offset = 0, limit = 50, metric_ids = null, status = null, cursor = null, include_total = true } = {}) {
         const params = new URLSearchParams({ category, offset, limit });
         if (metric_ids) params.set('metric_ids', metric_ids);
         if (status) params.set('status', status);
+        if (cursor) params.set('cursor', cursor);
+        if (!include_total) params.set('include_total', 'false');
         return this.request('GET', `/api/analytics/correlation-report/${reportId}/pairs?${params}`);
     },
     getCorrelationPairChart(pairId) {
@@ -3522,18 +3522,18 @@ function _renderReportBody(report, bodyEl, statusFilter = null) {
         for (const cat of ['sig_strong', 'sig_medium', 'sig_weak']) {
             if (c[cat] > 0) {
                 pendingLoads++;
-                loadCategoryPairs(report.id, cat, document.getElementById(`corr-cat-${cat}`), report, 0, statusFilter,
+                loadCategoryPairs(report.id, cat, document.getElementById(`corr-cat-${cat}`), report, null, statusFilter,
                     (total) => onCatDone('corr-section-sig', `corr-subsec-${cat}`, `corr-cnt-${cat}`, total));
             }
         }
         if (c.maybe > 0) {
             pendingLoads++;
-            loadCategoryPairs(report.id, 'maybe', document.getElementById('corr-cat-maybe'), report, 0, statusFilter,
+            loadCategoryPairs(report.id, 'maybe', document.getElementById('corr-cat-maybe'), report, null, statusFilter,
                 (total) => onCatDone('corr-section-maybe', null, 'corr-cnt-maybe', total));
         }
         if (c.insig > 0) {
             pendingLoads++;
-            loadCategoryPairs(report.id, 'insig', document.getElementById('corr-cat-insig'), report, 0, statusFilter,
+            loadCategoryPairs(report.id, 'insig', document.getElementById('corr-cat-insig'), report, null, statusFilter,
                 (total) => onCatDone('corr-section-insig', null, 'corr-cnt-insig', total));
         }
 
@@ -3590,7 +3590,7 @@ function _renderReportBody(report, bodyEl, statusFilter = null) {
     const categoriesToLoad = ['sig_strong', 'sig_medium', 'sig_weak'].filter(cat => c[cat] > 0);
     for (const cat of categoriesToLoad) {
         const el = document.getElementById(`corr-cat-${cat}`);
-        if (el) loadCategoryPairs(report.id, cat, el, report, 0, null);
+        if (el) loadCategoryPairs(report.id, cat, el, report, null, null);
     }
 
     const maybeDetails = document.getElementById('corr-maybe-details');
@@ -3600,7 +3600,7 @@ function _renderReportBody(report, bodyEl, statusFilter = null) {
             const el = document.getElementById('corr-cat-maybe');
             if (el && !el.dataset.loaded) {
                 el.dataset.loaded = '1';
-                loadCategoryPairs(report.id, 'maybe', el, report, 0, null);
+                loadCategoryPairs(report.id, 'maybe', el, report, null, null);
             }
         });
     }
@@ -3612,25 +3612,26 @@ function _renderReportBody(report, bodyEl, statusFilter = null) {
             const el = document.getElementById('corr-cat-insig');
             if (el && !el.dataset.loaded) {
                 el.dataset.loaded = '1';
-                loadCategoryPairs(report.id, 'insig', el, report, 0, null);
+                loadCategoryPairs(report.id, 'insig', el, report, null, null);
             }
         });
     }
 }
 
-async function loadCategoryPairs(reportId, category, containerEl, report, offset, statusFilter = null, onDone = null) {
+async function loadCategoryPairs(reportId, category, containerEl, report, cursor, statusFilter = null, onDone = null) {
     const loader = document.createElement('div');
     loader.className = 'corr-loader';
     loader.innerHTML = '<div class="corr-loader-spinner"></div>';
     containerEl.appendChild(loader);
 
     try {
-        const opts = { category, offset };
+        // First page carries the total for the header; next pages seek by cursor without COUNT
+        const opts = cursor ? { category, cursor, include_total: false } : { category };
         if (statusFilter) opts.status = statusFilter;
         const data = await api.getCorrelationPairs(reportId, opts);
         loader.remove();
 
-        if (offset === 0 && onDone) onDone(data.total);
+        if (!cursor && onDone) onDone(data.total);
 
         let html = '';
         for (const p of data.pairs) html += renderCorrPair(p, report);
@@ -3645,7 +3646,7 @@ async function loadCategoryPairs(reportId, category, containerEl, report, offset
                 if (entries[0].isIntersecting) {
                     observer.disconnect();
                     sentinel.remove();
-                    loadCategoryPairs(reportId, category, containerEl, report, offset + 50, statusFilter);
+                    loadCategoryPairs(reportId, category, containerEl, report, data.next_cursor, statusFilter);
                 }
             }, { rootMargin: '200px' });
             observer.observe(sentinel);
@@ -3653,7 +3654,7 @@ async function loadCategoryPairs(reportId, category, containerEl, report, offset
     } catch (err) {
         loader.remove();
         containerEl.insertAdjacentHTML('beforeend', '<p style="color:var(--text-dim);font-size:13px;">Ошибка загрузки.</p>');
-        if (offset === 0 && onDone) onDone(0);
+        if (!cursor && onDone) onDone(0);
     }
 }
 
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Обработка событий ActivityWatch за сутки: прежний перебор интервалов против развёртки.
+
+Прежняя реализация приведена ниже как эталон: для каждого события окна и
+браузера — fromisoformat и проход по списку активных интервалов с начала,
+переключения контекста — ещё один такой же проход. Синтетические сутки:
+события окон и вкладок каждые несколько секунд, AFK переключается каждые
+--afk-step секунд в среднем. Кроме времени сверяются результаты. База не нужна.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app.integrations.activitywatch import service  # noqa: E402
+
+_DAY_START = datetime(2026, 1, 10, tzinfo=timezone.utc)
+_APPS = ["Firefox", "VSCode", "Terminal", "Slack", "Telegram", "Obsidian", "Zoom", "Finder"]
+_SITES = ["github.com", "docs.python.org", "news.ycombinator.com", "mail.google.com", "youtube.com"]
+
+
+def _legacy_parse(ts: str) -> float:
+    return datetime.fromisoformat(ts.replace("Z", "+00:00")).timestamp()
+
+
+def _legacy_intersect(start: float, end: float, intervals: list[tuple[float, float]]) -> float:
+    total = 0.0
+    for i_start, i_end in intervals:
+        if i_start >= end:
+            break
+        if i_end <= start:
+            continue
+        total += max(0, min(end, i_end) - max(start, i_start))
+    return total
+
+
+def _legacy(window: list[dict], web: list[dict], afk: list[dict]) -> tuple:
+    spans = sorted(
+        (_legacy_parse(e["timestamp"]), _legacy_parse(e["timestamp"]) + e["duration"])
+        for e in afk if e["data"]["status"] == "not-afk"
+    )
+    intervals: list[tuple[float, float]] = []
+    for s, e in spans:
+        if intervals and s <= intervals[-1][1]:
+            intervals[-1] = (intervals[-1][0], max(intervals[-1][1], e))
+        else:
+            intervals.append((s, e))
+    apps: dict[str, float] = defaultdict(float)
+    for e in window:
+        start = _legacy_parse(e["timestamp"])
+        apps[e["data"]["app"]] += _legacy_intersect(start, start + e["duration"], intervals)
+    domains: dict[str, float] = defaultdict(float)
+    for e in web:
+        start = _legacy_parse(e["timestamp"])
+        domains[urlparse(e["data"]["url"]).netloc] += _legacy_intersect(start, start + e["duration"], intervals)
+    switches, prev = 0, None
+    for e in sorted(window, key=lambda e: _legacy_parse(e["timestamp"])):
+        start = _legacy_parse(e["timestamp"])
+        if _legacy_intersect(start, start + e["duration"], intervals) <= 0:
+            continue
+        if prev is not None and e["data"]["app"] != prev:
+            switches += 1
+        prev = e["data"]["app"]
+    breaks = sum(1 for e in afk if e["data"]["status"] == "afk" and e["duration"] >= 300)
+    return ({k: int(round(v, 6)) for k, v in apps.items()},
+            {k: int(round(v, 6)) for k, v in domains.items()}, switches, breaks)
+
+
+def _sweep(window: list[dict], web: list[dict], afk: list[dict]) -> tuple:
+    intervals, breaks = service._scan_afk_events(afk)
+    apps, switches = service._scan_window_events(window, intervals)
+    domains = service._compute_domain_durations(web, intervals)
+    return apps, domains, switches, breaks
+
+
+def _stream(rng: random.Random, mean_step: float, make_data) -> list[dict]:
+    """Back-to-back events over 24h with exponentially distributed durations."""
+    events, t = [], 0.0
+    while t < 86_400:
+        dur = rng.expovariate(1 / mean_step)
+        ts = _DAY_START + timedelta(seconds=round(t, 6))
+        events.append({"timestamp": ts.isoformat(), "duration": round(dur, 6), "data": make_data()})
+        t += dur
+    return events
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ActivityWatch 24h processing: interval scan vs sweep")
+    parser.add_argument("--event-steps", default="30,10,3",
+                        help="Mean seconds between window/web events, one run per value")
+    parser.add_argument("--afk-step", type=float, default=60.0)
+    parser.add_argument("--legacy-max", type=int, default=60_000,
+                        help="Skip the legacy scan above this many window+web events")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    afk = _stream(rng, args.afk_step, lambda: {"status": rng.choice(["afk", "not-afk", "not-afk"])})
+    for step in (float(s) for s in args.event_steps.split(",")):
+        window = _stream(rng, step, lambda: {"app": rng.choice(_APPS), "title": ""})
+        web = _stream(rng, step, lambda: {"url": f"https://{rng.choice(_SITES)}/p/{rng.randrange(50)}"})
+        n = len(window) + len(web)
+
+        service._parse_ts.cache_clear()
+        t0 = time.perf_counter()
+        result = _sweep(window, web, afk)
+        new_s = time.perf_counter() - t0
+
+        if n <= args.legacy_max:
+            t0 = time.perf_counter()
+            expected = _legacy(window, web, afk)
+            old_s = time.perf_counter() - t0
+            legacy = f"{old_s * 1000:9.1f}ms  x{old_s / new_s:6.1f}  match={result == expected}"
+        else:
+            legacy = "skipped"
+        print(f"{n:>7} events / {len(afk)} afk  sweep={new_s * 1000:8.1f}ms  scan={legacy}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Время расчёта распределения (гистограмма + KDE + статистики): NumPy против прежнего чистого Python.
+
+Прежняя реализация приведена ниже как эталон: KDE — двойной цикл
+n_points × n вызовов math.exp, гистограмма и статистики — отдельные
+проходы по списку. Кроме времени печатается максимальное расхождение
+кривых KDE. База не нужна.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+from statistics import mean, median, stdev, variance
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from app import distribution  # noqa: E402
+
+
+def _legacy_histogram(values: list[float], n_bins: int | None = None) -> list[int]:
+    n = len(values)
+    v_min, v_max = min(values), max(values)
+    if n_bins is None:
+        n_bins = max(5, min(20, math.ceil(1 + math.log2(n))))
+    if v_min == v_max:
+        return [n]
+    bin_width = (v_max - v_min) / n_bins
+    counts = [0] * n_bins
+    for v in values:
+        counts[min(int((v - v_min) / bin_width), n_bins - 1)] += 1
+    return counts
+
+
+def _legacy_kde(values: list[float], n_points: int = 50) -> list[float]:
+    n = len(values)
+    s = stdev(values)
+    sorted_vals = sorted(values)
+    iqr = sorted_vals[(3 * n) // 4] - sorted_vals[n // 4]
+    h = 0.9 * min(s, iqr / 1.34 if iqr > 0 else s) * (n ** -0.2)
+    if h <= 0:
+        h = s * (n ** -0.2)
+    x_start = min(values) - 3 * h
+    step = (max(values) + 3 * h - x_start) / (n_points - 1)
+    coeff = 1.0 / (n * h * math.sqrt(2 * math.pi))
+    ys = []
+    for i in range(n_points):
+        x = x_start + i * step
+        ys.append(round(coeff * sum(math.exp(-0.5 * ((x - v) / h) ** 2) for v in values), 6))
+    return ys
+
+
+def _legacy_stats(values: list[float]) -> None:
+    m, sd = mean(values), stdev(values)
+    median(values), variance(values)
+    sum((v - m) ** 3 for v in values) / len(values) / sd ** 3
+    sum((v - m) ** 4 for v in values) / len(values) / sd ** 4
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="distribution: NumPy vs pure Python")
+    parser.add_argument("--sizes", default="100,10000,1000000")
+    parser.add_argument("--legacy-max", type=int, default=100_000,
+                        help="Skip the pure-Python version above this many values (KDE alone takes minutes)")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    distribution.compute_distribution([1.0, 2.0, 4.0], "number")  # warm up NumPy
+    for n in (int(s) for s in args.sizes.split(",")):
+        values = [rng.lognormvariate(4, 0.6) for _ in range(n)]
+
+        distribution._kde_cache.clear()
+        t0 = time.perf_counter()
+        result = distribution.compute_distribution(values, "duration")
+        new_s = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        distribution.compute_distribution(values, "duration")
+        cached_s = time.perf_counter() - t0
+
+        if n <= args.legacy_max:
+            t0 = time.perf_counter()
+            _legacy_histogram(values)
+            legacy_y = _legacy_kde(values)
+            _legacy_stats(values)
+            old_s = time.perf_counter() - t0
+            diff = max(abs(a - b) for a, b in zip(legacy_y, result.kde_y)) / max(legacy_y)
+            legacy = f"{old_s * 1000:9.1f}ms  x{old_s / new_s:6.1f}  kde_diff={diff:.1e}"
+        else:
+            legacy = "skipped"
+        print(f"{n:>9} values  numpy={new_s * 1000:8.1f}ms  cached={cached_s * 1000:7.1f}ms  python={legacy}")
+
+
+if __name__ == "__main__":
+    main()
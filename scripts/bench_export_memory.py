@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Пиковая память чтения истории записей: fetch() целиком против курсора.
+
+Внутри транзакции создаёт временного пользователя с --metrics bool-метриками,
+для каждого размера истории дописывает дни и измеряет пик выделенной
+Python-памяти (tracemalloc) для fetch() полного экспортного запроса и для
+потокового ZIP-экспорта (ExportService.stream_zip через курсор). В конце
+транзакция откатывается — база остаётся нетронутой. Нужен доступный
+PostgreSQL (DATABASE_URL).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import resource
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import asyncpg  # noqa: E402
+
+from app.database import DATABASE_URL  # noqa: E402
+from app.repositories.entry_repository import _VALUE_COLUMNS_SQL, _VALUE_JOINS  # noqa: E402
+from app.repositories.export_repository import ExportRepository  # noqa: E402
+from app.services.export_service import ExportService  # noqa: E402
+
+_FETCH_ALL_SQL = f"""SELECT e.*, {_VALUE_COLUMNS_SQL}
+                    FROM entries e {_VALUE_JOINS}
+                    WHERE e.user_id = $1 ORDER BY e.date DESC, e.metric_id"""
+
+
+async def _grow_history(conn: asyncpg.Connection, user_id: int, days_from: int, days_to: int) -> None:
+    """Add entries (one per metric per day) for days [days_from, days_to) before today."""
+    await conn.execute(
+        """WITH new AS (
+               INSERT INTO entries (metric_id, user_id, date)
+               SELECT md.id, $1, CURRENT_DATE - d
+               FROM metric_definitions md, generate_series($2::int, $3::int - 1) d
+               WHERE md.user_id = $1
+               RETURNING id
+           )
+           INSERT INTO values_bool (entry_id, value) SELECT id, id % 3 <> 0 FROM new""",
+        user_id, days_from, days_to,
+    )
+
+
+async def _peak(run) -> tuple[float, float]:
+    """Peak traced allocation (MiB) and wall time of one run."""
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    t0 = time.perf_counter()
+    try:
+        await run()
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak / 2**20, time.perf_counter() - t0
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="entry history reads: fetch() vs server-side cursor")
+    parser.add_argument("--days", default="365,1825,3650,7300")
+    parser.add_argument("--metrics", type=int, default=30)
+    args = parser.parse_args()
+
+    conn = await asyncpg.connect(DATABASE_URL)
+    tr = conn.transaction()
+    await tr.start()
+    try:
+        user_id = await conn.fetchval(
+            "INSERT INTO users (username, password_hash) VALUES ('bench_export_memory', '') RETURNING id",
+        )
+        await conn.execute(
+            """INSERT INTO metric_definitions (user_id, slug, name, type, sort_order)
+               SELECT $1, 'm' || i, 'Metric ' || i, 'bool', i FROM generate_series(1, $2) i""",
+            user_id, args.metrics,
+        )
+        service = ExportService(ExportRepository(conn, user_id), conn)
+
+        async def fetch_all() -> None:
+            await conn.fetch(_FETCH_ALL_SQL, user_id)
+
+        async def stream() -> None:
+            async for _ in service.stream_zip():
+                pass
+
+        done = 0
+        for days in (int(s) for s in args.days.split(",")):
+            await _grow_history(conn, user_id, done, days)
+            done = days
+            fetch_mb, fetch_s = await _peak(fetch_all)
+            stream_mb, stream_s = await _peak(stream)
+            print(f"{days:>6} days ({days * args.metrics:>8} entries)  "
+                  f"fetch={fetch_mb:8.1f} MiB {fetch_s:6.2f}s  "
+                  f"stream_zip={stream_mb:6.1f} MiB {stream_s:6.2f}s")
+        rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"max RSS of the process: {rss_mb:.0f} MiB")
+    finally:
+        await tr.rollback()
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Время записи correlation_pairs: executemany против binary COPY.
+
+Создаёт временного пользователя и отчёт внутри транзакции, пишет N
+синтетических пар обоими способами и откатывает транзакцию — база
+остаётся нетронутой. Нужен доступный PostgreSQL (DATABASE_URL).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from dataclasses import astuple
+from datetime import date
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import asyncpg  # noqa: E402
+
+from app.analytics.correlation_engine import CorrelationPairResult  # noqa: E402
+from app.database import DATABASE_URL  # noqa: E402
+from app.repositories.correlation_repository import PAIR_COLUMNS, CorrelationRepository  # noqa: E402
+
+_EXECUTEMANY_SQL = (
+    f"INSERT INTO correlation_pairs ({', '.join(PAIR_COLUMNS)}) "
+    f"VALUES ({', '.join(f'${i}' for i in range(1, len(PAIR_COLUMNS) + 1))})"
+)
+
+
+def _pairs(report_id: int, n: int) -> list[CorrelationPairResult]:
+    return [
+        CorrelationPairResult(
+            report_id=report_id,
+            metric_a_id=None, metric_b_id=None,
+            checkpoint_a_id=None, checkpoint_b_id=None,
+            interval_a_id=None, interval_b_id=None,
+            source_key_a=f"metric:{i}", source_key_b=f"metric:{i + 1}",
+            type_a="number", type_b="bool",
+            correlation=((i % 200) - 100) / 100, data_points=30 + i % 300,
+            lag_days=i % 2, p_value=(i % 1000) / 1000, quality_issue=None,
+            adjusted_p_value=None,
+        )
+        for i in range(n)
+    ]
+
+
+async def _measure(conn: asyncpg.Connection, insert) -> float:
+    """Run one insert inside a savepoint and roll it back."""
+    tr = conn.transaction()
+    await tr.start()
+    try:
+        t0 = time.perf_counter()
+        await insert()
+        return time.perf_counter() - t0
+    finally:
+        await tr.rollback()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="correlation_pairs insert: executemany vs COPY")
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--executemany-max", type=int, default=100_000,
+                        help="Skip executemany above this many pairs (it takes minutes)")
+    args = parser.parse_args()
+
+    conn = await asyncpg.connect(DATABASE_URL)
+    tr = conn.transaction()
+    await tr.start()
+    try:
+        user_id = await conn.fetchval(
+            "INSERT INTO users (username, password_hash) VALUES ('bench_pair_insert', '') RETURNING id",
+        )
+        report_id = await conn.fetchval(
+            """INSERT INTO correlation_reports (user_id, status, period_start, period_end)
+               VALUES ($1, 'running', $2, $2) RETURNING id""",
+            user_id, date.today(),
+        )
+        repo = CorrelationRepository(conn, user_id)
+        for n in (int(s) for s in args.sizes.split(",")):
+            pairs = _pairs(report_id, n)
+            copy_s = await _measure(conn, lambda: repo.insert_pairs(report_id, 0, pairs))
+            if n <= args.executemany_max:
+                rows = [astuple(p) for p in pairs]
+                many_s = await _measure(conn, lambda: conn.executemany(_EXECUTEMANY_SQL, rows))
+                many = f"{many_s:7.2f}s ({n / many_s:9.0f} rows/s)"
+            else:
+                many = "skipped"
+            print(f"{n:>9} pairs  copy={copy_s:7.2f}s ({n / copy_s:9.0f} rows/s)  executemany={many}")
+    finally:
+        await tr.rollback()
+        await conn.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Задержка API (p50/p95/p99) в простое и во время расчёта корреляционного отчёта.
+
+Сначала нагружает лёгкий эндпоинт без отчёта, затем запускает отчёт и
+нагружает тот же эндпоинт, пока отчёт не досчитается. Сравнение двух строк
+показывает, блокирует ли расчёт event loop (engine.workers = 0 против > 0).
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import threading
+import time
+from datetime import date, timedelta
+
+from seed_test_user import PASSWORD, USERNAME, ApiClient
+
+PROBE_PATH = "/api/metrics"
+REPORT_PATH = "/api/analytics/correlation-report"
+POLL_INTERVAL_S = 0.5
+
+
+def _percentile(sorted_ms: list[float], pct: float) -> float:
+    if not sorted_ms:
+        return 0.0
+    idx = min(len(sorted_ms) - 1, int(round(pct / 100 * (len(sorted_ms) - 1))))
+    return sorted_ms[idx]
+
+
+class LatencyProbe:
+    """Несколько потоков бьют в PROBE_PATH, пока не выставлен stop."""
+
+    def __init__(self, base_url: str, token: str, threads: int) -> None:
+        self._base_url = base_url
+        self._token = token
+        self._threads = threads
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self.samples_ms: list[float] = []
+
+    def _worker(self) -> None:
+        api = ApiClient(self._base_url)
+        api.set_token(self._token)
+        while not self._stop.is_set():
+            t0 = time.perf_counter()
+            api.get(PROBE_PATH)
+            ms = (time.perf_counter() - t0) * 1000
+            with self._lock:
+                self.samples_ms.append(ms)
+
+    def __enter__(self) -> LatencyProbe:
+        self._pool = [threading.Thread(target=self._worker, daemon=True) for _ in range(self._threads)]
+        for t in self._pool:
+            t.start()
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self._stop.set()
+        for t in self._pool:
+            t.join()
+
+    def summary(self, label: str) -> str:
+        s = sorted(self.samples_ms)
+        mean = statistics.fmean(s) if s else 0.0
+        return (
+            f"{label:<8} n={len(s):<6} mean={mean:7.1f}ms  p50={_percentile(s, 50):7.1f}ms  "
+            f"p95={_percentile(s, 95):7.1f}ms  p99={_percentile(s, 99):7.1f}ms  max={(s[-1] if s else 0):7.1f}ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="API latency while a correlation report is running")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--username", default=USERNAME)
+    parser.add_argument("--password", default=PASSWORD)
+    parser.add_argument("--days", type=int, default=365, help="Report period length in days")
+    parser.add_argument("--threads", type=int, default=4, help="Concurrent probe clients")
+    parser.add_argument("--idle-seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    api = ApiClient(args.base_url)
+    token = api.post("/api/auth/login", {"username": args.username, "password": args.password})["access_token"]
+    api.set_token(token)
+
+    with LatencyProbe(args.base_url, token, args.threads) as idle:
+        time.sleep(args.idle_seconds)
+
+    end = date.today()
+    start = end - timedelta(days=args.days - 1)
+    with LatencyProbe(args.base_url, token, args.threads) as busy:
+        t0 = time.perf_counter()
+        api.post(REPORT_PATH, {"start": start.isoformat(), "end": end.isoformat()})
+        while api.get(REPORT_PATH).get("running"):
+            time.sleep(POLL_INTERVAL_S)
+        report_s = time.perf_counter() - t0
+
+    print(f"Отчёт за {args.days} дн. посчитан за {report_s:.1f}s")
+    print(idle.summary("idle"))
+    print(busy.summary("report"))
+
+
+if __name__ == "__main__":
+    main()